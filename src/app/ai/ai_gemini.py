@@ -1,108 +1,209 @@
+import asyncio
 import logging
+import threading
 import os
 import time
-import random
 import json
+from typing import Iterator
 
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-from google.genai.errors import ServerError
 
+from src.app.ai.prompt_cache import gemini_context_cache, prompt_cache_usage
 from src.app.ai.prompt_eng import PROMPT_ENG
 from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.shared.llm.LlmGateway import LlmGateway, RateRequest
+from src.shared.llm.LlmReplay import LlmReplayBackend
+from src.shared.llm.RateLimiter import INTERACTIVE, estimate_tokens, key_fingerprint
+from src.shared.util.logUtil import log_payload
 
 
 class ai_gemini:
 
-    def __init__(self):
+    def __init__(self, client=None, gateway: LlmGateway = None, priority: str = INTERACTIVE):
         self.logger = logging.getLogger(__name__)
         self.logger.info("Initializing AI recommendation service")
 
-        load_dotenv()
-        api_key = os.getenv("GENAI_API_KEY")
-        if not api_key:
-            self.logger.error("GENAI_API_KEY environment variable is not set")
-            raise RuntimeError("GENAI_API_KEY is not set.")
-
-        self.client = genai.Client(api_key=api_key)
+        api_key = None
+        # LLM_BACKEND=record|replay: 응답 녹화 / 키 없이 재생 (주입된 client 는 그대로 사용)
+        backend = LlmReplayBackend.from_env() if client is None else None
+        if client is None and (backend is None or backend.records):
+            load_dotenv()
+            api_key = os.getenv("GENAI_API_KEY")
+            if not api_key:
+                self.logger.error("GENAI_API_KEY environment variable is not set")
+                raise RuntimeError("GENAI_API_KEY is not set.")
+            client = genai.Client(api_key=api_key)
+        if backend is not None:
+            client = backend.gemini_client(client)
+
+        # 테스트에서는 같은 인터페이스(models / aio.models / caches)의 스텁 주입
+        self.client = client
+        self.context_cache = gemini_context_cache.from_env(self.client)
+        self.cache_usage = prompt_cache_usage()
+        self.gateway = gateway or LlmGateway.shared()
+        # 같은 GENAI_API_KEY 를 쓰는 crawler 와 공유 rate limit bucket 을 나눠 씀 (api 는 interactive)
+        self.rate_key = key_fingerprint(api_key)
+        self.priority = priority
         self.logger.info("GenAI client initialized successfully")
 
-    def create_response(self, content: dict, model:str) -> response_ai_dto | ValueError:
+    def close(self):
+        # 서비스 컨테이너 종료 시 HTTP 커넥션 풀 정리
+        close = getattr(self.client, "close", None)
+        if callable(close):
+            close()
+        self.logger.info("GenAI client closed")
+
+    async def aclose(self):
+        aclose = getattr(self.client.aio, "aclose", None)
+        if callable(aclose):
+            await aclose()
+        self.logger.info("GenAI async client closed")
+
+    def _build_request(self, content: dict, model: str, prompt: str = PROMPT_ENG, response_schema=response_ai_dto):
+        # 정적 프롬프트는 system_instruction(또는 explicit context cache)으로 앞에, 요청마다 바뀌는 payload 는 contents 로 뒤에
+        content_json = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+        prompt_length = len(content_json)
+        self.logger.debug("Content prepared for AI: %d characters", prompt_length)
+
+        cached_content = self.context_cache.get(model, prompt) if self.context_cache is not None else None
+        if cached_content:
+            config = types.GenerateContentConfig(
+                cached_content=cached_content,
+                response_mime_type="application/json",
+                response_schema=response_schema,
+            )
+        else:
+            config = types.GenerateContentConfig(
+                system_instruction=prompt,
+                response_mime_type="application/json",
+                response_schema=response_schema,
+            )
+        self.logger.debug("AI generation config set: JSON response with schema validation, prefix=%s",
+                          "cached_content" if cached_content else "system_instruction")
+        return content_json, config
+
+    def _rate(self, content: dict, prompt: str) -> RateRequest:
+        return RateRequest(key=self.rate_key, priority=self.priority,
+                           cost_tokens=estimate_tokens(prompt, json.dumps(content, ensure_ascii=False)))
+
+    def _record_usage(self, model: str, usage_metadata):
+        if usage_metadata is None:
+            return
+        self.cache_usage.record(model, getattr(usage_metadata, "prompt_token_count", None),
+                                getattr(usage_metadata, "cached_content_token_count", None),
+                                getattr(usage_metadata, "candidates_token_count", None))
+
+    def _with_timeout(self, config, timeout: float = None):
+        # deadline 까지 남은 시간을 HTTP 타임아웃으로 전달 (ms)
+        if timeout is None:
+            return config
+        return config.model_copy(update={"http_options": types.HttpOptions(timeout=max(1, int(timeout * 1000)))})
+
+    def create_response(self, content: dict, model:str, cancel_event: threading.Event = None,
+                        prompt: str = PROMPT_ENG, response_schema=response_ai_dto,
+                        deadline: float = None) -> response_ai_dto | ValueError:
+        # 재시도/대체 모델/동시성 제한은 LlmGateway 가 담당, 여기서는 SDK 호출 한 번만
         self.logger.info("Starting AI recommendation generation")
 
-        content_json = json.dumps(content, ensure_ascii=False)
-        prompt_length = len(content_json)
-        self.logger.info(f"Content prepared for AI: {prompt_length} characters")
-
-        prompt = f"{PROMPT_ENG}{content_json}"
-        full_prompt_length = len(prompt)
-        self.logger.debug(f"Full prompt prepared: {full_prompt_length} characters total")
-
-        config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=response_ai_dto,
-        )
-        self.logger.debug("AI generation config set: JSON response with schema validation")
-
-        max_retry = 5
-        for attempt in range(1, max_retry + 1):
-            try:
-                self.logger.info(f"Attempting AI generation (attempt {attempt}/{max_retry})")
-                start_time = time.time()
-
-                response = self.client.models.generate_content(
-                    model=model,
-                    contents=prompt,
-                    config=config,
-                )
-
-                processing_time = time.time() - start_time
-                self.logger.info(f"AI generation successful in {processing_time:.2f} seconds")
-                break
-
-            except ServerError as e:
-                if getattr(e, "status_code", None) == 503 and attempt < max_retry:
-                    wait = min(60, 2 ** (attempt - 1)) + random.random()
-                    self.logger.warning(f"AI model overloaded (503). Retry {attempt}/{max_retry} after {wait:.1f}s")
-                    time.sleep(wait)
-                    continue
-                else:
-                    self.logger.error(f"AI server error on attempt {attempt}: {str(e)}")
-                    raise
-            except Exception as e:
-                self.logger.error(f"Unexpected error during AI generation on attempt {attempt}: {str(e)}")
-                if attempt == max_retry:
-                    raise
-                continue
-
-        self.logger.info(f"AI Raw Response: {response.text}")  # AI 원본 응답 출력
+        def generate(attempt_model: str, timeout: float = None):
+            contents, config = self._build_request(content, attempt_model, prompt, response_schema)
+            self.logger.info(f"Attempting AI generation on {attempt_model}")
+            start_time = time.time()
+            response = self.client.models.generate_content(
+                model=attempt_model,
+                contents=contents,
+                config=self._with_timeout(config, timeout),
+            )
+            self.logger.info(f"AI generation successful in {time.time() - start_time:.2f} seconds")
+            self._record_usage(attempt_model, getattr(response, "usage_metadata", None))
+            return response
+
+        response = self.gateway.call(self.gateway.chain(model), generate, deadline=deadline, cancel_event=cancel_event,
+                                     rate=self._rate(content, prompt))
+        return self._parse_response(response)
+
+    async def create_response_async(self, content: dict, model: str, prompt: str = PROMPT_ENG,
+                                    response_schema=response_ai_dto, deadline: float = None) -> response_ai_dto:
+        # asyncio 경로: client.aio 사용, 백오프는 asyncio.sleep 으로 이벤트 루프를 막지 않음
+        self.logger.info("Starting AI recommendation generation (async)")
+
+        async def generate(attempt_model: str, timeout: float = None):
+            # context cache 생성은 동기 호출이라 스레드에서 (보통은 이미 만들어진 캐시 이름만 반환)
+            contents, config = await asyncio.to_thread(self._build_request, content, attempt_model, prompt,
+                                                       response_schema)
+            self.logger.info(f"Attempting AI generation on {attempt_model}")
+            start_time = time.time()
+            response = await self.client.aio.models.generate_content(
+                model=attempt_model,
+                contents=contents,
+                config=self._with_timeout(config, timeout),
+            )
+            self.logger.info(f"AI generation successful in {time.time() - start_time:.2f} seconds")
+            self._record_usage(attempt_model, getattr(response, "usage_metadata", None))
+            return response
+
+        response = await self.gateway.call_async(self.gateway.chain(model), generate, deadline=deadline,
+                                                 rate=self._rate(content, prompt))
+        return self._parse_response(response)
+
+    def create_response_stream(self, content: dict, model: str, prompt: str = PROMPT_ENG,
+                               response_schema=response_ai_dto, deadline: float = None) -> Iterator[str]:
+        # 스트리밍 경로: 텍스트 조각을 생성되는 대로 반환 (파싱은 호출한 쪽에서 점진적으로 수행)
+        # 첫 조각을 받기 전의 오류만 재시도/대체, 이미 내보낸 뒤에는 중간부터 다시 받을 수 없으므로 실패 처리
+        self.logger.info("Starting AI recommendation generation (stream)")
+
+        def generate(attempt_model: str, timeout: float = None):
+            contents, config = self._build_request(content, attempt_model, prompt, response_schema)
+            self.logger.info(f"Attempting AI streaming generation on {attempt_model}")
+            start_time = time.time()
+            started = False
+            usage_metadata = None
+            for chunk in self.client.models.generate_content_stream(
+                    model=attempt_model,
+                    contents=contents,
+                    config=self._with_timeout(config, timeout),
+            ):
+                # 사용량은 마지막 조각에 누적값으로 옴
+                usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                if chunk.text:
+                    if not started:
+                        self.logger.info(f"AI first chunk received in {time.time() - start_time:.2f} seconds")
+                    started = True
+                    yield chunk.text
+
+            self.logger.info(f"AI streaming generation finished in {time.time() - start_time:.2f} seconds")
+            self._record_usage(attempt_model, usage_metadata)
+
+        yield from self.gateway.stream(self.gateway.chain(model), generate, deadline=deadline,
+                                       rate=self._rate(content, prompt))
+
+    def _parse_response(self, response) -> response_ai_dto:
+        # 원본 응답은 크므로 샘플링해서만 남김 (LOG_PAYLOAD_SAMPLE_RATE, DEBUG 면 항상)
         try:
             if hasattr(response, 'text') and response.text:
-                self.logger.info(f"AI Raw Response (text): {response.text}")
+                log_payload(self.logger, "AI Raw Response (text)", response.text)
             elif hasattr(response, 'candidates') and response.candidates:
-                content = response.candidates[0].content.parts[0].text
-                self.logger.info(f"AI Raw Response (candidates): {content}")
+                log_payload(self.logger, "AI Raw Response (candidates)", response.candidates[0].content.parts[0].text)
             else:
-                self.logger.info(f"AI Raw Response (full object): {response}")
-                self.logger.info(f"AI Response attributes: {dir(response)}")
+                log_payload(self.logger, "AI Raw Response (full object)", response)
         except Exception as e:
-            self.logger.error(f"Error accessing AI response: {e}")
-            self.logger.info(f"AI Response type: {type(response)}")
+            self.logger.error("Error accessing AI response: %s (type=%s)", e, type(response))
 
         try:
             parsed: response_ai_dto = response.parsed
             combinations_count = len(parsed.combination) if parsed and parsed.combination else 0
-            self.logger.info(f"AI response parsed successfully: {combinations_count} combinations generated")
+            self.logger.info("AI response parsed successfully: %d combinations generated", combinations_count)
 
             if parsed and parsed.combination:
                 total_payment = parsed.total_payment
-                period_months = parsed.period_months
-                self.logger.info(
-                    f"Recommendation summary: total_payment={total_payment}, period={period_months} months")
+                period_months = getattr(parsed, "period_months", None)
+                self.logger.info("Recommendation summary: total_payment=%s, period=%s months",
+                                 total_payment, period_months)
 
             return parsed
 
         except Exception as e:
             self.logger.error(f"Error parsing AI response: {str(e)}")
-            raise
\ No newline at end of file
+            raise
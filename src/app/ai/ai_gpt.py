@@ -1,59 +1,158 @@
 from dotenv import load_dotenv
-from openai import OpenAI, RateLimitError
+from openai import AsyncOpenAI, OpenAI
 import json
+from src.app.ai.prompt_cache import prompt_cache_key, prompt_cache_usage
 from src.app.ai.prompt_eng import PROMPT_ENG
 from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.shared.llm.LlmGateway import LlmGateway, RateRequest
+from src.shared.llm.LlmReplay import LlmReplayBackend
+from src.shared.llm.RateLimiter import INTERACTIVE, estimate_tokens, key_fingerprint
+from src.shared.util.logUtil import log_payload
 
-import time
+import threading
 import logging
 import os
+from typing import Iterator
 
 class ai_gpt:
 
-    def __init__(self):
+    def __init__(self, client=None, async_client=None, gateway: LlmGateway = None,
+                 priority: str = INTERACTIVE):
         self.logger = logging.getLogger(__name__)
         self.logger.info("Initializing AI recommendation service")
 
-        load_dotenv()
-        api_key = os.getenv("GPT_API_KEY")
-        if not api_key:
-            self.logger.error("GENAI_API_KEY environment variable is not set")
-            raise RuntimeError("GENAI_API_KEY is not set.")
+        api_key = None
+        # LLM_BACKEND=record|replay: 응답 녹화 / 키 없이 재생 (주입된 client 는 그대로 사용)
+        backend = LlmReplayBackend.from_env() if client is None else None
+        if client is None and (backend is None or backend.records):
+            load_dotenv()
+            api_key = os.getenv("GPT_API_KEY")
+            if not api_key:
+                self.logger.error("GENAI_API_KEY environment variable is not set")
+                raise RuntimeError("GENAI_API_KEY is not set.")
+            client = OpenAI(api_key=api_key, max_retries=0)  # 재시도는 LlmGateway 에서만
+        if backend is not None:
+            client = backend.openai_client(client)
+            if async_client is None:
+                async_client = backend.openai_async_client(lambda: AsyncOpenAI(api_key=api_key, max_retries=0))
 
-        self.client = OpenAI(api_key=api_key)
+        # 테스트에서는 같은 인터페이스(responses.parse / responses.stream)의 스텁 주입
+        self.client = client
+        # asyncio 경로 전용, 주입되지 않았으면 첫 호출 시 생성 (이벤트 루프 안에서 만들어야 함)
+        self.api_key = api_key
+        self.async_client: AsyncOpenAI = async_client
+        self.cache_usage = prompt_cache_usage()
+        self.gateway = gateway or LlmGateway.shared()
+        self.rate_key = key_fingerprint(api_key)
+        self.priority = priority
         self.logger.info("GenAI client initialized successfully")
 
-    def create_response(self, content: dict, model: str):
-        content_json = json.dumps(content, ensure_ascii=False)
-
-        for attempt in range(5):  # 최대 5번 재시도
-            try:
-                responses_parse = self.client.responses.parse(
-                    model=model,
-                    input=[
-                        {"role": "system", "content": PROMPT_ENG},
-                        {"role": "user", "content": content_json},
-                    ],
-                    text_format=response_ai_dto,
-                    temperature=0
-                )
-
-                # ✅ 응답 로그 찍기
-                self.logger.info(f"Raw output text: {getattr(responses_parse, 'output_text', None)}")
-                self.logger.info(f"Parsed output: {responses_parse.output_parsed}")
-                self.logger.info(f"Tokens used - input: {responses_parse.usage.input_tokens}, "
-                                 f"output: {responses_parse.usage.output_tokens}, "
-                                 f"total: {responses_parse.usage.total_tokens}")
-                self.logger.info(f"Raw response: {responses_parse}")
-                self.logger.info(f"Raw output list: {responses_parse.output}")
-                if hasattr(responses_parse, "output_text"):
-                    self.logger.info(f"Output text: {responses_parse.output_text}")
-
-                return responses_parse.output_parsed
-
-            except RateLimitError as e:
-                wait = 2 ** attempt
-                self.logger.warning(f"Rate limit error, {wait}초 대기 후 재시도... ({attempt + 1}/5)")
-                time.sleep(wait)
-
-        raise RuntimeError("재시도 후에도 RateLimitError 발생")
+    def close(self):
+        # 서비스 컨테이너 종료 시 HTTP 커넥션 풀 정리
+        self.client.close()
+        self.logger.info("OpenAI client closed")
+
+    async def aclose(self):
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
+        self.logger.info("OpenAI async client closed")
+
+    def _build_input(self, content: dict, prompt: str = PROMPT_ENG) -> list:
+        # 정적 프롬프트를 항상 첫 메시지로 두어야 provider 의 prefix 캐시가 적중
+        content_json = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+        return [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": content_json},
+        ]
+
+    def _rate(self, input_messages: list) -> RateRequest:
+        return RateRequest(key=self.rate_key, priority=self.priority,
+                           cost_tokens=estimate_tokens(*(m["content"] for m in input_messages)))
+
+    def _record_usage(self, model: str, usage):
+        if usage is None:
+            return
+        details = getattr(usage, "input_tokens_details", None)
+        self.cache_usage.record(model, getattr(usage, "input_tokens", None),
+                                getattr(details, "cached_tokens", None), getattr(usage, "output_tokens", None))
+
+    def _log_response(self, responses_parse):
+        # ✅ 응답 로그 찍기 (토큰 사용량은 매번, 원본 응답은 샘플링)
+        usage = responses_parse.usage
+        self.logger.info("Tokens used - input: %s, output: %s, total: %s",
+                         usage.input_tokens, usage.output_tokens, usage.total_tokens)
+        log_payload(self.logger, "Raw output text", getattr(responses_parse, "output_text", None))
+        self.logger.debug("Raw response: %s", responses_parse)
+
+    def create_response(self, content: dict, model: str, cancel_event: threading.Event = None,
+                        prompt: str = PROMPT_ENG, response_schema=response_ai_dto, deadline: float = None):
+        # 재시도/대체 모델/동시성 제한은 LlmGateway 가 담당, 여기서는 SDK 호출 한 번만
+        input_messages = self._build_input(content, prompt)
+
+        def generate(attempt_model: str, timeout: float = None):
+            responses_parse = self.client.responses.parse(
+                model=attempt_model,
+                input=input_messages,
+                text_format=response_schema,
+                temperature=0,
+                prompt_cache_key=prompt_cache_key(prompt),
+                timeout=timeout,
+            )
+            self._log_response(responses_parse)
+            self._record_usage(attempt_model, responses_parse.usage)
+            return responses_parse.output_parsed
+
+        return self.gateway.call(self.gateway.chain(model), generate, deadline=deadline, cancel_event=cancel_event,
+                                 rate=self._rate(input_messages))
+
+    def create_response_stream(self, content: dict, model: str, prompt: str = PROMPT_ENG,
+                               response_schema=response_ai_dto, deadline: float = None) -> Iterator[str]:
+        # 스트리밍 경로: output_text delta 를 생성되는 대로 반환
+        # 첫 delta 전의 오류만 재시도/대체
+        input_messages = self._build_input(content, prompt)
+
+        def generate(attempt_model: str, timeout: float = None):
+            with self.client.responses.stream(
+                    model=attempt_model,
+                    input=input_messages,
+                    text_format=response_schema,
+                    temperature=0,
+                    prompt_cache_key=prompt_cache_key(prompt),
+                    timeout=timeout,
+            ) as stream:
+                for event in stream:
+                    if event.type == "response.output_text.delta":
+                        yield event.delta
+
+                final = stream.get_final_response()
+                self.logger.info(f"Tokens used - input: {final.usage.input_tokens}, "
+                                 f"output: {final.usage.output_tokens}, "
+                                 f"total: {final.usage.total_tokens}")
+                self._record_usage(attempt_model, final.usage)
+
+        yield from self.gateway.stream(self.gateway.chain(model), generate, deadline=deadline,
+                                       rate=self._rate(input_messages))
+
+    async def create_response_async(self, content: dict, model: str, prompt: str = PROMPT_ENG,
+                                    response_schema=response_ai_dto, deadline: float = None):
+        # asyncio 경로: AsyncOpenAI 사용, 백오프는 asyncio.sleep
+        if self.async_client is None:
+            self.async_client = AsyncOpenAI(api_key=self.api_key, max_retries=0)
+        input_messages = self._build_input(content, prompt)
+
+        async def generate(attempt_model: str, timeout: float = None):
+            responses_parse = await self.async_client.responses.parse(
+                model=attempt_model,
+                input=input_messages,
+                text_format=response_schema,
+                temperature=0,
+                prompt_cache_key=prompt_cache_key(prompt),
+                timeout=timeout,
+            )
+            self._log_response(responses_parse)
+            self._record_usage(attempt_model, responses_parse.usage)
+            return responses_parse.output_parsed
+
+        return await self.gateway.call_async(self.gateway.chain(model), generate, deadline=deadline,
+                                             rate=self._rate(input_messages))
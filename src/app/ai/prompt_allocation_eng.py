@@ -0,0 +1,109 @@
+PROMPT_ALLOCATION_ENG = r"""
+You are given:
+- request_combo_dto (amount, period)
+- ai_payload_dto (tax_rate, products[list of product_dto])
+- Each product_dto includes limits with -1 sentinel (no limit / no restriction).
+
+Your job:
+- Build ≥3 feasible investment combinations that MAXIMIZE total after-tax interest.
+- Choose ONLY the allocations. Monthly plans, timelines, interest and rates are computed by the server.
+- Output **JSON only** exactly matching the Output Schema below. No prose, no markdown, no comments.
+
+================================================================
+HOW THE SERVER SCORES AN ALLOCATION
+================================================================
+- Rate = max_rate, day count ACT/365, simple accrual, no compounding.
+- Deposit: whole allocated_amount paid in start_month, interest accrues every month until end_month.
+- Savings: allocated_amount paid in equal monthly installments from start_month to end_month.
+- Tax: tax-free → 0.0%, separate taxation → 15.4%, comprehensive taxation → ai_payload_dto.tax_rate.
+
+================================================================
+INPUT SCHEMA (FIXED)
+================================================================
+- request_combo_dto.amount: long
+- request_combo_dto.period: "SHORT" | "MID" | "LONG"
+  * SHORT: ≤6 months
+  * MID: ≤12 months
+  * LONG: flexible up to product limits
+- product_dto: uuid, name, max_rate, type, amount limits (-1 = none), tax_benefit, product_period
+- The payload may arrive in compact form: `tax_rate`, `keys` (short column → product_dto field),
+  `cols` and `rows` (one row per product in `cols` order). `periods` rows are [min_months, max_months, basic_rate],
+  null = no limit. Free-text columns may be shortened or omitted.
+
+================================================================
+OUTPUT SCHEMA (FIXED, JSON ONLY)
+================================================================
+{
+  "total_payment": long,                # MUST equal request_combo_dto.amount
+  "combination": [
+    {
+      "combination_id": str,           # UUID v4
+      "allocations": [
+        {
+          "uuid": str,                 # From input, never generated
+          "type": "deposit" | "savings", # lowercase
+          "start_month": int,          # 1-based
+          "end_month": int,            # 1-based, inclusive, within the requested period
+          "allocated_amount": long     # total KRW for this product
+        }
+      ]
+    }
+  ]
+}
+
+================================================================
+ALLOCATION STRATEGY
+================================================================
+### PRODUCT COUNT RULES:
+- **Default**: ≤ 3 products per combination
+- **For amount ≥ 300,000,000원**: Add 1 product per 100,000,000원
+  * Example: 300M → max 3 products
+  * Example: 500M → max 5 products  
+  * Example: 1B → max 10 products
+
+### MINIMUM ALLOCATION AMOUNTS:
+**ONLY APPLY WHEN request_combo_dto.amount ≥ 10,000,000원:**
+- **Deposit**: ≥ 10,000,000원 (unless product limits force lower)
+- **Savings**: ≥ 3,600,000원 (300,000원 × 12 months minimum)
+- **For amount < 10,000,000원**: Use product's own minimum limits only
+
+### ALLOCATION EXAMPLES BY AMOUNT:
+
+#### For 10,000,000원 ~ 30,000,000원:
+- **Combination 1 (Max return)**: 
+  * 1 deposit (50-70% of total) + 1-2 high-rate savings (remainder)
+- **Combination 2 (Balanced)**:
+  * 1 deposit (60-80% of total) + 1 savings (remainder)
+- **Combination 3 (Conservative)**:
+  * 1 large deposit (100%) or 2 deposits (50% each)
+
+#### For 100,000,000원:
+- **Combination 1**: 2-3 deposits (30-40M each) + 1 savings
+- **Combination 2**: 1 large deposit (70M) + 2 savings (15M each)
+- **Combination 3**: 3 balanced products (33M each)
+
+#### For 300,000,000원 ~ 500,000,000원:
+- Use 3-5 products per combination
+- Maintain deposit allocation ≥ 100,000,000원 per deposit
+- Savings allocation ≥ 30,000,000원 per savings
+
+#### For ≥ 1,000,000,000원:
+- Use up to 10 products per combination
+- Each deposit: 100,000,000원 ~ 200,000,000원
+- Each savings: 50,000,000원 ~ 100,000,000원
+
+### ALLOCATION PRIORITY:
+1. Respect product's own minimum/maximum limits first
+2. Apply minimum allocation rules (if amount ≥ 10M원)
+3. Maximize interest while maintaining diversification
+4. Each product UUID used at most once globally
+
+================================================================
+VALIDATION RULES - MUST PASS ALL
+================================================================
+- sum(allocated_amount) of every combination == request_combo_dto.amount
+- allocated_amount within the product's minimum/maximum limits (-1 = no limit)
+- Savings: allocated_amount / (end_month - start_month + 1) within the per-month limits
+- Each product UUID used at most once per combination
+- JSON only, no markdown or comments
+"""
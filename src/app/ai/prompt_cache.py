@@ -0,0 +1,101 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from google.genai import types
+
+from src.shared.util.metricsUtil import REGISTRY
+
+LLM_TOKENS = REGISTRY.counter("llm_tokens", "LLM tokens by kind (input includes cached)", ("model", "kind"))
+
+
+def prompt_cache_key(prompt: str, prefix: str = "recommend") -> str:
+    # 같은 정적 프롬프트면 항상 같은 키 → provider 가 같은 캐시 노드로 라우팅
+    return f"{prefix}-{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]}"
+
+
+class prompt_cache_usage:
+    """
+    provider 프롬프트 캐시 적중 토큰 집계 (모델별, 스레드 안전)
+    - prompt_tokens: 입력 토큰 전체, cached_tokens: 그중 캐시에서 처리된 토큰
+    - llm_tokens 지표(input / cached / output)에도 같이 누적
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, int]] = {}
+
+    def record(self, model: str, prompt_tokens: Optional[int], cached_tokens: Optional[int],
+               output_tokens: Optional[int] = None):
+        prompt_tokens = int(prompt_tokens or 0)
+        cached_tokens = int(cached_tokens or 0)
+        LLM_TOKENS.inc(prompt_tokens, model=model, kind="input")
+        LLM_TOKENS.inc(cached_tokens, model=model, kind="cached")
+        LLM_TOKENS.inc(int(output_tokens or 0), model=model, kind="output")
+        with self._lock:
+            stats = self._models.setdefault(model, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["cached_tokens"] += cached_tokens
+        self.logger.info(f"Prompt cache [{model}]: {cached_tokens}/{prompt_tokens} input tokens cached")
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                model: {**stats, "hit_ratio": stats["cached_tokens"] / stats["prompt_tokens"]
+                        if stats["prompt_tokens"] else 0.0}
+                for model, stats in self._models.items()
+            }
+
+
+class gemini_context_cache:
+    """
+    Gemini explicit context cache (GEMINI_CONTEXT_CACHE_ENABLED=true 일 때만)
+    - 모델 × 시스템 프롬프트마다 cachedContent 를 하나 만들어 TTL 동안 재사용, 만료 직전에 새로 생성
+    - 생성 실패(최소 토큰 미달, 권한 등)는 retry_after_sec 동안 다시 시도하지 않고 system_instruction 으로 대체
+    - 꺼져 있어도 system_instruction 이 항상 앞에 오므로 implicit cache 는 적용됨
+    """
+
+    def __init__(self, client, ttl_sec: int = None, retry_after_sec: int = 600):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.ttl_sec = ttl_sec or int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+        self.retry_after_sec = retry_after_sec
+        self._lock = threading.Lock()
+        # (model, prompt key) → (cache name 또는 None(실패), 만료 시각)
+        self._entries: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+
+    @classmethod
+    def from_env(cls, client) -> Optional["gemini_context_cache"]:
+        if os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(client)
+
+    def get(self, model: str, system_instruction: str) -> Optional[str]:
+        key = (model, prompt_cache_key(system_instruction))
+        with self._lock:
+            name, expires_at = self._entries.get(key, (None, 0.0))
+            # 요청 도중 만료되지 않도록 1분 여유
+            if time.time() < expires_at - 60:
+                return name
+
+            try:
+                cache = self.client.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        display_name=key[1],
+                        system_instruction=system_instruction,
+                        ttl=f"{self.ttl_sec}s",
+                    ),
+                )
+                self._entries[key] = (cache.name, time.time() + self.ttl_sec)
+                self.logger.info(f"Gemini context cache created for {model}: {cache.name}")
+                return cache.name
+            except Exception as e:
+                self._entries[key] = (None, time.time() + self.retry_after_sec)
+                self.logger.warning(f"Gemini context cache unavailable for {model}, using system_instruction: {e}")
+                return None
@@ -117,6 +117,9 @@ INPUT SCHEMA (FIXED)
   * minimum_amount_per_day: long (-1 = no restriction)
   * tax_benefit: "tax-free" | "separate taxation" | "comprehensive taxation"
   * product_period: List[{period: str, basic_rate: float}]
+- The payload may arrive in compact form: `tax_rate`, `keys` (short column → product_dto field),
+  `cols` and `rows` (one row per product in `cols` order). `periods` rows are [min_months, max_months, basic_rate],
+  null = no limit. Free-text columns may be shortened or omitted.
 
 ================================================================
 OUTPUT SCHEMA (FIXED, JSON ONLY)
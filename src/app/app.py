@@ -1,49 +1,51 @@
+import atexit
 import logging
 import json
-from logging.handlers import RotatingFileHandler
-import sys
 
-from flask import Flask, jsonify, request
+from flask import Blueprint, Flask, current_app, jsonify, request
 from pydantic import ValidationError
 
 from src.app.dto.request.request_front_dto import request_combo_dto
-from src.app.service.ai_service import ai_service
+from src.app.route.json_response import success_response
+from src.app.route.metrics_route import init_request_metrics, metrics_bp
+from src.app.route.recommendation_job_route import recommendation_job_bp
+from src.app.route.recommendation_stream_route import recommendation_stream_bp
+from src.app.service.service_container import get_service_container, service_container
+from src.shared.util import logUtil
 
-app = Flask(__name__)
+recommendation_bp = Blueprint("recommendation", __name__)
 
-def setup_logging():
-    # 루트 로거 설정
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
 
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
+def create_app(container: service_container = None) -> Flask:
+    app = Flask(__name__)
 
-    file_handler = RotatingFileHandler('app.log', maxBytes=10240, backupCount=10)
-    file_handler.setLevel(logging.INFO)
+    # 서비스 컨테이너는 프로세스당 한 번만 생성/워밍하고 종료 시 정리
+    container = container or service_container()
+    container.start()
+    app.extensions["service_container"] = container
+    atexit.register(container.close)
 
-    formatter = logging.Formatter(
-        '%(asctime)s %(levelname)s %(name)s:%(lineno)d - %(message)s'
-    )
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
+    app.register_blueprint(recommendation_bp)
+    app.register_blueprint(recommendation_job_bp)
+    app.register_blueprint(recommendation_stream_bp)
+    app.register_blueprint(metrics_bp)
+    init_request_metrics(app)
+    return app
 
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
 
-    app.logger.setLevel(logging.INFO)
+def setup_logging():
+    # 콘솔 + app.log 회전 파일, 쓰기는 백그라운드 QueueListener 에서 (LOG_* 환경변수로 조정)
+    return logUtil.setup_logging("app.log")
 
-    return root_logger
+def _parse_bool(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
 
-@app.route("/", methods=["GET"])
+@recommendation_bp.route("/", methods=["GET"])
 def health_check():
     return "connect"
 
 
-@app.route("/recommendations/gemini", methods=["GET"])
+@recommendation_bp.route("/recommendations/gemini", methods=["GET"])
 def ai_recommend_gemini():
     logger = logging.getLogger(__name__)
     logger.info("AI recommendation request received")
@@ -63,42 +65,28 @@ def ai_recommend_gemini():
         request_dto = request_combo_dto(**request_data)
         logger.info(f"Request DTO created: amount={request_dto.amount}, period={request_dto.period}")
 
-        logger.info("Initializing AI service")
-        ai_service_instance = ai_service()
+        ai_service_instance = get_service_container().ai_service
 
         logger.info("Calling AI service to get recommendations")
-        result = ai_service_instance.get_data(request_dto, model="gemini-2.5-flash")
+        hedge = request.args.get('hedge', type=_parse_bool)
+        result = ai_service_instance.get_data(request_dto, model="gemini-2.5-flash", hedge=hedge)
         logger.info("AI service returned result successfully")
 
-        try:
-            result_dict = result.model_dump()
-            logger.debug("Result converted using model_dump()")
-        except AttributeError:
-            try:
-                result_dict = result.dict()
-                logger.debug("Result converted using dict()")
-            except AttributeError:
-                result_dict = result
-                logger.debug("Result used as-is (already dict)")
-
-        combination_count = len(result_dict.get('combination', [])) if result_dict else 0
+        combination_count = len(result.combination) if result else 0
 
         logger.info(f"Returning successful response with {combination_count} combinations")
-        return jsonify({
-            "status": "success",
-            "data": result_dict
-        }), 200
+        return success_response(result)
 
     except ValidationError as e:
         logger.error(f"Validation error: {e.errors()}")
         return jsonify({"error": e.errors()}), 400
     except Exception as e:
         logger.exception("Unexpected error in ai_recommend")
-        if app.debug:
+        if current_app.debug:
             return jsonify({"error": "internal_error", "detail": str(e)}), 500
         return jsonify({"error": "internal_error"}), 500
 
-@app.route("/recommendations", methods=["GET"])
+@recommendation_bp.route("/recommendations", methods=["GET"])
 def ai_recommend_gpt():
     logger = logging.getLogger(__name__)
     logger.info("AI recommendation request received")
@@ -118,38 +106,64 @@ def ai_recommend_gpt():
         request_dto = request_combo_dto(**request_data)
         logger.info(f"Request DTO created: amount={request_dto.amount}, period={request_dto.period}")
 
-        logger.info("Initializing AI service")
-        ai_service_instance = ai_service()
+        ai_service_instance = get_service_container().ai_service
 
         logger.info("Calling AI service to get recommendations")
-        result = ai_service_instance.get_data(request=request_dto, model="gpt-5-mini")
+        hedge = request.args.get('hedge', type=_parse_bool)
+        result = ai_service_instance.get_data(request=request_dto, model="gpt-5-mini", hedge=hedge)
         logger.info("AI service returned result successfully")
 
-        try:
-            result_dict = result.model_dump()
-            logger.debug("Result converted using model_dump()")
-        except AttributeError:
-            try:
-                result_dict = result.dict()
-                logger.debug("Result converted using dict()")
-            except AttributeError:
-                result_dict = result
-                logger.debug("Result used as-is (already dict)")
-
-        combination_count = len(result_dict.get('combination', [])) if result_dict else 0
+        combination_count = len(result.combination) if result else 0
 
         logger.info(f"Returning successful response with {combination_count} combinations")
-        return jsonify({
-            "status": "success",
-            "data": result_dict
-        }), 200
+        return success_response(result)
 
     except ValidationError as e:
         logger.error(f"Validation error: {e.errors()}")
         return jsonify({"error": e.errors()}), 400
     except Exception as e:
         logger.exception("Unexpected error in ai_recommend")
-        if app.debug:
+        if current_app.debug:
+            return jsonify({"error": "internal_error", "detail": str(e)}), 500
+        return jsonify({"error": "internal_error"}), 500
+
+
+@recommendation_bp.route("/recommendations/optimizer", methods=["GET"])
+def ai_recommend_optimizer():
+    logger = logging.getLogger(__name__)
+    logger.info("Optimizer recommendation request received")
+
+    try:
+        # GET 요청에서 쿼리 파라미터 읽기
+        amount = request.args.get('amount', type=int)
+        period = request.args.get('period')
+        
+        request_data = {
+            'amount': amount,
+            'period': period
+        }
+        logger.info(f"Request data parsed successfully: {request_data}")
+
+        request_dto = request_combo_dto(**request_data)
+        logger.info(f"Request DTO created: amount={request_dto.amount}, period={request_dto.period}")
+
+        ai_service_instance = get_service_container().ai_service
+
+        logger.info("Calling optimizer to get recommendations")
+        result = ai_service_instance.get_data(request=request_dto, model="optimizer")
+        logger.info("AI service returned result successfully")
+
+        combination_count = len(result.combination) if result else 0
+
+        logger.info(f"Returning successful response with {combination_count} combinations")
+        return success_response(result)
+
+    except ValidationError as e:
+        logger.error(f"Validation error: {e.errors()}")
+        return jsonify({"error": e.errors()}), 400
+    except Exception as e:
+        logger.exception("Unexpected error in ai_recommend_optimizer")
+        if current_app.debug:
             return jsonify({"error": "internal_error", "detail": str(e)}), 500
         return jsonify({"error": "internal_error"}), 500
 
@@ -158,4 +172,6 @@ if __name__ == "__main__":
     logger = setup_logging()
     logger.info("========== Application Starting ===========")
 
+    app = create_app()
+    app.logger.setLevel(logging.INFO)
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+asyncio 서빙 경로 (ASGI)
+- Flask 앱과 같은 엔드포인트/응답 형식을 제공하되, 요청 하나가 스레드를 점유하지 않음
+- DB 는 aiomysql, LLM 은 AsyncOpenAI / genai client.aio 사용
+실행: uvicorn src.app.asgi_app:app --host 0.0.0.0 --port 5000
+"""
+import json
+import logging
+import os
+import time
+from urllib.parse import parse_qs
+
+from pydantic import ValidationError
+
+from src.app.dto.request.request_front_dto import request_combo_dto
+from src.app.route.metrics_route import REQUEST_LATENCY
+from src.app.service.service_container import service_container
+from src.shared.util.metricsUtil import CONTENT_TYPE, REGISTRY
+
+container = service_container()
+debug = os.getenv("APP_DEBUG", "false").lower() in ("1", "true", "yes")
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    started_at = time.perf_counter()
+    status = {"code": 500}
+
+    async def send_and_track(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+        await send(message)
+
+    route = ROUTES.get((scope["method"], scope["path"]))
+    try:
+        if route is None:
+            await _send_json(send_and_track, 404, {"error": "not_found"})
+            return
+        await route(scope, send_and_track)
+    finally:
+        # ROUTES 는 고정 경로라 path 를 그대로 라벨로 사용
+        REQUEST_LATENCY.observe(time.perf_counter() - started_at, method=scope["method"],
+                                route=scope["path"] if route is not None else "unmatched", status=status["code"])
+
+
+async def _lifespan(receive, send):
+    logger = logging.getLogger(__name__)
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await container.start_async()
+            except Exception as e:
+                logger.exception("Service container startup failed")
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await container.close_async()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def health_check(scope, send):
+    await _send(send, 200, b"connect", content_type=b"text/plain; charset=utf-8")
+
+
+async def metrics(scope, send):
+    await _send(send, 200, REGISTRY.render().encode("utf-8"), content_type=CONTENT_TYPE.encode())
+
+
+async def ai_recommend_gpt(scope, send):
+    await _recommend(scope, send, model="gpt-5-mini")
+
+
+async def ai_recommend_gemini(scope, send):
+    await _recommend(scope, send, model="gemini-2.5-flash")
+
+
+async def ai_recommend_optimizer(scope, send):
+    await _recommend(scope, send, model="optimizer")
+
+
+async def _recommend(scope, send, model: str):
+    logger = logging.getLogger(__name__)
+    logger.info("AI recommendation request received (async)")
+
+    try:
+        query = parse_qs(scope.get("query_string", b"").decode())
+        request_data = {
+            'amount': _int_or_none(query.get('amount', [None])[0]),
+            'period': query.get('period', [None])[0],
+        }
+        request_dto = request_combo_dto(**request_data)
+        logger.info(f"Request DTO created: amount={request_dto.amount}, period={request_dto.period}")
+
+        result = await container.ai_service.get_data_async(request=request_dto, model=model)
+        result_dict = result.model_dump(mode="json") if hasattr(result, "model_dump") else result
+
+        combination_count = len(result_dict.get('combination', [])) if result_dict else 0
+        logger.info(f"Returning successful response with {combination_count} combinations")
+        await _send_json(send, 200, {"status": "success", "data": result_dict})
+
+    except ValidationError as e:
+        logger.error(f"Validation error: {e.errors()}")
+        await _send_json(send, 400, {"error": json.loads(e.json())})
+    except Exception as e:
+        logger.exception("Unexpected error in ai_recommend (async)")
+        if debug:
+            await _send_json(send, 500, {"error": "internal_error", "detail": str(e)})
+            return
+        await _send_json(send, 500, {"error": "internal_error"})
+
+
+def _int_or_none(value):
+    # Flask request.args.get(type=int) 와 동일하게 변환 실패 시 None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _send_json(send, status: int, body: dict):
+    await _send(send, status, json.dumps(body, ensure_ascii=False).encode("utf-8"), content_type=b"application/json")
+
+
+async def _send(send, status: int, body: bytes, content_type: bytes):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+ROUTES = {
+    ("GET", "/"): health_check,
+    ("GET", "/metrics"): metrics,
+    ("GET", "/recommendations"): ai_recommend_gpt,
+    ("GET", "/recommendations/gemini"): ai_recommend_gemini,
+    ("GET", "/recommendations/optimizer"): ai_recommend_optimizer,
+}
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List
+
+class allocation_dto(BaseModel):
+    uuid: str
+    type: str # "deposit" | "savings"
+    start_month: int # 시작 월(1-base)
+    end_month: int # 종료 월(1-base, 포함)
+    allocated_amount: int # 해당 상품에 할당된 총 금액
+
+class allocation_combination_dto(BaseModel):
+    combination_id: str
+    allocations: List[allocation_dto]
+
+class response_allocation_dto(BaseModel):
+    total_payment: int
+    combination: List[allocation_combination_dto]
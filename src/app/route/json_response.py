@@ -0,0 +1,46 @@
+import gzip
+import json
+import os
+
+from flask import Response, request
+from pydantic import BaseModel
+
+try:
+    import brotli
+except ImportError:  # brotli 는 선택 의존성, 없으면 gzip 만 사용
+    brotli = None
+
+MIN_COMPRESS_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
+
+def dump_json_bytes(result) -> bytes:
+    # pydantic 모델은 model_dump_json 으로 dict 변환 없이 바로 직렬화 (pydantic-core, Rust)
+    if isinstance(result, BaseModel):
+        return result.model_dump_json().encode("utf-8")
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def success_response(result, status: int = 200) -> Response:
+    """
+    {"status": "success", "data": ...} 응답을 JSON 바이트로 바로 조립
+    jsonify(result.model_dump()) 처럼 dict 로 한 번, json 인코딩으로 한 번 더 순회하지 않음
+    """
+    body = b'{"status":"success","data":' + dump_json_bytes(result) + b'}'
+    return compressed_response(body, status=status)
+
+
+def compressed_response(body: bytes, status: int = 200, mimetype: str = "application/json") -> Response:
+    # Accept-Encoding 협상: br(brotli 설치 시) > gzip > 무압축
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif accepted["gzip"]:
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(body, status=status, mimetype=mimetype, headers=headers)
@@ -0,0 +1,32 @@
+import time
+
+from flask import Blueprint, Flask, Response, g, request
+
+from src.shared.util.metricsUtil import CONTENT_TYPE, REGISTRY
+
+metrics_bp = Blueprint("metrics", __name__)
+
+# route 라벨은 URL 규칙(/recommendations/jobs/<job_id>)이라 job_id 마다 시계열이 늘지 않음
+REQUEST_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency",
+                                     ("method", "route", "status"))
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+def init_request_metrics(app: Flask):
+    # SSE 스트리밍 응답은 Response 객체를 돌려준 시점(첫 바이트 전)까지만 측정됨
+    @app.before_request
+    def _start_timer():
+        g.metrics_started_at = time.perf_counter()
+
+    @app.after_request
+    def _observe_latency(response):
+        started_at = g.pop("metrics_started_at", None)
+        if started_at is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            REQUEST_LATENCY.observe(time.perf_counter() - started_at, method=request.method, route=route,
+                                    status=response.status_code)
+        return response
@@ -0,0 +1,98 @@
+import logging
+import os
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from pydantic import ValidationError
+
+from src.app.dto.request.request_front_dto import request_combo_dto
+from src.app.service.ai_service import SUPPORTED_MODELS
+from src.app.service.recommendation_job import TERMINAL_STATUSES, job_queue_full_error
+from src.app.service.service_container import get_service_container
+from src.app.util.sse_util import encode_sse
+
+recommendation_job_bp = Blueprint("recommendation_job", __name__)
+
+DEFAULT_JOB_MODEL = "gpt-5-mini"
+SSE_HEARTBEAT_SEC = float(os.getenv("RECOMMENDATION_JOB_SSE_HEARTBEAT", "15"))
+
+
+@recommendation_job_bp.route("/recommendations/jobs", methods=["POST"])
+def submit_recommendation_job():
+    logger = logging.getLogger(__name__)
+    logger.info("AI recommendation job request received")
+
+    try:
+        # 쿼리 파라미터 또는 JSON body 둘 다 허용
+        body = request.get_json(silent=True) or {}
+        request_data = {
+            'amount': request.args.get('amount', type=int, default=body.get('amount')),
+            'period': request.args.get('period', default=body.get('period')),
+        }
+        model = request.args.get('model', default=body.get('model', DEFAULT_JOB_MODEL))
+        request_dto = request_combo_dto(**request_data)
+
+        if model not in SUPPORTED_MODELS:
+            return jsonify({"error": f"unsupported model: {model}"}), 400
+
+        job = get_service_container().job_manager.submit(request=request_dto, model=model)
+        logger.info(f"Recommendation job accepted: {job.job_id}")
+        return jsonify({
+            "status": "accepted",
+            "data": {
+                "job_id": job.job_id,
+                "job_status": job.status.value,
+                "status_url": f"/recommendations/jobs/{job.job_id}",
+                "events_url": f"/recommendations/jobs/{job.job_id}/events",
+            }
+        }), 202
+
+    except ValidationError as e:
+        logger.error(f"Validation error: {e.errors()}")
+        return jsonify({"error": e.errors()}), 400
+    except job_queue_full_error as e:
+        logger.warning(str(e))
+        return jsonify({"error": "too_many_jobs"}), 429
+    except Exception as e:
+        logger.exception("Unexpected error in submit_recommendation_job")
+        if current_app.debug:
+            return jsonify({"error": "internal_error", "detail": str(e)}), 500
+        return jsonify({"error": "internal_error"}), 500
+
+
+@recommendation_job_bp.route("/recommendations/jobs/<job_id>", methods=["GET"])
+def get_recommendation_job(job_id: str):
+    job = get_service_container().job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "job_not_found"}), 404
+    return jsonify({"status": "success", "data": job.to_dict()}), 200
+
+
+@recommendation_job_bp.route("/recommendations/jobs/<job_id>/events", methods=["GET"])
+def stream_recommendation_job(job_id: str):
+    job_manager = get_service_container().job_manager
+    if job_manager.get(job_id) is None:
+        return jsonify({"error": "job_not_found"}), 404
+
+    def events():
+        revision = -1
+        while True:
+            job = job_manager.wait_for_change(job_id, revision=revision, timeout=SSE_HEARTBEAT_SEC)
+            if job is None:
+                yield encode_sse("error", {"error": "job_not_found"})
+                return
+            if job.revision == revision:
+                # 변화 없음: 프록시가 연결을 끊지 않도록 heartbeat 주석 전송
+                yield ": keep-alive\n\n"
+                continue
+
+            revision = job.revision
+            terminal = job.status in TERMINAL_STATUSES
+            yield encode_sse("result" if terminal else "status", job.to_dict(include_result=terminal))
+            if terminal:
+                return
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,69 @@
+import json
+import logging
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from pydantic import BaseModel, ValidationError
+
+from src.app.dto.request.request_front_dto import request_combo_dto
+from src.app.service.ai_service import SUPPORTED_MODELS
+from src.app.service.service_container import get_service_container
+from src.app.util.sse_util import encode_sse
+
+recommendation_stream_bp = Blueprint("recommendation_stream", __name__)
+
+DEFAULT_STREAM_MODEL = "gpt-5-mini"
+
+
+@recommendation_stream_bp.route("/recommendations/stream", methods=["GET"])
+def ai_recommend_stream():
+    """
+    조합이 완성되는 대로 내려주는 스트리밍 추천
+    - format=ndjson (기본): 한 줄에 {"event": ..., "data": ...}
+    - format=sse 또는 Accept: text/event-stream: server-sent events
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("AI recommendation stream request received")
+
+    try:
+        request_data = {
+            'amount': request.args.get('amount', type=int),
+            'period': request.args.get('period'),
+        }
+        request_dto = request_combo_dto(**request_data)
+    except ValidationError as e:
+        logger.error(f"Validation error: {e.errors()}")
+        return jsonify({"error": e.errors()}), 400
+
+    model = request.args.get('model', DEFAULT_STREAM_MODEL)
+    if model not in SUPPORTED_MODELS:
+        return jsonify({"error": f"unsupported model: {model}"}), 400
+
+    use_sse = (request.args.get('format') == 'sse'
+               or request.accept_mimetypes.best == 'text/event-stream')
+    encode = encode_sse if use_sse else _encode_ndjson
+    service = get_service_container().ai_service
+    debug = current_app.debug
+
+    def events():
+        try:
+            for event, data in service.stream_data(request=request_dto, model=model):
+                if isinstance(data, BaseModel):
+                    data = data.model_dump(mode="json")
+                yield encode(event, data)
+        except Exception as e:
+            # 이미 200 헤더를 보낸 뒤이므로 에러도 이벤트로 전달
+            logger.exception("Unexpected error in ai_recommend_stream")
+            error = {"error": "internal_error"}
+            if debug:
+                error["detail"] = str(e)
+            yield encode("error", error)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _encode_ndjson(event: str, data: dict) -> str:
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
@@ -1,67 +1,235 @@
+import asyncio
 import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Iterator
 
 from src.app.ai.ai_gemini import ai_gemini
 from src.app.ai.ai_gpt import ai_gpt
+from src.app.ai.prompt_allocation_eng import PROMPT_ALLOCATION_ENG
 from src.app.dto.request.request_front_dto import request_combo_dto
+from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.app.dto.response.response_allocation_dto import allocation_combination_dto, response_allocation_dto
+from src.app.service.catalog_snapshot import catalog_store
+from src.app.service.combination_stream_parser import combination_stream_parser
+from src.app.service.interest_engine import interest_engine
+from src.app.service.payload_compactor import payload_compactor
+from src.app.service.portfolio_optimizer import portfolio_optimizer
+from src.app.service.recommendation_cache import recommendation_cache, recommendation_cache_key
+from src.app.service.recommendation_grid import recommendation_grid
+from src.app.service.recommendation_validator import recommendation_infeasible_error, recommendation_validator
+from src.app.service.single_flight import async_single_flight, single_flight
+from src.shared.db.catalog.CatalogVersionRepository import CatalogVersionRepository
 from src.shared.db.product.productRepository import ProductRepository
+from src.shared.db.util.MysqlPool import MysqlPool
 from src.shared.db.util.MysqlUtil import MysqlUtil
+from src.shared.util.periodUtil import horizon_months
+
+GEMINI_MODELS = ("gemini-2.5-flash", "gemini-2.5-pro")
+GPT_MODELS = ("gpt-5", "gpt-5-mini")
+# LLM 없이 조합 최적화로 바로 계산하는 모드
+OPTIMIZER_MODEL = "optimizer"
+SUPPORTED_MODELS = GEMINI_MODELS + GPT_MODELS + (OPTIMIZER_MODEL,)
+# 헤지 모드에서 함께 경쟁시킬 다른 provider 모델
+HEDGE_PARTNERS = {
+    "gpt-5-mini": "gemini-2.5-flash",
+    "gpt-5": "gemini-2.5-pro",
+    "gemini-2.5-flash": "gpt-5-mini",
+    "gemini-2.5-pro": "gpt-5",
+}
 
 class ai_service:
-    def __init__(self):
-        self.mysqlUtil = MysqlUtil()
+    def __init__(self, mysqlUtil: MysqlUtil = None, gemini: ai_gemini = None, gpt: ai_gpt = None,
+                 mysql_pool: MysqlPool = None, product_repository: ProductRepository = None,
+                 cache: recommendation_cache = None, grid: recommendation_grid = None,
+                 catalog: catalog_store = None):
+        # 의존성을 주입받으면 재사용하고, 없으면 기존처럼 직접 생성
+        self.mysqlUtil = mysqlUtil or MysqlUtil()
+        self.mysql_pool = mysql_pool
+        # asyncio 경로에서만 사용하는 aiomysql 풀 (service_container.start_async 에서 설정)
+        self.async_mysql_pool = None
         self.logger = logging.getLogger(__name__)
-        self.gemini = ai_gemini()
-        self.gpt = ai_gpt()
+        self.gemini = gemini or ai_gemini()
+        self.gpt = gpt or ai_gpt()
+        self.product_repository = product_repository or ProductRepository()
+        self.catalog_version_repository = CatalogVersionRepository()
+        self.cache = cache
+        # 크롤링 후 미리 계산된 추천 그리드 (없으면 항상 실시간 생성)
+        self.grid = grid
+        # 인메모리 카탈로그 스냅샷 (없으면 요청마다 DB 조회)
+        self.catalog = catalog
+        # 동일 요청(키 + 카탈로그 버전)이 동시에 들어오면 한 번만 생성
+        self.single_flight = single_flight()
+        self.async_single_flight = async_single_flight()
+        self.interest_engine = interest_engine()
+        # LLM 결과 검증/보정: 파생 값은 재계산, 배분이 불가능할 때만 최대 regenerate_max 번 재생성
+        self.validator = recommendation_validator(engine=self.interest_engine)
+        self.regenerate_max = int(os.getenv("AI_REGENERATE_MAX", "1"))
+        # 생성 한 건(재생성/재시도/대체 모델 포함)의 전체 마감, LlmGateway 와 SDK 타임아웃까지 전달 (0 이면 없음)
+        self.deadline_sec = float(os.getenv("AI_REQUEST_DEADLINE_SEC", "300"))
+        # 헤지 모드: 두 번째 provider 를 hedge_delay_sec 뒤(0 이면 즉시) 띄우고 먼저 검증을 통과한 결과 사용
+        self.hedge_enabled = os.getenv("AI_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.hedge_delay_sec = float(os.getenv("AI_HEDGE_DELAY_SEC", "15"))
+        self._hedge_executor: ThreadPoolExecutor = None
+        self._hedge_lock = threading.Lock()
+        # 배분 전용 모드: LLM 은 상품 배분만 고르고 monthly_plan/timeline/이자는 interest_engine 이 계산
+        self.allocation_only = os.getenv("AI_ALLOCATION_ONLY", "true").lower() in ("1", "true", "yes")
+        self.optimizer = portfolio_optimizer(engine=self.interest_engine)
+        # optimizer 가 실행 가능한 조합을 못 찾으면 이 LLM 모델로 대체 (빈 값이면 실패 처리)
+        self.optimizer_fallback_model = os.getenv("OPTIMIZER_FALLBACK_MODEL", "gpt-5-mini")
+        # LLM 입력을 모델별 토큰 예산 안으로 압축 (짧은 키 + 표 형식)
+        compaction_enabled = os.getenv("PAYLOAD_COMPACTION_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.compactor = payload_compactor() if compaction_enabled else None
         self.logger.info("AI service initialized")
 
-    def get_data(self, request: request_combo_dto, model:str):
-        self.logger.info(f"Starting AI recommendation process for amount: {request.amount}, period: {request.period}")
-        
+    def catalog_version(self) -> int:
+        with self.db_connection() as connection:
+            return self.catalog_version_repository.get_version(connection)
+
+    @contextmanager
+    def db_connection(self):
+        if self.mysql_pool is not None:
+            with self.mysql_pool.connection() as connection:
+                self.logger.debug("Database connection acquired from pool")
+                yield connection
+            return
+
         connection = self.mysqlUtil.get_connection()
         self.logger.debug("Database connection established")
+        try:
+            yield connection
+        finally:
+            try:
+                connection.close()
+                self.logger.debug("Database connection closed")
+            except Exception as e:
+                self.logger.warning(f"Error closing database connection: {str(e)}")
+
+    def _current_catalog_version(self) -> int:
+        if self.cache is not None:
+            return self.cache.current_version()
+        return self.catalog_version()
+
+    def _request_key(self, request: request_combo_dto, model: str) -> str:
+        return recommendation_cache_key(request, model, self._current_catalog_version())
 
+    def _from_grid(self, request: request_combo_dto, model: str):
+        if self.grid is None:
+            return None
         try:
-            period_str = (
-                request.period.value if hasattr(request.period, "value")
-                else str(request.period)
-            )
-            self.logger.info(f"Period extracted: {period_str}")
-
-            if period_str == "SHORT":
-                top_n = 10
-            elif period_str == "MID":
-                top_n = 20
-            elif period_str == "LONG":
-                top_n = 30
-            else:
-                self.logger.error(f"Invalid period value: {period_str}")
-                raise ValueError(f"Invalid period: {period_str}")
+            catalog_version = self._current_catalog_version()
+            with self.db_connection() as connection:
+                result = self.grid.lookup(connection, request=request, model=model, catalog_version=catalog_version)
+            if result is None:
+                return None
+            # 버킷 금액에서 스케일한 배분은 상품 최소/최대/월 한도를 벗어날 수 있으므로 실시간 결과와 같이 검증/보정
+            return self.validator.repair(result, request, self._load_payload(request))
+        except recommendation_infeasible_error as e:
+            self.logger.info(f"Scaled grid result infeasible for amount {request.amount}, "
+                             f"falling back to live generation: {e}")
+            return None
+        except Exception as e:
+            self.logger.warning(f"Recommendation grid lookup failed, falling back to live generation: {e}")
+            return None
+
+    def generate_live(self, request: request_combo_dto, model: str, hedge: bool = None):
+        # 캐시/그리드를 거치지 않는 실시간 생성 (그리드 사전 계산용)
+        return self._generate(request=request, model=model, hedge=hedge)
+
+    def get_data(self, request: request_combo_dto, model:str, hedge: bool = None):
+        self.logger.info("Starting AI recommendation process for amount: %s, period: %s",
+                         request.amount, request.period)
+
+        try:
+            request_key = self._request_key(request, model)
+        except Exception as e:
+            self.logger.warning(f"Request key lookup failed, calling AI directly without cache/coalescing: {e}")
+            return self._generate(request=request, model=model, hedge=hedge)
+
+        if self.cache is not None:
+            cached = self.cache.get(request_key)
+            if cached is not None:
+                self.logger.info("Recommendation cache hit: %s", request_key)
+                return cached
+
+        def generate_and_store():
+            result = self._from_grid(request, model) or self._generate(request=request, model=model, hedge=hedge)
+            if self.cache is not None and result:
+                self.cache.set(request_key, result)
+            return result
 
-            self.logger.info(f"Selected top_n products: {top_n} for period {period_str}")
+        return self.single_flight.do(request_key, generate_and_store)
 
-            self.logger.info("Building AI payload from database")
-            product_repository = ProductRepository()
-            payload = product_repository.build_ai_payload(
+    def _top_n(self, request: request_combo_dto) -> int:
+        period_str = (
+            request.period.value if hasattr(request.period, "value")
+            else str(request.period)
+        )
+        self.logger.info("Period extracted: %s", period_str)
+
+        if period_str == "SHORT":
+            top_n = 10
+        elif period_str == "MID":
+            top_n = 20
+        elif period_str == "LONG":
+            top_n = 30
+        else:
+            self.logger.error(f"Invalid period value: {period_str}")
+            raise ValueError(f"Invalid period: {period_str}")
+
+        self.logger.info("Selected top_n products: %s for period %s", top_n, period_str)
+        return top_n
+
+    def _merge(self, request: request_combo_dto, payload, model: str) -> dict:
+        self.logger.info("AI payload built successfully with %s products", len(payload.products))
+
+        if self.compactor is not None:
+            return self.compactor.compact(request, payload, model)
+
+        merged_data = {
+            "request_info": request.model_dump(mode="json"),
+            "db_payload": payload.model_dump(mode="json")
+        }
+        self.logger.debug("Data merged for AI processing: request_amount=%s", request.amount)
+        return merged_data
+
+    def _load_payload(self, request: request_combo_dto):
+        top_n = self._top_n(request)
+
+        if self.catalog is not None:
+            try:
+                return self.catalog.build_payload(request, top_n)
+            except Exception as e:
+                self.logger.warning(f"Catalog snapshot unavailable, building payload from database: {e}")
+
+        self.logger.info("Building AI payload from database")
+        with self.db_connection() as connection:
+            return self.product_repository.build_ai_payload(
                 connection=connection,
+                request=request,
                 top_n=top_n
             )
-            self.logger.info(f"AI payload built successfully with {len(payload.products)} products")
 
-            merged_data = {
-                "request_info": request.model_dump(mode="json"),
-                "db_payload": payload.model_dump(mode="json")
-            }
-            self.logger.debug(f"Data merged for AI processing: request_amount={request.amount}")
+    def _generate(self, request: request_combo_dto, model: str, hedge: bool = None):
+        try:
+            payload = self._load_payload(request)
+            if model == OPTIMIZER_MODEL:
+                result, model = self._optimize(request, payload)
+                if result is not None:
+                    return result
+            merged_data = self._merge(request, payload, model)
 
             self.logger.info("Sending data to AI for recommendation generation")
 
             #############################ai##############################
-            result=""
-
-            if model == "gemini-2.5-flash" or model == "gemini-2.5-pro":
-                result = self.gemini.create_response(content=merged_data, model=model)
-            elif model == "gpt-5" or model == "gpt-5-mini":
-                result = self.gpt.create_response(content=merged_data, model=model)
+            use_hedge = self.hedge_enabled if hedge is None else hedge
+            if use_hedge and model in HEDGE_PARTNERS:
+                result = self._call_hedged(request, payload, merged_data, model)
+            else:
+                result = self._call_model(request, payload, merged_data, model)
             self.logger.info("AI recommendation generation completed successfully")
             
             return result
@@ -69,9 +237,287 @@ class ai_service:
         except Exception as e:
             self.logger.error(f"Error in AI service processing: {str(e)}")
             raise
-        finally:
+
+    def _client(self, model: str):
+        if model in GEMINI_MODELS:
+            return self.gemini
+        if model in GPT_MODELS:
+            return self.gpt
+        raise ValueError(f"Unsupported model: {model}")
+
+    def _optimize(self, request: request_combo_dto, payload):
+        try:
+            return self.optimizer.optimize(request, payload), None
+        except ValueError as e:
+            if not self.optimizer_fallback_model:
+                raise
+            self.logger.warning(f"Optimizer failed, falling back to {self.optimizer_fallback_model}: {e}")
+            return None, self.optimizer_fallback_model
+
+    def _deadline(self):
+        return time.monotonic() + self.deadline_sec if self.deadline_sec > 0 else None
+
+    def _call_model(self, request: request_combo_dto, payload, merged_data: dict, model: str,
+                    cancel_event: threading.Event = None):
+        # 검증/보정을 통과할 때까지 호출, 배분 자체가 불가능한 응답만 다시 생성
+        deadline = self._deadline()
+        last_error: Exception = None
+        for attempt in range(self.regenerate_max + 1):
+            result = self._request_model(payload, merged_data, model, cancel_event, deadline)
             try:
-                connection.close()
-                self.logger.debug("Database connection closed")
-            except Exception as e:
-                self.logger.warning(f"Error closing database connection: {str(e)}")
+                return self.validator.repair(result, request, payload)
+            except recommendation_infeasible_error as e:
+                last_error = e
+                self.logger.warning(f"Infeasible allocation from {model} "
+                                    f"(attempt {attempt + 1}/{self.regenerate_max + 1}): {e}")
+        raise last_error
+
+    def _request_model(self, payload, merged_data: dict, model: str, cancel_event: threading.Event = None,
+                       deadline: float = None):
+        client = self._client(model)
+        if not self.allocation_only:
+            return client.create_response(content=merged_data, model=model, cancel_event=cancel_event,
+                                          deadline=deadline)
+
+        allocation = client.create_response(content=merged_data, model=model, cancel_event=cancel_event,
+                                            prompt=PROMPT_ALLOCATION_ENG, response_schema=response_allocation_dto,
+                                            deadline=deadline)
+        return self.interest_engine.build_response(allocation, payload)
+
+    def close(self):
+        with self._hedge_lock:
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False, cancel_futures=True)
+                self._hedge_executor = None
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("AI_HEDGE_WORKERS", "16")), thread_name_prefix="ai-hedge")
+            return self._hedge_executor
+
+    def _call_hedged(self, request: request_combo_dto, payload, merged_data: dict, model: str):
+        """
+        primary 모델을 먼저 실행하고 hedge_delay_sec 안에 유효한 결과가 없으면 partner 모델도 실행
+        먼저 스키마/산술 검증을 통과한 결과를 반환하고, 진 쪽은 cancel_event 로 재시도를 멈춤
+        (이미 진행 중인 HTTP 호출 자체는 끊을 수 없어 결과만 버림)
+        """
+        partner = HEDGE_PARTNERS[model]
+        cancel_event = threading.Event()
+        pool = self._hedge_pool()
+
+        pending = {pool.submit(self._call_model, request, payload, merged_data, model, cancel_event): model}
+        partner_started = False
+        last_error: Exception = None
+
+        try:
+            while pending:
+                timeout = None if partner_started else self.hedge_delay_sec
+                done, _ = wait(pending.keys(), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    winner = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        last_error = e
+                        self.logger.warning(f"Hedged generation failed on {winner}: {e}")
+                        continue
+                    if self.validator.is_valid(result, request, payload):
+                        self.logger.info("Hedged generation won by %s", winner)
+                        return result
+                    last_error = ValueError(f"{winner} returned an invalid recommendation")
+
+                if not partner_started and (not done or not pending):
+                    # 지연 시간이 지났거나 primary 가 실패/검증 탈락 → partner 투입
+                    self.logger.info("Launching hedge request on %s", partner)
+                    pending[pool.submit(self._call_model, request, payload, merged_data, partner, cancel_event)] = partner
+                    partner_started = True
+        finally:
+            cancel_event.set()
+            for future in pending:
+                future.cancel()
+
+        raise last_error or RuntimeError("Hedged generation produced no result")
+
+    def stream_data(self, request: request_combo_dto, model: str) -> Iterator[tuple[str, object]]:
+        """
+        스트리밍 추천: ("combination", combination_dto) 를 완성되는 대로 내보내고
+        마지막에 ("summary", {...}) 를 내보냄. 완성된 전체 결과는 캐시에 저장
+        """
+        self.logger.info("Starting AI recommendation stream for amount: %s, period: %s",
+                         request.amount, request.period)
+
+        request_key = None
+        try:
+            request_key = self._request_key(request, model)
+        except Exception as e:
+            self.logger.warning(f"Request key lookup failed, streaming without cache: {e}")
+
+        if self.cache is not None and request_key is not None:
+            cached = self.cache.get(request_key)
+            if cached is not None:
+                self.logger.info("Recommendation cache hit (stream): %s", request_key)
+                for combination in cached.combination:
+                    yield "combination", combination
+                yield "summary", self._summary(cached, cached=True)
+                return
+
+        grid_result = self._from_grid(request, model)
+        if grid_result is not None:
+            if self.cache is not None and request_key is not None:
+                self.cache.set(request_key, grid_result)
+            for combination in grid_result.combination:
+                yield "combination", combination
+            yield "summary", self._summary(grid_result, cached=True)
+            return
+
+        payload = self._load_payload(request)
+        if model == OPTIMIZER_MODEL:
+            result, model = self._optimize(request, payload)
+            if result is not None:
+                if self.cache is not None and request_key is not None:
+                    self.cache.set(request_key, result)
+                for combination in result.combination:
+                    yield "combination", combination
+                yield "summary", self._summary(result, cached=False)
+                return
+        merged_data = self._merge(request, payload, model)
+        client = self._client(model)
+        if self.allocation_only:
+            chunks = client.create_response_stream(content=merged_data, model=model, prompt=PROMPT_ALLOCATION_ENG,
+                                                   response_schema=response_allocation_dto,
+                                                   deadline=self._deadline())
+            parser = combination_stream_parser(item_model=allocation_combination_dto)
+        else:
+            chunks = client.create_response_stream(content=merged_data, model=model, deadline=self._deadline())
+            parser = combination_stream_parser()
+
+        # 스트리밍은 이미 내보낸 조합을 되돌릴 수 없어 재생성 대신 조합 단위로 보정/제외
+        products = {p.product_uuid: p for p in payload.products}
+        horizon = horizon_months(request.period)
+        streamed = []
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                try:
+                    combination = (self.interest_engine.build_from_allocation(item, payload)
+                                   if self.allocation_only else item)
+                    combination = self.validator.repair_combination(combination, int(request.amount), products,
+                                                                    payload.tax_rate, horizon)
+                except ValueError as e:
+                    self.logger.warning(f"Skipping streamed combination {item.combination_id}: {e}")
+                    continue
+                streamed.append(combination)
+                self.logger.info("Streamed combination #%s: %s", len(streamed), combination.combination_id)
+                yield "combination", combination
+
+        # 내보낸 조합(streamed)이 결과 기준, 파서는 응답이 끝까지 왔는지만 확인
+        parser.finish()
+        if not streamed:
+            raise recommendation_infeasible_error("stream produced no feasible combination")
+        period_months = max(max(t.month for t in c.timeline) + 1 for c in streamed)
+        result = response_ai_dto(total_payment=int(request.amount), period_months=period_months,
+                                 combination=streamed)
+        self.logger.info("AI recommendation stream completed: %s combinations", len(result.combination))
+        if self.cache is not None and request_key is not None:
+            self.cache.set(request_key, result)
+        yield "summary", self._summary(result, cached=False)
+
+    def _summary(self, result, cached: bool) -> dict:
+        return {
+            "total_payment": result.total_payment,
+            "period_months": result.period_months,
+            "combination_count": len(result.combination),
+            "cached": cached,
+        }
+
+    async def get_data_async(self, request: request_combo_dto, model: str):
+        # asyncio 서빙 경로: DB 는 aiomysql, LLM 은 비동기 클라이언트 사용
+        self.logger.info("Starting AI recommendation process (async) for amount: %s, period: %s",
+                         request.amount, request.period)
+
+        # 캐시 버전 조회/파일 백엔드는 짧은 블로킹 I/O 라 스레드로 넘김
+        try:
+            request_key = await asyncio.to_thread(self._request_key, request, model)
+        except Exception as e:
+            self.logger.warning(f"Request key lookup failed, calling AI directly without cache/coalescing: {e}")
+            return await self._generate_async(request=request, model=model)
+
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, request_key)
+            if cached is not None:
+                self.logger.info("Recommendation cache hit: %s", request_key)
+                return cached
+
+        async def generate_and_store():
+            result = await asyncio.to_thread(self._from_grid, request, model)
+            if result is None:
+                result = await self._generate_async(request=request, model=model)
+            if self.cache is not None and result:
+                await asyncio.to_thread(self.cache.set, request_key, result)
+            return result
+
+        return await self.async_single_flight.do(request_key, generate_and_store)
+
+    async def _generate_async(self, request: request_combo_dto, model: str):
+        if self.async_mysql_pool is None:
+            raise RuntimeError("async MySQL pool is not initialized")
+
+        try:
+            top_n = self._top_n(request)
+
+            payload = None
+            if self.catalog is not None:
+                try:
+                    # 평소에는 메모리 선택만, 버전이 바뀐 직후의 재적재(동기 DB 조회)만 스레드에서 실행
+                    payload = await asyncio.to_thread(self.catalog.build_payload, request, top_n)
+                except Exception as e:
+                    self.logger.warning(f"Catalog snapshot unavailable, building payload from database: {e}")
+
+            if payload is None:
+                self.logger.info("Building AI payload from database (async)")
+                async with self.async_mysql_pool.acquire() as connection:
+                    payload = await self.product_repository.build_ai_payload_async(
+                        connection=connection,
+                        request=request,
+                        top_n=top_n
+                    )
+            if model == OPTIMIZER_MODEL:
+                # 수 ms 짜리 CPU 계산이라 이벤트 루프에서 바로 실행
+                result, model = self._optimize(request, payload)
+                if result is not None:
+                    return result
+            merged_data = self._merge(request, payload, model)
+
+            self.logger.info("Sending data to AI for recommendation generation (async)")
+            deadline = self._deadline()
+            last_error: Exception = None
+            for attempt in range(self.regenerate_max + 1):
+                result = await self._request_model_async(payload, merged_data, model, deadline)
+                try:
+                    result = self.validator.repair(result, request, payload)
+                except recommendation_infeasible_error as e:
+                    last_error = e
+                    self.logger.warning(f"Infeasible allocation from {model} "
+                                        f"(attempt {attempt + 1}/{self.regenerate_max + 1}): {e}")
+                    continue
+                self.logger.info("AI recommendation generation completed successfully")
+                return result
+
+            raise last_error
+
+        except Exception as e:
+            self.logger.error(f"Error in AI service processing: {str(e)}")
+            raise
+
+    async def _request_model_async(self, payload, merged_data: dict, model: str, deadline: float = None):
+        client = self._client(model)
+        if not self.allocation_only:
+            return await client.create_response_async(content=merged_data, model=model, deadline=deadline)
+
+        allocation = await client.create_response_async(content=merged_data, model=model,
+                                                        prompt=PROMPT_ALLOCATION_ENG,
+                                                        response_schema=response_allocation_dto,
+                                                        deadline=deadline)
+        return self.interest_engine.build_response(allocation, payload)
@@ -0,0 +1,118 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto
+from src.app.dto.request.request_front_dto import request_combo_dto
+from src.shared.util.periodUtil import horizon_months, parse_period_range
+
+
+class catalog_snapshot:
+    """
+    한 카탈로그 버전의 읽기 전용 상품 목록
+    - products 는 max_rate 내림차순, 기간 행별 최소 개월을 미리 파싱해 둠
+    - 한 번 만들어지면 바꾸지 않으므로 요청 스레드들이 잠금 없이 공유
+    """
+
+    def __init__(self, version: int, catalog: ai_payload_dto):
+        self.version = version
+        self.tax_rate = catalog.tax_rate
+        self.products: Tuple[product_dto, ...] = tuple(
+            sorted(catalog.products, key=lambda p: (-p.max_rate, p.product_uuid)))
+        self.min_months: Tuple[Tuple[Optional[int], ...], ...] = tuple(
+            tuple((parse_period_range(pp.period) or (None, None))[0] for pp in p.product_period)
+            for p in self.products
+        )
+
+    def select(self, request: request_combo_dto, top_n: int) -> ai_payload_dto:
+        # ProductRepository.BUILD_AI_PAYLOAD_SQL 과 같은 선택 규칙
+        # (기간 행 min_months <= horizon (None 이면 전부), minimum_amount <= amount, 유형별 순위 순으로 top_n)
+        horizon = horizon_months(request.period)
+        amount = int(request.amount)
+
+        candidates = []
+        type_counts = {}
+        for product, min_months in zip(self.products, self.min_months):
+            if product.minimum_amount > amount:
+                continue
+            periods = [pp for pp, low in zip(product.product_period, min_months) if horizon is None or low is None or low <= horizon]
+            if not periods:
+                continue
+            type_rank = type_counts.get(product.type, 0) + 1
+            type_counts[product.type] = type_rank
+            candidates.append((type_rank, product, periods))
+
+        candidates.sort(key=lambda c: (c[0], -c[1].max_rate))
+        selected = sorted(candidates[:top_n], key=lambda c: (-c[1].max_rate, c[1].product_uuid))
+        return ai_payload_dto(
+            tax_rate=self.tax_rate,
+            products=[product.model_copy(update={"product_period": periods}) for _, product, periods in selected],
+        )
+
+
+class catalog_store:
+    """
+    프로세스 내 카탈로그 스냅샷 보관소
+    - 시작 시 load(), 이후 version_check_sec 마다 카탈로그 버전을 확인해 바뀌었으면 새 스냅샷으로 통째로 교체
+    - 교체는 참조 대입 한 번이라 읽는 쪽은 항상 완전한 스냅샷 하나만 봄
+    - 다시 적재하는 동안 다른 스레드는 이전 스냅샷을 계속 사용
+    """
+
+    def __init__(self, loader: Callable[[], ai_payload_dto], version_loader: Callable[[], int],
+                 version_check_sec: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.loader = loader
+        self.version_loader = version_loader
+        self.version_check_sec = version_check_sec if version_check_sec is not None else float(
+            os.getenv("CATALOG_SNAPSHOT_VERSION_CHECK", "30"))
+        self._snapshot: Optional[catalog_snapshot] = None
+        self._checked_at = 0.0
+        self._reload_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, loader: Callable[[], ai_payload_dto],
+                 version_loader: Callable[[], int]) -> Optional["catalog_store"]:
+        if os.getenv("CATALOG_SNAPSHOT_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        return cls(loader=loader, version_loader=version_loader)
+
+    def load(self) -> catalog_snapshot:
+        with self._reload_lock:
+            return self._reload(self.version_loader())
+
+    def _reload(self, version: int) -> catalog_snapshot:
+        start = time.time()
+        snapshot = catalog_snapshot(version=version, catalog=self.loader())
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        self.logger.info(f"Catalog snapshot loaded: version={version}, {len(snapshot.products)} products "
+                         f"in {time.time() - start:.2f}s")
+        return snapshot
+
+    def current(self) -> catalog_snapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.load()
+        if time.monotonic() - self._checked_at < self.version_check_sec:
+            return snapshot
+
+        # 한 스레드만 버전 확인/재적재, 나머지는 기존 스냅샷 사용
+        if not self._reload_lock.acquire(blocking=False):
+            return snapshot
+        try:
+            self._checked_at = time.monotonic()
+            version = self.version_loader()
+            if version != snapshot.version:
+                self.logger.info(f"Catalog version changed {snapshot.version} -> {version}, reloading snapshot")
+                return self._reload(version)
+            return snapshot
+        except Exception as e:
+            self.logger.warning(f"Catalog snapshot refresh failed, keeping version {snapshot.version}: {e}")
+            return snapshot
+        finally:
+            self._reload_lock.release()
+
+    def build_payload(self, request: request_combo_dto, top_n: int) -> ai_payload_dto:
+        return self.current().select(request, top_n)
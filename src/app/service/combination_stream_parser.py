@@ -0,0 +1,101 @@
+import json
+import logging
+from typing import List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from src.app.dto.response.response_ai_dto import combination_dto
+
+
+class combination_stream_parser:
+    """
+    스트리밍으로 들어오는 response_ai_dto JSON 텍스트를 점진적으로 스캔
+    - 최상위 "combination" 배열 안의 객체 하나가 닫히는 즉시 combination_dto 로 반환
+    - 문자열/이스케이프 상태를 추적하므로 값 안의 괄호는 무시
+    - 형식이 틀린 조합 하나는 건너뛰고 계속, 스트림이 끝나면 finish() 로 JSON 이 닫혔는지만 확인
+      (전체를 다시 검증하면 이미 건너뛴 조합 때문에 스트림 전체가 실패)
+    - item_model 을 바꾸면 같은 구조의 다른 스키마(배분 전용 응답 등)에도 사용
+    """
+
+    def __init__(self, item_model: Type[BaseModel] = combination_dto):
+        self.logger = logging.getLogger(__name__)
+        self.item_model = item_model
+        self._buffer: List[str] = []
+        self._length = 0
+        self._text_cache = ""
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_key: Optional[str] = None
+        self._combination_depth: Optional[int] = None
+        self._object_start: Optional[int] = None
+
+        self.emitted = 0
+
+    def _text(self) -> str:
+        if len(self._text_cache) != self._length:
+            self._text_cache = "".join(self._buffer)
+            self._buffer = [self._text_cache]
+        return self._text_cache
+
+    def feed(self, chunk: str) -> List[BaseModel]:
+        if not chunk:
+            return []
+
+        offset = self._length
+        self._buffer.append(chunk)
+        self._length += len(chunk)
+
+        completed: List[BaseModel] = []
+        for i, ch in enumerate(chunk):
+            position = offset + i
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        # 최상위 객체의 문자열 토큰 = 키 후보
+                        self._last_key = self._text()[self._string_start + 1:position]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = position
+            elif ch == "{" or ch == "[":
+                if ch == "[" and self._depth == 1 and self._last_key == "combination":
+                    self._combination_depth = self._depth + 1
+                elif ch == "{" and self._combination_depth is not None and self._depth == self._combination_depth:
+                    self._object_start = position
+                self._depth += 1
+            elif ch == "}" or ch == "]":
+                self._depth -= 1
+                if self._combination_depth is None:
+                    continue
+                if ch == "}" and self._depth == self._combination_depth and self._object_start is not None:
+                    combination = self._parse_combination(self._text()[self._object_start:position + 1])
+                    self._object_start = None
+                    if combination is not None:
+                        completed.append(combination)
+                elif ch == "]" and self._depth == self._combination_depth - 1:
+                    self._combination_depth = None
+
+        self.emitted += len(completed)
+        return completed
+
+    def _parse_combination(self, raw: str) -> Optional[BaseModel]:
+        try:
+            return self.item_model.model_validate(json.loads(raw))
+        except (json.JSONDecodeError, ValidationError) as e:
+            self.logger.warning(f"Skipping malformed streamed combination: {e}")
+            return None
+
+    def finish(self):
+        # 중간에 끊긴 응답(토큰 한도, 연결 종료)만 실패로 처리
+        if self._length == 0 or self._depth != 0 or self._in_string:
+            raise ValueError("streamed response ended before the JSON closed")
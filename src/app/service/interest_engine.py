@@ -0,0 +1,176 @@
+import calendar
+import datetime
+import logging
+import uuid
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto as payload_product_dto
+from src.app.dto.response.response_ai_dto import (
+    combination_dto, monthly_plan_dto, product_dto, response_ai_dto, timeline_dto,
+)
+from src.app.dto.response.response_allocation_dto import (
+    allocation_combination_dto, allocation_dto, response_allocation_dto,
+)
+
+TAX_FREE_RATE = 0.0
+SEPARATE_TAX_RATE = 15.4
+
+
+def resolve_tax_rate(tax_benefit: str, comprehensive_tax_rate: float) -> float:
+    # PROMPT_ENG 의 TAX MAPPING 과 동일 (DB 값은 한글/영문 혼재)
+    text = (tax_benefit or "").lower()
+    if "tax-free" in text or "비과세" in text:
+        return TAX_FREE_RATE
+    if "separate" in text or "분리과세" in text:
+        return SEPARATE_TAX_RATE
+    return comprehensive_tax_rate
+
+
+def days_in_months(period_months: int, start_date: datetime.date = None) -> np.ndarray:
+    # month 0 = start_date 가 속한 달, ACT/365 계산용 월별 일수
+    start_date = start_date or datetime.date.today()
+    days = np.empty(period_months, dtype=np.float64)
+    year, month = start_date.year, start_date.month
+    for m in range(period_months):
+        days[m] = calendar.monthrange(year, month)[1]
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return days
+
+
+def _round_krw(values: np.ndarray) -> np.ndarray:
+    # 원 단위 반올림 (half-up)
+    return np.floor(values + 0.5).astype(np.int64)
+
+
+class interest_engine:
+    """
+    상품 배분(uuid, type, start_month, end_month, allocated_amount)만으로
+    monthly_plan / timeline / 세후 이자 / 연환산 수익률을 결정적으로 계산 (상품 × 월 NumPy 배열)
+
+    - 예금(deposit): start 월에 전액 납입, start~end 매월 원금 × max_rate × 일수/365 × (1 - 세율)
+    - 적금(savings): start~end 매월 균등 납입(나머지는 앞쪽 달부터 1원씩), 잔액(누적 납입) 기준으로 같은 식
+    - active_product_count: 해당 월 납입액 > 0 인 상품 수
+    - expected_rate: 세후 이자 / Σ(월별 잔액 × 일수/365) × 100, 소수 2자리
+    """
+
+    def __init__(self, start_date: datetime.date = None):
+        self.logger = logging.getLogger(__name__)
+        self.start_date = start_date
+
+    def build_combination(self, allocations: Sequence[allocation_dto], products: Dict[str, payload_product_dto],
+                          comprehensive_tax_rate: float, combination_id: str = None) -> combination_dto:
+        if not allocations:
+            raise ValueError("combination has no allocations")
+        for a in allocations:
+            if a.uuid not in products:
+                raise ValueError(f"unknown product uuid {a.uuid}")
+            if a.start_month < 1 or a.end_month < a.start_month:
+                raise ValueError(f"invalid term {a.start_month}~{a.end_month} for {a.uuid}")
+
+        n = len(allocations)
+        # timeline 은 조합 안에서 가장 늦게 끝나는 상품까지
+        period_months = max(a.end_month for a in allocations)
+        months = np.arange(period_months)
+
+        start = np.array([a.start_month - 1 for a in allocations], dtype=np.int64)[:, None]
+        end = np.array([a.end_month - 1 for a in allocations], dtype=np.int64)[:, None]
+        amount = np.array([a.allocated_amount for a in allocations], dtype=np.int64)
+        # 상품 유형은 LLM 출력보다 카탈로그 값을 우선
+        types = [(products[a.uuid].type or a.type).lower() for a in allocations]
+        is_deposit = np.array([t == "deposit" for t in types])[:, None]
+        rate = np.array([products[a.uuid].max_rate for a in allocations], dtype=np.float64)[:, None] / 100
+        tax = np.array([resolve_tax_rate(products[a.uuid].tax_benefit, comprehensive_tax_rate)
+                        for a in allocations], dtype=np.float64)[:, None] / 100
+
+        active = (months >= start) & (months <= end)
+        term = (end - start + 1).ravel()
+
+        # 납입 행렬: 예금은 시작 월 일시납, 적금은 균등 분할 + 나머지는 앞쪽 달부터 1원씩
+        # (어느 달도 ceil(금액 / 기간)을 넘지 않으므로 월 한도 × 기간 안의 배분은 월 한도도 지킴)
+        monthly = amount // np.maximum(term, 1)
+        remainder = amount - monthly * term
+        savings_payment = monthly[:, None] + ((months - start) < remainder[:, None])
+        payment = np.where(active & ~is_deposit, savings_payment, 0)
+        payment = np.where(is_deposit & (months == start), amount[:, None], payment)
+
+        balance = np.cumsum(payment, axis=1) * active
+        year_fraction = days_in_months(period_months, self.start_date) / 365
+        interest = _round_krw(balance * rate * year_fraction * (1 - tax))
+
+        month_payment = payment.sum(axis=0)
+        month_interest = interest.sum(axis=0)
+        active_count = (payment > 0).sum(axis=0)
+
+        total_interest = int(interest.sum())
+        weighted_balance = float((balance.sum(axis=0) * year_fraction).sum())
+        expected_rate = round(total_interest / weighted_balance * 100, 2) if weighted_balance > 0 else 0.0
+
+        product_list: List[product_dto] = []
+        for i, a in enumerate(allocations):
+            source = products[a.uuid]
+            active_months = months[active[i]]
+            product_list.append(product_dto(
+                uuid=a.uuid,
+                type=types[i],
+                bank_name=source.bank_name,
+                base_rate=source.base_rate,
+                max_rate=source.max_rate,
+                product_name=source.name[:100],
+                product_max_rate=source.max_rate,
+                product_base_rate=source.base_rate,
+                start_month=a.start_month,
+                end_month=a.end_month,
+                allocated_amount=int(a.allocated_amount),
+                monthly_plan=[
+                    monthly_plan_dto(month=int(m), payment=int(payment[i, m]), total_interest=int(interest[i, m]))
+                    for m in active_months
+                ],
+            ))
+
+        cumulative_payment = np.cumsum(month_payment)
+        cumulative_interest = np.cumsum(month_interest)
+        timeline = [
+            timeline_dto(
+                month=int(m),
+                total_monthly_payment=int(month_payment[m]),
+                active_product_count=int(active_count[m]),
+                cumulative_interest=int(cumulative_interest[m]),
+                cumulative_payment=int(cumulative_payment[m]),
+            )
+            for m in months
+        ]
+
+        return combination_dto(
+            combination_id=combination_id or str(uuid.uuid4()),
+            expected_rate=expected_rate,
+            expected_interest_after_tax=total_interest,
+            product=product_list,
+            timeline=timeline,
+        )
+
+    def build_from_allocation(self, combination: allocation_combination_dto, payload: ai_payload_dto) -> combination_dto:
+        products = {p.product_uuid: p for p in payload.products}
+        return self.build_combination(combination.allocations, products, payload.tax_rate,
+                                      combination_id=combination.combination_id)
+
+    def build_response(self, allocation: response_allocation_dto, payload: ai_payload_dto) -> response_ai_dto:
+        """
+        LLM 이 고른 배분(response_allocation_dto)을 기존 response_ai_dto 로 변환
+        잘못된 조합(알 수 없는 uuid, 잘못된 기간)은 로그만 남기고 제외
+        """
+        products = {p.product_uuid: p for p in payload.products}
+
+        result: List[combination_dto] = []
+        for combination in allocation.combination:
+            try:
+                result.append(self.build_combination(combination.allocations, products, payload.tax_rate,
+                                                     combination_id=combination.combination_id))
+            except ValueError as e:
+                self.logger.warning(f"Skipping allocation combination {combination.combination_id}: {e}")
+
+        period_months = max((len(c.timeline) for c in result), default=0)
+        return response_ai_dto(total_payment=allocation.total_payment, period_months=period_months, combination=result)
@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+from typing import Dict, List, Tuple
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto
+from src.app.dto.request.request_front_dto import request_combo_dto
+from src.shared.util.metricsUtil import REGISTRY
+from src.shared.util.periodUtil import parse_period_range
+
+try:
+    import tiktoken
+except ImportError:  # requirements.txt 에 포함, 설치되지 않은 환경에서는 문자 수 기반 근사치 사용
+    tiktoken = None
+
+PAYLOAD_TOKENS = REGISTRY.histogram("payload_tokens", "LLM payload tokens before/after compaction",
+                                    ("model", "stage"),
+                                    buckets=(500, 1000, 2000, 4000, 6000, 8000, 12000, 16000, 32000, 64000))
+
+DEFAULT_TOKEN_BUDGETS = {
+    "gpt-5": 8000,
+    "gpt-5-mini": 6000,
+    "gemini-2.5-flash": 8000,
+    "gemini-2.5-pro": 8000,
+}
+DEFAULT_TOKEN_BUDGET = 6000
+
+# 짧은 컬럼명 → product_dto 필드 (프롬프트에 범례로 함께 전달)
+COLUMNS: List[Tuple[str, str]] = [
+    ("id", "uuid"),
+    ("bank", "bank_name"),
+    ("name", "name"),
+    ("type", "type"),
+    ("rate", "max_rate"),
+    ("base", "base_rate"),
+    ("min", "minimum_amount"),
+    ("max", "maximum_amount"),
+    ("min_m", "minimum_amount_per_month"),
+    ("max_m", "maximum_amount_per_month"),
+    ("tax", "tax_benefit"),
+    ("pref", "preferential_info"),
+    ("sub_amt", "sub_amount"),
+    ("sub_term", "sub_term"),
+    ("periods", "product_period as [min_months, max_months, basic_rate], null = no limit"),
+]
+TEXT_COLUMNS = ("pref", "sub_amt", "sub_term")
+
+# 예산을 넘으면 단계적으로 줄임: (자유 텍스트 최대 길이, 남길 텍스트 컬럼)
+COMPACTION_LEVELS = [
+    (None, TEXT_COLUMNS),
+    (200, TEXT_COLUMNS),
+    (80, ("pref",)),
+    (0, ()),
+]
+
+
+def _approx_tokens(text: str) -> int:
+    # 영문/숫자는 약 4자당 1토큰, 한글 등 비 ASCII 는 글자당 약 1토큰
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+class payload_compactor:
+    """
+    LLM 입력 payload 를 모델별 토큰 예산 안으로 압축
+    - 짧은 키 + 표 형식(cols/rows), product_period 는 [min, max, rate] 행으로
+    - 예산 초과 시 자유 텍스트(pref/sub_amt/sub_term) 축약 → 제거 → 금리 낮은 상품부터 제외
+    - 토큰 수는 tiktoken o200k_base 로 계산 (Gemini 도 같은 인코딩으로 근사)
+    - tiktoken 이 없거나 인코딩 파일을 받지 못하면 문자 수 기반 근사치 사용 (예산은 근사값)
+    """
+
+    def __init__(self, budgets: Dict[str, int] = None, min_products: int = 5):
+        self.logger = logging.getLogger(__name__)
+        self.budgets = budgets or self._budgets_from_env()
+        self.min_products = min_products
+        self._encoding = self._load_encoding()
+        self.last_stats: Dict[str, int] = {}
+
+    def _load_encoding(self):
+        if tiktoken is None:
+            self.logger.warning("tiktoken 미설치, 토큰 수를 근사치로 계산")
+            return None
+        try:
+            # 첫 호출 시 BPE 파일을 내려받음 (TIKTOKEN_CACHE_DIR 로 캐시 위치 지정 가능)
+            return tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            self.logger.warning(f"tiktoken 인코딩 로드 실패, 토큰 수를 근사치로 계산: {e}")
+            return None
+
+    def _budgets_from_env(self) -> Dict[str, int]:
+        # PROMPT_TOKEN_BUDGETS="gpt-5-mini=6000,gemini-2.5-flash=8000"
+        budgets = dict(DEFAULT_TOKEN_BUDGETS)
+        for item in os.getenv("PROMPT_TOKEN_BUDGETS", "").split(","):
+            if "=" in item:
+                model, value = item.split("=", 1)
+                budgets[model.strip()] = int(value)
+        return budgets
+
+    def budget(self, model: str) -> int:
+        return self.budgets.get(model, int(os.getenv("PROMPT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)))
+
+    def count_tokens(self, content) -> int:
+        text = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return _approx_tokens(text)
+
+    def compact(self, request: request_combo_dto, payload: ai_payload_dto, model: str) -> dict:
+        budget = self.budget(model)
+        original = {
+            "request_info": request.model_dump(mode="json"),
+            "db_payload": payload.model_dump(mode="json"),
+        }
+        before = self.count_tokens(original)
+
+        # 상품은 금리 높은 순, 예산이 모자라면 뒤에서부터 제외
+        products = sorted(payload.products, key=lambda p: -p.max_rate)
+        for max_text, keep in COMPACTION_LEVELS:
+            content = self._encode(request, payload.tax_rate, products, max_text, keep)
+            after = self.count_tokens(content)
+            if after <= budget:
+                break
+        else:
+            while after > budget and len(products) > self.min_products:
+                products = products[:-1]
+                content = self._encode(request, payload.tax_rate, products, max_text, keep)
+                after = self.count_tokens(content)
+
+        self.last_stats = {
+            "tokens_before": before,
+            "tokens_after": after,
+            "budget": budget,
+            "products_before": len(payload.products),
+            "products_after": len(products),
+        }
+        PAYLOAD_TOKENS.observe(before, model=model, stage="before")
+        PAYLOAD_TOKENS.observe(after, model=model, stage="after")
+        self.logger.info(f"Payload compacted for {model}: {before} -> {after} tokens (budget {budget}), "
+                         f"products {len(payload.products)} -> {len(products)}")
+        if after > budget:
+            self.logger.warning(f"Payload still over budget for {model}: {after} > {budget}")
+        return content
+
+    def _encode(self, request: request_combo_dto, tax_rate: float, products: List[product_dto],
+                max_text: int, keep: Tuple[str, ...]) -> dict:
+        columns = [key for key, _ in COLUMNS if key not in TEXT_COLUMNS or key in keep]
+        return {
+            "request_info": request.model_dump(mode="json"),
+            "tax_rate": tax_rate,
+            "keys": {key: field for key, field in COLUMNS if key in columns},
+            "cols": columns,
+            "rows": [self._row(p, columns, max_text) for p in products],
+        }
+
+    def _row(self, product: product_dto, columns: List[str], max_text: int) -> list:
+        values = {
+            "id": product.product_uuid,
+            "bank": product.bank_name,
+            "name": product.name[:100],
+            "type": product.type,
+            "rate": product.max_rate,
+            "base": product.base_rate,
+            "min": product.minimum_amount,
+            "max": product.maximum_amount,
+            "min_m": product.minimum_amount_per_month,
+            "max_m": product.maximum_amount_per_month,
+            "tax": product.tax_benefit,
+            "pref": product.preferential_info,
+            "sub_amt": product.sub_amount,
+            "sub_term": product.sub_term,
+            "periods": [self._period(p.period, p.basic_rate) for p in product.product_period],
+        }
+        row = []
+        for key in columns:
+            value = values[key]
+            if key in TEXT_COLUMNS and max_text is not None and len(value) > max_text:
+                value = value[:max_text]
+            row.append(value)
+        return row
+
+    def _period(self, period: str, basic_rate: float) -> list:
+        parsed = parse_period_range(period)
+        if parsed is None:
+            return [period, basic_rate]
+        return [parsed[0], parsed[1], basic_rate]
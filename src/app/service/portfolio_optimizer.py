@@ -0,0 +1,163 @@
+import itertools
+import logging
+import uuid
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto
+from src.app.dto.request.request_front_dto import request_combo_dto
+from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.app.dto.response.response_allocation_dto import allocation_combination_dto, allocation_dto
+from src.app.service.interest_engine import interest_engine, resolve_tax_rate
+from src.shared.util.periodUtil import horizon_months, parse_period_range
+
+MIN_COMBINATIONS = 3
+# PROMPT_ENG 의 최소 배분 규칙 (amount ≥ 1천만원일 때만 적용)
+MIN_ALLOCATION_THRESHOLD = 10_000_000
+MIN_DEPOSIT_ALLOCATION = 10_000_000
+MIN_SAVINGS_ALLOCATION = 3_600_000
+# 조합에 넣는 상품은 최소 이 비율만큼은 배분 (1원짜리 배분으로 같은 조합이 반복되는 것 방지)
+MIN_ALLOCATION_SHARE = 0.1
+UNLIMITED = float("inf")
+# LONG(상한 없음) 요청에서 상품 기간에도 상한이 없을 때 고르는 가입 기간
+OPEN_ENDED_TERM_MONTHS = 36
+
+
+class _candidate(BaseModel):
+    product: product_dto
+    is_deposit: bool
+    term: int
+    value: float  # 1원당 세후 이자 (근사, 정렬/점수용)
+    floor: int
+    cap: float
+
+
+class portfolio_optimizer:
+    """
+    LLM 없이 ai_payload_dto 에서 추천 조합을 결정적으로 생성 (model="optimizer")
+    - 상품별 요청 기간 안에서 가능한 가장 긴 가입 기간을 고르고, 1원당 세후 이자로 후보를 정렬
+    - 상위 후보의 부분집합을 전부 열거해 최소/최대 한도 안에서 높은 이자 순으로 금액을 채움
+    - 실행 가능한 조합 중 세후 이자 상위 max_combinations 개를 interest_engine 으로 계산해 반환
+    - 실행 가능한 조합이 MIN_COMBINATIONS 개보다 적으면 ValueError
+    """
+
+    def __init__(self, engine: interest_engine = None, max_candidates: int = 12, max_combinations: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine or interest_engine()
+        self.max_candidates = max_candidates
+        self.max_combinations = max(max_combinations, MIN_COMBINATIONS)
+
+    def optimize(self, request: request_combo_dto, payload: ai_payload_dto) -> response_ai_dto:
+        period = request.period.value if hasattr(request.period, "value") else str(request.period)
+        horizon = horizon_months(period)
+        amount = int(request.amount)
+        max_products = self._max_products(amount)
+
+        candidates = [c for c in (self._candidate(p, amount, horizon, payload.tax_rate) for p in payload.products)
+                      if c is not None]
+        candidates.sort(key=lambda c: (-c.value, c.product.product_uuid))
+        # 부분집합 수가 2^n 으로 늘어나므로 상위 후보만 열거
+        candidates = candidates[:min(self.max_candidates, max_products + 5)]
+
+        scored = []
+        for size in range(1, min(max_products, len(candidates)) + 1):
+            for subset in itertools.combinations(candidates, size):
+                amounts = self._allocate(subset, amount)
+                if amounts is None:
+                    continue
+                score = sum(c.value * a for c, a in zip(subset, amounts))
+                scored.append((score, subset, amounts))
+
+        # 응답은 최소 MIN_COMBINATIONS 개 조합, 부족하면 실패로 보고 호출한 쪽에서 LLM 대체 (OPTIMIZER_FALLBACK_MODEL)
+        if len(scored) < MIN_COMBINATIONS:
+            raise ValueError(f"Only {len(scored)} feasible combination(s) for amount={amount}, period={period}, "
+                             f"need {MIN_COMBINATIONS}")
+
+        scored.sort(key=lambda s: (-s[0], [c.product.product_uuid for c in s[1]]))
+        combinations = [self._to_allocation(subset, amounts) for _, subset, amounts in scored[:self.max_combinations]]
+        self.logger.info(f"Optimizer evaluated {len(scored)} feasible subsets from {len(candidates)} candidates, "
+                         f"returning {len(combinations)} combinations")
+
+        products = {p.product_uuid: p for p in payload.products}
+        result = [self.engine.build_combination(c.allocations, products, payload.tax_rate,
+                                                combination_id=c.combination_id) for c in combinations]
+        result.sort(key=lambda c: -c.expected_interest_after_tax)
+        period_months = max(len(c.timeline) for c in result)
+        return response_ai_dto(total_payment=amount, period_months=period_months, combination=result)
+
+    def _max_products(self, amount: int) -> int:
+        # ≤3 기본, 3억 이상은 1억당 1개 (최대 10개)
+        if amount >= 300_000_000:
+            return min(10, amount // 100_000_000)
+        return 3
+
+    def _term(self, product: product_dto, horizon: Optional[int]) -> Optional[int]:
+        # horizon None(LONG) 은 상품 기간 상한까지, 상품에도 상한이 없으면 OPEN_ENDED_TERM_MONTHS (최소 기간보다는 길게)
+        ranges = [r for r in (parse_period_range(p.period) for p in product.product_period) if r is not None]
+        if not ranges:
+            return horizon or OPEN_ENDED_TERM_MONTHS
+
+        terms = []
+        for low, high in ranges:
+            low = low or 1
+            if horizon is None:
+                high = high or max(low, OPEN_ENDED_TERM_MONTHS)
+            else:
+                high = min(high or horizon, horizon)
+            if low <= high:
+                terms.append(high)
+        return max(terms) if terms else None
+
+    def _candidate(self, product: product_dto, amount: int, horizon: Optional[int], tax_rate: float) -> Optional[_candidate]:
+        term = self._term(product, horizon)
+        if term is None or product.max_rate <= 0:
+            return None
+
+        is_deposit = product.type.lower() == "deposit"
+        after_tax = product.max_rate / 100 * (1 - resolve_tax_rate(product.tax_benefit, tax_rate) / 100)
+        # 예금은 원금 전체가 term 동안, 적금은 균등 납입이라 평균 잔액이 (term + 1) / 2 개월치
+        value = after_tax * (term / 12 if is_deposit else (term + 1) / 24)
+
+        cap = product.maximum_amount if product.maximum_amount > 0 else UNLIMITED
+        floor = max(product.minimum_amount, 1)
+        if not is_deposit:
+            if product.maximum_amount_per_month > 0:
+                cap = min(cap, product.maximum_amount_per_month * term)
+            floor = max(floor, product.minimum_amount_per_month * term, term)
+        # 상품 한도가 더 낮으면 한도를 우선
+        floor = max(floor, int(min(amount * MIN_ALLOCATION_SHARE, cap)))
+        if amount >= MIN_ALLOCATION_THRESHOLD:
+            rule = MIN_DEPOSIT_ALLOCATION if is_deposit else MIN_SAVINGS_ALLOCATION
+            floor = max(floor, int(min(rule, cap)))
+
+        if floor > amount or floor > cap:
+            return None
+        return _candidate(product=product, is_deposit=is_deposit, term=term, value=value, floor=floor, cap=cap)
+
+    def _allocate(self, subset, amount: int) -> Optional[List[int]]:
+        # 각 상품 최소 금액을 먼저 넣고, 남은 금액은 1원당 이자가 높은 순으로 한도까지
+        amounts = [c.floor for c in subset]
+        remaining = amount - sum(amounts)
+        if remaining < 0:
+            return None
+
+        for i, c in enumerate(subset):  # subset 은 value 내림차순
+            add = min(remaining, c.cap - amounts[i])
+            amounts[i] += int(add)
+            remaining -= int(add)
+            if remaining == 0:
+                return amounts
+        return None
+
+    def _to_allocation(self, subset, amounts: List[int]) -> allocation_combination_dto:
+        # 같은 조합은 항상 같은 id (결정적 응답, 캐시/그리드 비교 용이)
+        key = ",".join(f"{c.product.product_uuid}:{a}" for c, a in zip(subset, amounts))
+        return allocation_combination_dto(
+            combination_id=str(uuid.uuid5(uuid.NAMESPACE_URL, key)),
+            allocations=[
+                allocation_dto(uuid=c.product.product_uuid, type=c.product.type.lower(), start_month=1,
+                               end_month=c.term, allocated_amount=a)
+                for c, a in zip(subset, amounts)
+            ],
+        )
@@ -0,0 +1,184 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from src.app.dto.request.request_front_dto import request_combo_dto
+from src.app.dto.response.response_ai_dto import response_ai_dto
+
+
+def recommendation_cache_key(request: request_combo_dto, model: str, catalog_version: int) -> str:
+    period = request.period.value if hasattr(request.period, "value") else str(request.period)
+    return f"v{catalog_version}:{int(request.amount)}:{period}:{model}"
+
+
+class sqlite_cache_backend:
+    """
+    프로세스 간 공유용 로컬 파일(SQLite) 캐시
+    - api / crawler 가 같은 파일을 보면 crawler 가 clear() 로 바로 무효화 가능
+    - 연산마다 커넥션을 새로 열어 프로세스/스레드 안전하게 사용
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS recommendation_cache ("
+                "  cache_key TEXT PRIMARY KEY,"
+                "  value TEXT NOT NULL,"
+                "  expires_at REAL NOT NULL"
+                ")"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM recommendation_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row[1] < time.time():
+            self.delete(key)
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl_sec: float):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO recommendation_cache (cache_key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl_sec),
+            )
+
+    def delete(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM recommendation_cache WHERE cache_key = ?", (key,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM recommendation_cache")
+
+
+class recommendation_cache:
+    """
+    추천 결과 캐시 (in-process LRU + TTL, 선택적으로 sqlite 공유 백엔드)
+    - 키: 정규화된 amount, Period, model, 카탈로그 버전
+    - 카탈로그 버전은 version_loader 로 조회하되 version_check_sec 동안은 재사용
+    """
+
+    def __init__(self, version_loader: Callable[[], int], max_size: int = None, ttl_sec: float = None,
+                 version_check_sec: float = None, shared_backend: sqlite_cache_backend = None):
+        self.logger = logging.getLogger(__name__)
+        self.version_loader = version_loader
+        self.max_size = max_size or int(os.getenv("RECOMMENDATION_CACHE_SIZE", "256"))
+        self.ttl_sec = ttl_sec or float(os.getenv("RECOMMENDATION_CACHE_TTL", str(24 * 3600)))
+        self.version_check_sec = version_check_sec if version_check_sec is not None else float(
+            os.getenv("RECOMMENDATION_CACHE_VERSION_CHECK", "5"))
+        self.shared_backend = shared_backend
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, response_ai_dto]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls, version_loader: Callable[[], int]) -> Optional["recommendation_cache"]:
+        if os.getenv("RECOMMENDATION_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        path = os.getenv("RECOMMENDATION_CACHE_PATH")
+        backend = sqlite_cache_backend(path) if path else None
+        return cls(version_loader=version_loader, shared_backend=backend)
+
+    def current_version(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._version_checked_at < self.version_check_sec:
+                return self._version
+
+        version = self.version_loader()
+
+        with self._lock:
+            if self._version is not None and version != self._version:
+                # 카탈로그가 바뀌면 이전 버전 엔트리는 더 이상 조회될 일이 없으므로 메모리 정리
+                self.logger.info(f"Catalog version changed {self._version} -> {version}, clearing local cache")
+                self._entries.clear()
+            self._version = version
+            self._version_checked_at = now
+        return version
+
+    def make_key(self, request: request_combo_dto, model: str) -> str:
+        return recommendation_cache_key(request, model, self.current_version())
+
+    def get(self, key: str) -> Optional[response_ai_dto]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.shared_backend is not None:
+            try:
+                raw = self.shared_backend.get(key)
+            except Exception as e:
+                self.logger.warning(f"Shared cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                value = response_ai_dto.model_validate_json(raw)
+                self._put_local(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: response_ai_dto):
+        if value is None:
+            return
+        self._put_local(key, value)
+        if self.shared_backend is not None:
+            try:
+                self.shared_backend.set(key, value.model_dump_json(), self.ttl_sec)
+            except Exception as e:
+                self.logger.warning(f"Shared cache write failed: {e}")
+
+    def _put_local(self, key: str, value: response_ai_dto):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_all(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+        if self.shared_backend is not None:
+            self.shared_backend.clear()
+        self.logger.info("Recommendation cache invalidated")
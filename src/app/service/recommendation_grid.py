@@ -0,0 +1,145 @@
+import logging
+import os
+from typing import List, Optional
+
+from src.app.dto.request.request_front_dto import Period, request_combo_dto
+from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.shared.db.recommendation.RecommendationGridRepository import RecommendationGridRepository
+
+DEFAULT_GRID_AMOUNTS = "1000000,5000000,10000000,30000000,50000000,100000000,300000000,500000000,1000000000"
+DEFAULT_GRID_MODELS = "gpt-5-mini"
+
+
+def _env_list(name: str, default: str) -> List[str]:
+    return [v.strip() for v in os.getenv(name, default).split(",") if v.strip()]
+
+
+def scale_response(result: response_ai_dto, target_amount: int) -> response_ai_dto:
+    """
+    버킷 금액으로 계산된 추천을 target_amount 로 선형 스케일
+    - 단리 계산이라 납입액/이자는 원금에 비례
+    - 반올림 오차는 상품별 첫 납입 월과 가장 큰 상품에 몰아서 합계를 정확히 맞춤
+    - timeline 은 스케일된 monthly_plan 으로 다시 누적
+    """
+    source_amount = result.total_payment
+    if source_amount <= 0 or source_amount == target_amount:
+        return result
+
+    ratio = target_amount / source_amount
+    scaled = result.model_copy(deep=True)
+    scaled.total_payment = target_amount
+
+    for combination in scaled.combination:
+        if not combination.product:
+            continue
+
+        for product in combination.product:
+            product.allocated_amount = round(product.allocated_amount * ratio)
+        allocated_total = sum(p.allocated_amount for p in combination.product)
+        largest = max(combination.product, key=lambda p: p.allocated_amount)
+        largest.allocated_amount += target_amount - allocated_total
+
+        for product in combination.product:
+            for plan in product.monthly_plan:
+                plan.payment = round(plan.payment * ratio)
+                plan.total_interest = round(plan.total_interest * ratio)
+            paying = [plan for plan in product.monthly_plan if plan.payment > 0]
+            if paying:
+                paying[0].payment += product.allocated_amount - sum(plan.payment for plan in product.monthly_plan)
+
+        monthly_payment = {}
+        monthly_interest = {}
+        for product in combination.product:
+            for plan in product.monthly_plan:
+                monthly_payment[plan.month] = monthly_payment.get(plan.month, 0) + plan.payment
+                monthly_interest[plan.month] = monthly_interest.get(plan.month, 0) + plan.total_interest
+
+        cumulative_payment = 0
+        cumulative_interest = 0
+        for timeline in sorted(combination.timeline, key=lambda t: t.month):
+            cumulative_payment += monthly_payment.get(timeline.month, 0)
+            cumulative_interest += monthly_interest.get(timeline.month, 0)
+            timeline.total_monthly_payment = monthly_payment.get(timeline.month, 0)
+            timeline.cumulative_payment = cumulative_payment
+            timeline.cumulative_interest = cumulative_interest
+
+        combination.expected_interest_after_tax = sum(monthly_interest.values())
+
+    return scaled
+
+
+class recommendation_grid:
+    """
+    크롤링 후 미리 계산해 두는 추천 그리드
+    - 금액 버킷(RECOMMENDATION_GRID_AMOUNTS) × SHORT/MID/LONG × 모델(RECOMMENDATION_GRID_MODELS)
+    - API 는 가장 가까운 버킷을 찾고, 정확히 같거나 허용 오차(RECOMMENDATION_GRID_TOLERANCE) 이내면 스케일해서 사용
+      (스케일 결과는 ai_service 에서 현재 payload 로 검증/보정, 배분이 불가능하면 실시간 생성)
+    - 그 외에는 None 을 돌려주어 실시간 LLM 호출로 넘어감
+    """
+
+    def __init__(self, amounts: List[int] = None, models: List[str] = None, tolerance: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.repository = RecommendationGridRepository()
+        self.amounts = amounts or [int(v) for v in _env_list("RECOMMENDATION_GRID_AMOUNTS", DEFAULT_GRID_AMOUNTS)]
+        self.models = models or _env_list("RECOMMENDATION_GRID_MODELS", DEFAULT_GRID_MODELS)
+        self.tolerance = tolerance if tolerance is not None else float(os.getenv("RECOMMENDATION_GRID_TOLERANCE", "0.1"))
+
+    @classmethod
+    def from_env(cls) -> Optional["recommendation_grid"]:
+        if os.getenv("RECOMMENDATION_GRID_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        return cls()
+
+    def lookup(self, connection, request: request_combo_dto, model: str,
+               catalog_version: int) -> Optional[response_ai_dto]:
+        period = request.period.value if hasattr(request.period, "value") else str(request.period)
+        found = self.repository.find_nearest(connection, amount=int(request.amount), period=period, model=model,
+                                             catalog_version=catalog_version)
+        if found is None:
+            return None
+
+        amount_bucket, response_json = found
+        if amount_bucket != request.amount:
+            distance = abs(amount_bucket - request.amount) / max(request.amount, 1)
+            if distance > self.tolerance:
+                self.logger.info(f"Grid miss: nearest bucket {amount_bucket} too far from {request.amount}")
+                return None
+
+        result = response_ai_dto.model_validate_json(response_json)
+        self.logger.info(f"Grid hit: bucket={amount_bucket}, amount={request.amount}, period={period}, model={model}")
+        return scale_response(result, int(request.amount))
+
+    def refresh(self, service) -> int:
+        """
+        현재 카탈로그 버전으로 그리드 전체를 다시 계산 (크롤러에서 저장 후 호출)
+        한 셀이 실패해도 나머지는 계속 진행
+        """
+        catalog_version = service.catalog_version()
+        self.logger.info(f"===== 추천 그리드 계산 시작 (catalog_version={catalog_version}, "
+                         f"{len(self.amounts)}×{len(Period)}×{len(self.models)}) =====")
+
+        with service.db_connection() as connection:
+            self.repository.ensure_table(connection)
+
+        saved = 0
+        for model in self.models:
+            for period in Period:
+                for amount in self.amounts:
+                    request = request_combo_dto(amount=amount, period=period)
+                    try:
+                        result = service.generate_live(request=request, model=model)
+                        if not result:
+                            continue
+                        with service.db_connection() as connection:
+                            self.repository.save(connection, amount_bucket=amount, period=period.value, model=model,
+                                                 catalog_version=catalog_version,
+                                                 response_json=result.model_dump_json())
+                        saved += 1
+                    except Exception as e:
+                        self.logger.error(f"추천 그리드 계산 실패 ({amount}, {period.value}, {model}): {e}")
+
+        with service.db_connection() as connection:
+            self.repository.delete_older_than(connection, catalog_version)
+
+        self.logger.info(f"===== 추천 그리드 계산 완료: {saved}건 저장 =====")
+        return saved
@@ -0,0 +1,145 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Dict, Optional
+
+from src.app.dto.request.request_front_dto import request_combo_dto
+from src.app.dto.response.response_ai_dto import response_ai_dto
+
+
+class job_status(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+TERMINAL_STATUSES = (job_status.SUCCEEDED, job_status.FAILED)
+
+
+class job_queue_full_error(RuntimeError):
+    pass
+
+
+class recommendation_job:
+    def __init__(self, request: request_combo_dto, model: str):
+        self.job_id = str(uuid.uuid4())
+        self.request = request
+        self.model = model
+        self.status = job_status.PENDING
+        self.result: Optional[response_ai_dto] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        # 상태가 바뀔 때마다 증가, SSE 구독자가 변경 여부 판단에 사용
+        self.revision = 0
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        data = {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "model": self.model,
+            "request": self.request.model_dump(mode="json"),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result.model_dump(mode="json")
+        return data
+
+
+class recommendation_job_manager:
+    """
+    비동기 추천 작업 관리자
+    - 제출 즉시 job_id 반환, 제한된 워커 풀에서 ai_service.get_data 실행
+    - 대기 작업 수가 max_pending 을 넘으면 job_queue_full_error
+    - 끝난 작업은 retention_sec 이후 정리
+    """
+
+    def __init__(self, service, max_workers: int = None, max_pending: int = None, retention_sec: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.service = service
+        self.max_workers = max_workers or int(os.getenv("RECOMMENDATION_JOB_WORKERS", "8"))
+        self.max_pending = max_pending or int(os.getenv("RECOMMENDATION_JOB_MAX_PENDING", "500"))
+        self.retention_sec = retention_sec or float(os.getenv("RECOMMENDATION_JOB_RETENTION", "3600"))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="recommendation-job")
+        self._jobs: Dict[str, recommendation_job] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def submit(self, request: request_combo_dto, model: str) -> recommendation_job:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Job manager is shut down")
+            self._purge_expired()
+            in_flight = sum(1 for job in self._jobs.values() if job.status not in TERMINAL_STATUSES)
+            if in_flight >= self.max_pending:
+                raise job_queue_full_error(f"Too many pending recommendation jobs ({in_flight})")
+
+            job = recommendation_job(request=request, model=model)
+            self._jobs[job.job_id] = job
+
+        self._executor.submit(self._run, job)
+        self.logger.info(f"Recommendation job submitted: {job.job_id} (model={model})")
+        return job
+
+    def get(self, job_id: str) -> Optional[recommendation_job]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def wait_for_change(self, job_id: str, revision: int, timeout: float) -> Optional[recommendation_job]:
+        # revision 이후 상태 변화가 있거나 timeout 이 지나면 반환
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job.revision != revision or job.status in TERMINAL_STATUSES:
+                    return job
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return job
+                self._cond.wait(remaining)
+
+    def _run(self, job: recommendation_job):
+        self._update(job, status=job_status.RUNNING)
+        try:
+            result = self.service.get_data(request=job.request, model=job.model)
+            self._update(job, status=job_status.SUCCEEDED, result=result)
+            self.logger.info(f"Recommendation job succeeded: {job.job_id}")
+        except Exception as e:
+            self.logger.exception(f"Recommendation job failed: {job.job_id}")
+            self._update(job, status=job_status.FAILED, error=str(e))
+
+    def _update(self, job: recommendation_job, status: job_status, result=None, error: str = None):
+        with self._cond:
+            job.status = status
+            if result is not None:
+                job.result = result
+            if error is not None:
+                job.error = error
+            job.updated_at = time.time()
+            job.revision += 1
+            self._cond.notify_all()
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in TERMINAL_STATUSES and now - job.updated_at > self.retention_sec
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.logger.info("Recommendation job manager shut down")
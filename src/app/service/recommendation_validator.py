@@ -0,0 +1,237 @@
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto as payload_product_dto
+from src.app.dto.request.request_front_dto import request_combo_dto
+from src.app.dto.response.response_ai_dto import combination_dto, response_ai_dto
+from src.app.dto.response.response_allocation_dto import allocation_dto
+from src.app.service.interest_engine import interest_engine
+from src.shared.util.metricsUtil import REGISTRY
+from src.shared.util.periodUtil import horizon_months, parse_period_range
+
+# infeasible: 배분 불가로 제외된 조합, recomputed: 파생 값만 틀려 재계산한 조합, rejected: 쓸 수 있는 조합이 없는 응답
+VALIDATION_FAILURES = REGISTRY.counter("recommendation_validation_failures",
+                                       "LLM recommendation validation failures by kind", ("kind",))
+
+
+class recommendation_infeasible_error(ValueError):
+    # 배분 자체가 불가능해서 재계산으로 고칠 수 없는 경우 (재생성 대상)
+    pass
+
+
+class recommendation_validator:
+    """
+    LLM 추천 결과 검증 / 보정
+    - 스키마: 조합이 1개 이상, 각 조합에 상품/타임라인 존재
+    - 산술 (조합별 NumPy 배열로 한 번에 계산):
+        총액 == request.amount, 상품별 납입 합 == allocated_amount, 이자 합 == expected_interest_after_tax,
+        월별 납입 합/활성 상품 수(납입 > 0)가 timeline 과 일치, 누적값 단조 증가 및 월별 합의 누적과 일치,
+        마지막 누적 납입 == amount
+    - payload 를 주면 uuid 가 후보 상품에 있는지도 확인
+    - repair(): 배분(uuid, 기간, 금액)이 실행 가능하면 파생 값은 interest_engine 으로 다시 계산,
+                배분이 불가능한 조합만 제외하고 남는 조합이 없으면 recommendation_infeasible_error
+                (기간이 요청 horizon 을 넘거나 상품의 어떤 product_period 범위에도 없으면 배분 불가)
+    """
+
+    def __init__(self, engine: interest_engine = None):
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine or interest_engine()
+
+    def validate(self, result: Optional[response_ai_dto], request: request_combo_dto,
+                 payload: ai_payload_dto = None) -> List[str]:
+        if result is None or not isinstance(result, response_ai_dto):
+            return ["response is empty or not a response_ai_dto"]
+        if not result.combination:
+            return ["no combinations"]
+
+        errors: List[str] = []
+        if result.total_payment != request.amount:
+            errors.append(f"total_payment {result.total_payment} != amount {request.amount}")
+
+        known_uuids = {p.product_uuid for p in payload.products} if payload is not None else None
+
+        for combination in result.combination:
+            errors.extend(self._validate_combination(combination, int(request.amount), known_uuids))
+
+        return errors
+
+    def _validate_combination(self, combination: combination_dto, amount: int, known_uuids) -> List[str]:
+        cid = combination.combination_id
+        if not combination.product:
+            return [f"[{cid}] no products"]
+        if not combination.timeline:
+            return [f"[{cid}] empty timeline"]
+
+        errors: List[str] = []
+        if known_uuids is not None:
+            errors.extend(f"[{cid}] unknown product uuid {p.uuid}" for p in combination.product
+                          if p.uuid not in known_uuids)
+
+        n = len(combination.product)
+        allocated = np.array([p.allocated_amount for p in combination.product], dtype=np.int64)
+        if allocated.sum() != amount:
+            errors.append(f"[{cid}] allocated sum {int(allocated.sum())} != amount {amount}")
+
+        # 모든 monthly_plan 을 (상품 인덱스, 월, 납입, 이자) 평탄 배열로
+        plans = [(i, plan.month, plan.payment, plan.total_interest)
+                 for i, p in enumerate(combination.product) for plan in p.monthly_plan]
+        plan_array = np.array(plans, dtype=np.int64).reshape(-1, 4)
+        product_idx, month, payment, interest = plan_array.T
+
+        paid = np.bincount(product_idx, weights=payment, minlength=n).astype(np.int64)
+        for i in np.flatnonzero(paid != allocated):
+            p = combination.product[i]
+            errors.append(f"[{cid}] {p.uuid} payments {int(paid[i])} != allocated {p.allocated_amount}")
+
+        interest_total = int(interest.sum())
+        if interest_total != combination.expected_interest_after_tax:
+            errors.append(f"[{cid}] interest sum {interest_total} != expected {combination.expected_interest_after_tax}")
+
+        timeline = sorted(combination.timeline, key=lambda t: t.month)
+        t_month = np.array([t.month for t in timeline], dtype=np.int64)
+        t_payment = np.array([t.total_monthly_payment for t in timeline], dtype=np.int64)
+        t_active = np.array([t.active_product_count for t in timeline], dtype=np.int64)
+        t_cum_interest = np.array([t.cumulative_interest for t in timeline], dtype=np.int64)
+        t_cum_payment = np.array([t.cumulative_payment for t in timeline], dtype=np.int64)
+
+        if (np.diff(t_cum_interest) < 0).any() or (np.diff(t_cum_payment) < 0).any():
+            errors.append(f"[{cid}] cumulative values decrease")
+        if t_cum_payment[-1] != amount:
+            errors.append(f"[{cid}] final cumulative_payment {int(t_cum_payment[-1])} != amount")
+
+        # monthly_plan 에서 기대되는 월별 합계/활성 수
+        if (month < 0).any() or (t_month < 0).any():
+            errors.append(f"[{cid}] negative month index")
+            return errors
+        size = int(max(month.max(initial=0), t_month.max(initial=0))) + 1
+        month_payment = np.bincount(month, weights=payment, minlength=size).astype(np.int64)
+        month_interest = np.bincount(month, weights=interest, minlength=size).astype(np.int64)
+        paying = payment > 0
+        active_pairs = np.unique(month[paying] * n + product_idx[paying])
+        month_active = np.bincount(active_pairs // n, minlength=size)
+
+        bad_payment = t_month[month_payment[t_month] != t_payment]
+        if bad_payment.size:
+            errors.append(f"[{cid}] total_monthly_payment mismatch at months {bad_payment[:5].tolist()}")
+        bad_active = t_month[month_active[t_month] != t_active]
+        if bad_active.size:
+            errors.append(f"[{cid}] active_product_count mismatch at months {bad_active[:5].tolist()}")
+        bad_cumulative = t_month[(np.cumsum(month_payment)[t_month] != t_cum_payment)
+                                 | (np.cumsum(month_interest)[t_month] != t_cum_interest)]
+        if bad_cumulative.size:
+            errors.append(f"[{cid}] cumulative values disagree with monthly_plan at months {bad_cumulative[:5].tolist()}")
+
+        return errors
+
+    def is_valid(self, result, request: request_combo_dto, payload: ai_payload_dto = None) -> bool:
+        errors = self.validate(result, request, payload)
+        if errors:
+            self.logger.warning(f"Recommendation validation failed ({len(errors)} errors): {errors[:5]}")
+        return not errors
+
+    def allocation_errors(self, combination: combination_dto, amount: int,
+                          products: Dict[str, payload_product_dto], horizon: int = None) -> List[str]:
+        # 파생 값이 아니라 배분 자체의 실행 가능성 (재계산으로 고칠 수 없는 오류), horizon 은 요청 기간의 최대 개월 (None 이면 검사 없음)
+        cid = combination.combination_id
+        if not combination.product:
+            return [f"[{cid}] no products"]
+
+        errors: List[str] = []
+        allocated = sum(p.allocated_amount for p in combination.product)
+        if allocated != amount:
+            errors.append(f"[{cid}] allocated sum {allocated} != amount {amount}")
+
+        seen = set()
+        for p in combination.product:
+            if p.uuid in seen:
+                errors.append(f"[{cid}] duplicate product uuid {p.uuid}")
+            seen.add(p.uuid)
+
+            source = products.get(p.uuid)
+            if source is None:
+                errors.append(f"[{cid}] unknown product uuid {p.uuid}")
+                continue
+            if p.start_month < 1 or p.end_month < p.start_month or p.allocated_amount <= 0:
+                errors.append(f"[{cid}] {p.uuid} invalid term/amount {p.start_month}~{p.end_month}, {p.allocated_amount}")
+                continue
+            term = p.end_month - p.start_month + 1
+            if horizon is not None and p.end_month > horizon:
+                errors.append(f"[{cid}] {p.uuid} end_month {p.end_month} exceeds horizon {horizon}")
+            if not self._term_allowed(term, source):
+                errors.append(f"[{cid}] {p.uuid} term {term} outside product_period {[pp.period for pp in source.product_period]}")
+            # -1 은 제한 없음
+            if source.maximum_amount > 0 and p.allocated_amount > source.maximum_amount:
+                errors.append(f"[{cid}] {p.uuid} exceeds maximum_amount {source.maximum_amount}")
+            if source.minimum_amount > 0 and p.allocated_amount < source.minimum_amount:
+                errors.append(f"[{cid}] {p.uuid} below minimum_amount {source.minimum_amount}")
+            if source.type.lower() == "savings" and source.maximum_amount_per_month > 0:
+                if p.allocated_amount > source.maximum_amount_per_month * term:
+                    errors.append(f"[{cid}] {p.uuid} exceeds maximum_amount_per_month {source.maximum_amount_per_month}")
+
+        return errors
+
+    @staticmethod
+    def _term_allowed(term: int, source: payload_product_dto) -> bool:
+        # 해석 가능한 기간 행이 없으면 제한 없음, None 경계는 열린 구간
+        ranges = [r for r in (parse_period_range(pp.period) for pp in source.product_period) if r is not None]
+        if not ranges:
+            return True
+        return any((low is None or low <= term) and (high is None or term <= high) for low, high in ranges)
+
+    def repair_combination(self, combination: combination_dto, amount: int,
+                           products: Dict[str, payload_product_dto], tax_rate: float,
+                           horizon: int = None) -> combination_dto:
+        # 유효하면 그대로, 파생 값만 틀리면 재계산한 새 조합, 배분이 불가능하면 recommendation_infeasible_error
+        infeasible = self.allocation_errors(combination, amount, products, horizon)
+        if infeasible:
+            VALIDATION_FAILURES.inc(kind="infeasible")
+            raise recommendation_infeasible_error("; ".join(infeasible))
+        if not self._validate_combination(combination, amount, set(products)):
+            return combination
+        VALIDATION_FAILURES.inc(kind="recomputed")
+
+        allocations = [allocation_dto(uuid=p.uuid, type=p.type, start_month=p.start_month,
+                                      end_month=p.end_month, allocated_amount=p.allocated_amount)
+                       for p in combination.product]
+        return self.engine.build_combination(allocations, products, tax_rate, combination_id=combination.combination_id)
+
+    def repair(self, result: Optional[response_ai_dto], request: request_combo_dto,
+               payload: ai_payload_dto) -> response_ai_dto:
+        """
+        검증에 실패한 조합은 배분을 유지한 채 monthly_plan/timeline/이자/수익률을 다시 계산
+        배분이 불가능한 조합은 제외, 남는 조합이 없으면 recommendation_infeasible_error
+        """
+        if result is None or not isinstance(result, response_ai_dto) or not result.combination:
+            VALIDATION_FAILURES.inc(kind="rejected")
+            raise recommendation_infeasible_error("response has no combinations")
+
+        amount = int(request.amount)
+        horizon = horizon_months(request.period)
+        products = {p.product_uuid: p for p in payload.products}
+
+        repaired: List[combination_dto] = []
+        dropped: List[str] = []
+        recomputed = 0
+        for combination in result.combination:
+            try:
+                fixed = self.repair_combination(combination, amount, products, payload.tax_rate, horizon)
+            except recommendation_infeasible_error as e:
+                dropped.append(str(e))
+                continue
+            repaired.append(fixed)
+            recomputed += fixed is not combination
+
+        if not repaired:
+            VALIDATION_FAILURES.inc(kind="rejected")
+            raise recommendation_infeasible_error(f"all combinations infeasible: {dropped[:5]}")
+        if dropped:
+            self.logger.warning(f"Dropped {len(dropped)} infeasible allocation(s): {dropped[:5]}")
+        if recomputed:
+            self.logger.info(f"Recomputed derived fields for {recomputed}/{len(repaired)} combinations")
+
+        if not dropped and not recomputed and result.total_payment == amount:
+            return result
+        period_months = max(max(t.month for t in c.timeline) + 1 for c in repaired)
+        return response_ai_dto(total_payment=amount, period_months=period_months, combination=repaired)
@@ -0,0 +1,139 @@
+import logging
+import threading
+
+from dotenv import load_dotenv
+from flask import current_app
+
+from src.app.ai.ai_gemini import ai_gemini
+from src.app.ai.ai_gpt import ai_gpt
+from src.app.service.ai_service import ai_service
+from src.app.service.catalog_snapshot import catalog_store
+from src.app.service.recommendation_cache import recommendation_cache
+from src.app.service.recommendation_grid import recommendation_grid
+from src.app.service.recommendation_job import recommendation_job_manager
+from src.shared.db.catalog.CatalogVersionRepository import CatalogVersionRepository
+from src.shared.db.product.productRepository import ProductRepository
+from src.shared.db.recommendation.RecommendationGridRepository import RecommendationGridRepository
+from src.shared.db.util.MysqlPool import MysqlPool
+from src.shared.db.util.MysqlUtil import MysqlUtil
+
+
+class service_container:
+    """
+    프로세스 단위 서비스 컨테이너
+    - 앱 시작 시 DB 풀, GPT/Gemini 클라이언트, ai_service 를 한 번만 생성
+    - 모든 요청 스레드가 같은 인스턴스를 공유 (클라이언트들은 thread-safe)
+    - 앱 종료 시 close() 로 커넥션 정리
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._started = False
+
+        self.mysqlUtil: MysqlUtil = None
+        self.mysql_pool: MysqlPool = None
+        self.gemini: ai_gemini = None
+        self.gpt: ai_gpt = None
+        self.ai_service: ai_service = None
+        self.cache: recommendation_cache = None
+        self.job_manager: recommendation_job_manager = None
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return self
+            self.logger.info("Service container starting")
+
+            load_dotenv()
+            self.mysqlUtil = MysqlUtil()
+            self.mysql_pool = MysqlPool(mysqlUtil=self.mysqlUtil)
+            try:
+                self.mysql_pool.warm()
+                # product_period 기간 컬럼 추가/백필은 쓰기 쪽(크롤러 기동)에서만, API 는 읽기만 (NULL = 제한 없음)
+                with self.mysql_pool.connection() as connection:
+                    CatalogVersionRepository().ensure_table(connection)
+                    RecommendationGridRepository().ensure_table(connection)
+            except Exception as e:
+                # DB 가 늦게 뜨는 경우에도 앱은 올라오도록, 실제 요청 시 다시 연결 시도
+                self.logger.warning(f"MySQL pool warm-up failed, connections will be opened lazily: {e}")
+
+            self.gemini = ai_gemini()
+            self.gpt = ai_gpt()
+            self.ai_service = ai_service(
+                mysqlUtil=self.mysqlUtil,
+                gemini=self.gemini,
+                gpt=self.gpt,
+                mysql_pool=self.mysql_pool,
+                product_repository=ProductRepository(),
+                grid=recommendation_grid.from_env(),
+            )
+            self.ai_service.catalog = catalog_store.from_env(loader=self._load_catalog,
+                                                             version_loader=self.ai_service.catalog_version)
+            if self.ai_service.catalog is not None:
+                try:
+                    self.ai_service.catalog.load()
+                except Exception as e:
+                    # 첫 요청에서 다시 적재 시도, 그 전까지는 DB 경로 사용
+                    self.logger.warning(f"Catalog snapshot load failed: {e}")
+            self.cache = recommendation_cache.from_env(version_loader=self.ai_service.catalog_version)
+            self.ai_service.cache = self.cache
+            self.job_manager = recommendation_job_manager(service=self.ai_service)
+
+            self._started = True
+            self.logger.info("Service container started")
+            return self
+
+    def _load_catalog(self):
+        with self.ai_service.db_connection() as connection:
+            return ProductRepository().load_catalog(connection)
+
+    def close(self):
+        with self._lock:
+            if not self._started:
+                return
+            self.logger.info("Service container shutting down")
+
+            try:
+                self.job_manager.shutdown()
+            except Exception as e:
+                self.logger.warning(f"Error shutting down job manager: {e}")
+
+            for name, resource in (("ai_service", self.ai_service), ("gpt", self.gpt), ("gemini", self.gemini),
+                                   ("mysql_pool", self.mysql_pool)):
+                try:
+                    resource.close()
+                except Exception as e:
+                    self.logger.warning(f"Error closing {name}: {e}")
+
+            self._started = False
+            self.logger.info("Service container closed")
+
+    async def start_async(self):
+        # ASGI lifespan startup: 동기 자원 생성 후 aiomysql 풀을 이벤트 루프 안에서 생성
+        self.start()
+        if self.ai_service.async_mysql_pool is None:
+            self.ai_service.async_mysql_pool = await self.mysqlUtil.create_async_pool()
+            self.logger.info("Async MySQL pool created")
+        return self
+
+    async def close_async(self):
+        pool = self.ai_service.async_mysql_pool if self.ai_service is not None else None
+        if pool is not None:
+            pool.close()
+            await pool.wait_closed()
+            self.ai_service.async_mysql_pool = None
+            self.logger.info("Async MySQL pool closed")
+
+        for name, resource in (("gpt", self.gpt), ("gemini", self.gemini)):
+            try:
+                if resource is not None:
+                    await resource.aclose()
+            except Exception as e:
+                self.logger.warning(f"Error closing async {name}: {e}")
+
+        self.close()
+
+
+def get_service_container() -> service_container:
+    return current_app.extensions["service_container"]
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class single_flight:
+    """
+    동일 키로 동시에 들어온 요청을 하나의 실행으로 합침 (thread 버전)
+    - 첫 요청(leader)만 fn 을 실행하고 나머지는 결과/예외를 그대로 공유
+    - 실행이 끝나면 키를 제거하므로 이후 요청은 캐시나 새 실행을 탐
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            self.logger.info(f"Coalesced with in-flight request: {key}")
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.waiters:
+                self.logger.info(f"In-flight request {key} shared with {call.waiters} waiters")
+            call.event.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class async_single_flight:
+    """
+    asyncio 버전
+    - leader 코루틴은 Task 로 띄우고 모두 shield 로 기다림
+      (요청 하나가 취소돼도 공유 중인 실행은 계속 진행)
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.logger.info(f"Coalesced with in-flight request: {key}")
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
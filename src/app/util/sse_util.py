@@ -0,0 +1,6 @@
+import json
+
+
+def encode_sse(event: str, data: dict) -> str:
+    # text/event-stream 이벤트 한 건 (job 상태 스트림, 추천 조합 스트림 공용)
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
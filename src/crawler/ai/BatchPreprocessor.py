@@ -0,0 +1,184 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from google.genai import types
+from pydantic import ValidationError
+
+from src.crawler.ai.LlmUtil import LlmUtil, content_text
+from src.crawler.ai.jsonSchema import Preferential
+from src.crawler.ai.preprocessPrompt import SYS_RULE
+from src.shared.util.metricsUtil import REGISTRY
+
+ONLINE = "online"
+BATCH_MODE = "batch"
+
+SUCCEEDED_STATES = ("JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED")
+FAILED_STATES = ("JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED")
+
+BATCH_ITEMS = REGISTRY.counter("preprocess_batch_items", "Batch preprocessing items by outcome", ("bank", "outcome"))
+BATCH_DURATION = REGISTRY.histogram("preprocess_batch_job_duration_seconds", "Provider batch job submit-to-result time",
+                                    ("bank",), buckets=(10, 30, 60, 300, 600, 1800, 3600, 7200, 21600, 86400))
+
+
+class BatchJobError(RuntimeError):
+    pass
+
+
+def _state(job) -> str:
+    state = getattr(job, "state", None)
+    return str(getattr(state, "value", state))
+
+
+class BatchPreprocessor:
+    """
+    은행 하나의 상품을 Gemini Batch API 작업 하나로 전처리 (PREPROCESS_MODE=batch)
+    - 캐시에 있는 상품은 제외하고 나머지만 inlined request 로 제출 → poll_interval_sec 마다 상태 확인
+    - 결과는 제출 순서대로 돌아오므로 위치로 원래 상품에 매핑, 실패/파싱 불가 항목만 LlmUtil 로 개별 재시도
+      (google-genai 1.28 의 InlinedRequest/InlinedResponse 에는 metadata 필드가 없음)
+    - 작업 자체가 실패/만료/시간 초과면 전체를 개별 호출로 처리
+    - client 에 batches 가 없으면(LLM_BACKEND=replay 등) 같은 흐름을 로컬 스레드 풀로 대신 실행
+    """
+
+    def __init__(self, llm_util: LlmUtil, model: str = None, poll_interval_sec: float = None,
+                 timeout_sec: float = None, min_batch_size: int = None, local_workers: int = None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.logger = logging.getLogger(__name__)
+        self.llm_util = llm_util
+        self.client = llm_util.client
+        self.model = model or llm_util.models[0]
+        self.poll_interval_sec = poll_interval_sec or float(os.getenv("PREPROCESS_BATCH_POLL_SEC", "30"))
+        self.timeout_sec = timeout_sec or float(os.getenv("PREPROCESS_BATCH_TIMEOUT_SEC", str(6 * 3600)))
+        # 몇 개 안 되면 작업 대기 시간이 더 길어서 바로 개별 호출
+        self.min_batch_size = min_batch_size or int(os.getenv("PREPROCESS_BATCH_MIN_SIZE", "5"))
+        self.local_workers = local_workers or int(os.getenv("PREPROCESS_BATCH_LOCAL_WORKERS", "4"))
+        self.clock = clock
+        self.sleep = sleep
+
+    @classmethod
+    def from_env(cls, llm_util: LlmUtil) -> Optional["BatchPreprocessor"]:
+        if os.getenv("PREPROCESS_MODE", ONLINE).lower() != BATCH_MODE:
+            return None
+        return cls(llm_util)
+
+    def preprocess(self, contents: List, bank_name: str = "") -> List[Preferential]:
+        results: List[Optional[Preferential]] = [None] * len(contents)
+        keys = [self.llm_util.cache_key(content) for content in contents]
+        pending = []
+        for index, (content, key) in enumerate(zip(contents, keys)):
+            cached = self.llm_util.cached(key, bank_name)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append(index)
+        BATCH_ITEMS.inc(len(contents) - len(pending), bank=bank_name, outcome="cached")
+        self.logger.info(f"[{bank_name}] 배치 전처리 대상 {len(pending)}개 (캐시 {len(contents) - len(pending)}개)")
+
+        failed = pending
+        if len(pending) >= self.min_batch_size and getattr(self.client, "batches", None) is not None:
+            try:
+                failed = self._run_batch(contents, keys, pending, results, bank_name)
+            except Exception as e:
+                self.logger.error(f"[{bank_name}] 배치 작업 실패, 전체 개별 처리: {e}")
+                failed = [i for i in pending if results[i] is None]
+
+        if failed:
+            self.logger.info(f"[{bank_name}] 개별 전처리 {len(failed)}개")
+            self._run_individually(contents, keys, failed, results, bank_name)
+        return results
+
+    def _request(self, content) -> types.InlinedRequest:
+        return types.InlinedRequest(
+            model=self.model,
+            contents=content_text(content),
+            config=types.GenerateContentConfig(
+                system_instruction=SYS_RULE,
+                response_mime_type="application/json",
+                response_schema=Preferential,
+            ),
+        )
+
+    def _run_batch(self, contents: List, keys: List[Optional[str]], pending: List[int],
+                   results: List[Optional[Preferential]], bank_name: str) -> List[int]:
+        # 제출 자체의 일시 오류(429/503)는 게이트웨이 재시도, rate limit 은 작업 단위라 차감하지 않음
+        started = self.clock()
+        job = self.llm_util.gateway.call(
+            [self.model],
+            lambda model, timeout: self.client.batches.create(
+                model=model,
+                src=[self._request(contents[i]) for i in pending],
+                config=types.CreateBatchJobConfig(display_name=f"preprocess-{bank_name or 'bank'}"),
+            ),
+        )
+        self.logger.info(f"[{bank_name}] 배치 작업 제출: {job.name} ({len(pending)}개)")
+        job = self._wait(job, bank_name)
+        BATCH_DURATION.observe(self.clock() - started, bank=bank_name)
+
+        responses = getattr(getattr(job, "dest", None), "inlined_responses", None) or []
+        if len(responses) != len(pending):
+            # 위치로만 매핑하므로 개수가 어긋나면 어느 결과도 믿을 수 없음
+            raise BatchJobError(f"batch job {job.name} returned {len(responses)} responses for {len(pending)} requests")
+        failed = set(pending)
+        for index, item in zip(pending, responses):
+            parsed = self._parse(item, index, bank_name)
+            if parsed is None:
+                continue
+            results[index] = parsed
+            failed.discard(index)
+            self.llm_util.store(keys[index], parsed, self.model, bank_name)
+
+        BATCH_ITEMS.inc(len(pending) - len(failed), bank=bank_name, outcome="succeeded")
+        BATCH_ITEMS.inc(len(failed), bank=bank_name, outcome="failed")
+        self.logger.info(f"[{bank_name}] 배치 결과: 성공 {len(pending) - len(failed)}개, 실패 {len(failed)}개")
+        return sorted(failed)
+
+    def _wait(self, job, bank_name: str):
+        give_up_at = self.clock() + self.timeout_sec
+        while _state(job) not in SUCCEEDED_STATES:
+            if _state(job) in FAILED_STATES:
+                raise BatchJobError(f"batch job {job.name} ended with {_state(job)}: {getattr(job, 'error', None)}")
+            if self.clock() >= give_up_at:
+                self._cancel(job)
+                raise BatchJobError(f"batch job {job.name} did not finish within {self.timeout_sec:.0f}s")
+            self.sleep(self.poll_interval_sec)
+            try:
+                job = self.client.batches.get(name=job.name)
+            except Exception as e:
+                # 조회 실패는 다음 주기에 다시
+                self.logger.warning(f"[{bank_name}] 배치 상태 조회 실패: {e}")
+        return job
+
+    def _cancel(self, job):
+        try:
+            self.client.batches.cancel(name=job.name)
+        except Exception as e:
+            self.logger.warning(f"배치 작업 취소 실패 {job.name}: {e}")
+
+    def _parse(self, item, index: int, bank_name: str) -> Optional[Preferential]:
+        error = getattr(item, "error", None)
+        response = getattr(item, "response", None)
+        if error is not None or response is None:
+            self.logger.warning(f"[{bank_name}] 배치 항목 {index} 실패: {error}")
+            return None
+        parsed = getattr(response, "parsed", None)
+        if isinstance(parsed, Preferential):
+            return parsed
+        try:
+            # batch 응답은 SDK 가 schema 로 파싱해 주지 않으므로 text 를 직접 검증
+            return Preferential.model_validate_json(response.text or "")
+        except (ValidationError, ValueError) as e:
+            self.logger.warning(f"[{bank_name}] 배치 항목 {index} 파싱 실패: {e}")
+            return None
+
+    def _run_individually(self, contents: List, keys: List[Optional[str]], indexes: List[int],
+                          results: List[Optional[Preferential]], bank_name: str):
+        # 로컬 대체 경로: 게이트웨이 동시성 한도 / 공유 rate limit(batch 우선순위) 안에서 병렬 호출
+        def run(index: int):
+            results[index] = self.llm_util.generate_preferential_json(contents[index], bank_name, keys[index])
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.local_workers, len(indexes)))) as pool:
+            # 하나라도 끝내 실패하면 기존 순차 경로와 같이 은행 전체 실패로 전파
+            for future in [pool.submit(run, index) for index in indexes]:
+                future.result()
@@ -1,100 +1,148 @@
+import json
 import os
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
+from src.app.ai.prompt_cache import gemini_context_cache, prompt_cache_usage
+from src.crawler.ai.PreprocessCache import PreprocessCache, preprocess_cache_key
 from src.crawler.ai.jsonSchema import Preferential
 from src.crawler.ai.preprocessPrompt import SYS_RULE
+from src.shared.llm.LlmGateway import LlmGateway, RateRequest
+from src.shared.llm.LlmReplay import LlmReplayBackend
+from src.shared.llm.RateLimiter import BATCH, estimate_tokens, key_fingerprint
 import time
-import random
 import logging
 from typing import Optional
-from google.genai.errors import ServerError, APIError
 
-RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def content_text(content) -> str:
+    # 은행별 크롤러가 dict(하나은행 등)를 넘기기도 함, google-genai 는 dict contents 를 거부하므로 문자열로
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, ensure_ascii=False, default=str)
+
 
 class LlmUtil:
 
-    def __init__(self):
+    def __init__(self, client=None, gateway: LlmGateway = None, cache: PreprocessCache = None):
         self.logger = logging.getLogger(__name__)
-        load_dotenv()
-        api_key = os.getenv("GENAI_API_KEY")
-
-        if not api_key:
-            raise RuntimeError("GENAI_API_KEY is not set.")
-        self.client = genai.Client(api_key=api_key)
+        api_key = None
+        # LLM_BACKEND=record|replay: 응답 녹화 / 키 없이 재생 (주입된 client 는 그대로 사용)
+        backend = LlmReplayBackend.from_env() if client is None else None
+        if client is None and (backend is None or backend.records):
+            load_dotenv()
+            api_key = os.getenv("GENAI_API_KEY")
+
+            if not api_key:
+                raise RuntimeError("GENAI_API_KEY is not set.")
+            client = genai.Client(api_key=api_key)
+        if backend is not None:
+            client = backend.gemini_client(client)
+        self.client = client
+        # SYS_RULE 은 상품마다 같으므로 system_instruction(또는 context cache)으로 고정 prefix 처리
+        self.context_cache = gemini_context_cache.from_env(self.client)
+        self.cache_usage = prompt_cache_usage()
+        self.gateway = gateway or LlmGateway.shared()
+        # api 와 같은 GENAI_API_KEY bucket 을 batch 우선순위로 사용 (사용자 추천 몫은 남겨 둠)
+        self.rate_key = key_fingerprint(api_key)
+        self.models = ("gemini-2.5-flash", "gemini-2.5-pro")
         self.req_timeout_sec = 60
-        self.max_retry = 6
-        self.max_backoff_sec = 60
+        # 상품 하나 전처리에 쓰는 전체 시간 (재시도/대체 포함)
+        self.deadline_sec = float(os.getenv("PREPROCESS_DEADLINE_SEC", "300"))
+        # 원문이 같은 상품은 지난 전처리 결과 재사용 (PREPROCESS_CACHE_DB 가 없으면 비활성화)
+        self.cache = cache if cache is not None else PreprocessCache.from_env()
+
+
+    def _config(self, model: str):
+        cached_content = self.context_cache.get(model, SYS_RULE) if self.context_cache is not None else None
+        if cached_content:
+            return types.GenerateContentConfig(
+                cached_content=cached_content,
+                response_mime_type="application/json",
+                response_schema=Preferential,
+            )
+        return types.GenerateContentConfig(
+            system_instruction=SYS_RULE,
+            response_mime_type="application/json",
+            response_schema=Preferential,
+        )
 
+    def _gen_once(self, model: str, prompt: str, timeout: float = None):
+        config = self._config(model)
+        # 요청 하나의 HTTP 타임아웃은 req_timeout_sec 와 deadline 까지 남은 시간 중 짧은 쪽
+        timeout = self.req_timeout_sec if timeout is None else min(timeout, self.req_timeout_sec)
+        config = config.model_copy(update={"http_options": types.HttpOptions(timeout=max(1, int(timeout * 1000)))})
 
-    def _gen_once(self, model: str, prompt: str, config):
-        return self.client.models.generate_content(
+        self.logger.info(f"{model} 시도")
+        response = self.client.models.generate_content(
             model=model,
             contents=prompt,
             config=config,
         )
+        self.logger.info(f"{model} 성공")
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self.cache_usage.record(model, getattr(usage, "prompt_token_count", None),
+                                    getattr(usage, "cached_content_token_count", None),
+                                    getattr(usage, "candidates_token_count", None))
+        return response
+
+    def cache_key(self, content) -> Optional[str]:
+        # 모델 체인 전체를 키에 넣음: flash 로 만든 결과를 pro 전용 설정에서 재사용하지 않도록
+        return preprocess_cache_key(content, ",".join(self.models)) if self.cache is not None else None
+
+    def cached(self, cache_key: Optional[str], bank_name: str = "") -> Optional[Preferential]:
+        if cache_key is None:
+            return None
+        return self.cache.get(cache_key, bank_name)
+
+    def store(self, cache_key: Optional[str], parsed: Optional[Preferential], model: str, bank_name: str = ""):
+        if cache_key is None or parsed is None:
+            return
+        try:
+            self.cache.set(cache_key, parsed, model=model, bank_name=bank_name)
+        except Exception as e:
+            # 캐시 저장 실패는 전처리 결과에 영향 없음
+            self.logger.warning(f"전처리 캐시 저장 실패: {e}")
 
-    def _gen_with_retry(self, model: str, prompt: str, config):
-        delay = 1.0
-        last_exc: Optional[Exception] = None
-        for attempt in range(1, self.max_retry + 1):
-            try:
-                self.logger.info(f"{model} 시도 ({attempt}/{self.max_retry})")
-                resp = self._gen_once(model, prompt, config)
-                self.logger.info(f"{model} 성공")
-                return resp
-            except (ServerError, APIError) as e:
-                code = getattr(e, "status_code", None)
-                retryable = (code in RETRYABLE_STATUS)
-                self.logger.warning(f"{model} 시도 {attempt} 실패: {code} {e}")
-
-                if not retryable or attempt == self.max_retry:
-                    last_exc = e
-                    break
-
-                wait = min(self.max_backoff_sec, delay) + random.uniform(0, delay/2)
-                self.logger.warning(f"{model} 재시도 대기 {wait:.1f}s (code={code})")
-                time.sleep(wait)
-                delay *= 2
-                continue
-            except Exception as e:
-                last_exc = e
-                self.logger.error(f"{model} 예기치 못한 예외: {e}")
-                break
-
-        if last_exc:
-            raise last_exc
-        raise RuntimeError(f"{model} 재시도 실패(원인 미상)")
-
-    def create_preferential_json(self, content: str) -> "Preferential":
-        prompt = f"{SYS_RULE}{content}"
-        config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=Preferential,
-        )
-
+    def create_preferential_json(self, content: str, bank_name: str = "") -> "Preferential":
         self.logger.info("상품 하나 전처리 시작")
 
-        response = None
-        last_err = None
-
-        for model in ("gemini-2.5-flash", "gemini-2.5-pro"):
-            try:
-                response = self._gen_with_retry(model, prompt, config)
-                break
-            except Exception as e:
-                last_err = e
-                self.logger.error(f"{model} 최종 실패: {e}")
-                continue
-
-        if response is None:
-            raise RuntimeError(f"모든 모델 실패. 마지막 에러: {last_err}")
+        cache_key = self.cache_key(content)
+        cached = self.cached(cache_key, bank_name)
+        if cached is not None:
+            self.logger.info("상품 하나 전처리 완료 (캐시)")
+            return cached
+        return self.generate_preferential_json(content, bank_name, cache_key)
+
+    def generate_preferential_json(self, content: str, bank_name: str = "",
+                                   cache_key: Optional[str] = None) -> "Preferential":
+        # 캐시 조회 없이 LLM 호출 (batch 모드에서 실패한 항목 개별 재시도에도 사용)
+        answered = []
+        prompt = content_text(content)
+
+        def generate(model: str, timeout: float = None):
+            response = self._gen_once(model, prompt, timeout)
+            answered.append(model)
+            return response
+
+        # flash → pro 순서로 대체, 재시도/백오프/회로 차단은 LlmGateway
+        try:
+            response = self.gateway.call(self.models, generate,
+                                         deadline=time.monotonic() + self.deadline_sec,
+                                         rate=RateRequest(key=self.rate_key, priority=BATCH,
+                                                          cost_tokens=estimate_tokens(SYS_RULE, prompt)))
+        except Exception as e:
+            self.logger.error(f"모든 모델 실패: {e}")
+            raise RuntimeError(f"모든 모델 실패. 마지막 에러: {e}") from e
 
         try:
             parsed: Preferential = response.parsed
-            self.logger.info("상품 하나 전처리 완료")
-            return parsed
         except Exception as e:
             self.logger.error(f"응답 파싱 실패: {e}")
-            raise ValueError(f"API 응답 파싱 실패: {e}") from e
\ No newline at end of file
+            raise ValueError(f"API 응답 파싱 실패: {e}") from e
+
+        self.store(cache_key, parsed, answered[-1], bank_name)
+        self.logger.info("상품 하나 전처리 완료")
+        return parsed
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from pydantic import ValidationError
+
+from src.crawler.ai.jsonSchema import Preferential
+from src.crawler.ai.preprocessPrompt import SYS_RULE
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# 프롬프트 / 스키마가 바뀌면 버전이 바뀌어 이전 결과는 자연히 miss (수동 무효화 불필요)
+SYS_RULE_VERSION = _digest(SYS_RULE)[:12]
+SCHEMA_VERSION = _digest(json.dumps(Preferential.model_json_schema(), sort_keys=True))[:12]
+
+
+def normalize_content(content) -> str:
+    # 크롤링 결과가 공백/줄바꿈만 달라도 같은 상품으로 보도록 정규화 (dict 는 키 정렬 JSON)
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, sort_keys=True, default=str)
+    return re.sub(r"\s+", " ", content).strip()
+
+
+def preprocess_cache_key(content, model: str) -> str:
+    # (정규화된 원문, SYS_RULE 버전, 모델, Preferential 스키마 버전) 의 해시
+    return _digest("\n".join([SYS_RULE_VERSION, SCHEMA_VERSION, model, normalize_content(content)]))
+
+
+class PreprocessCache:
+    """
+    크롤링 원문 → Preferential 전처리 결과를 저장하는 content-addressed SQLite 캐시
+    - 매달 같은 페이지를 다시 크롤링해도 원문이 같으면 LLM 을 호출하지 않음
+    - 중간에 끊긴 크롤링을 다시 돌려도 이미 처리한 상품은 바로 반환
+    - 은행별 hit / miss 는 프로세스 메모리에서 집계 (stats)
+    """
+
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS preprocess_cache ("
+                "  cache_key TEXT PRIMARY KEY,"
+                "  model TEXT NOT NULL,"
+                "  bank_name TEXT,"
+                "  value TEXT NOT NULL,"
+                "  created_at REAL NOT NULL,"
+                "  last_hit_at REAL"
+                ")"
+            )
+
+    @classmethod
+    def from_env(cls) -> Optional["PreprocessCache"]:
+        path = os.getenv("PREPROCESS_CACHE_DB")
+        if not path:
+            return None
+        return cls(path)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, bank_name: str, outcome: str):
+        with self._lock:
+            counts = self._stats.setdefault(bank_name or "unknown", {"hit": 0, "miss": 0})
+            counts[outcome] += 1
+
+    def get(self, key: str, bank_name: str = "") -> Optional[Preferential]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM preprocess_cache WHERE cache_key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE preprocess_cache SET last_hit_at = ? WHERE cache_key = ?", (time.time(), key))
+        if row is None:
+            self._count(bank_name, "miss")
+            return None
+        try:
+            value = Preferential.model_validate_json(row[0])
+        except ValidationError as e:
+            self.logger.warning("전처리 캐시 값 파싱 실패, 다시 생성: %s", e)
+            self._count(bank_name, "miss")
+            return None
+        self._count(bank_name, "hit")
+        return value
+
+    def set(self, key: str, value: Preferential, model: str, bank_name: str = ""):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO preprocess_cache (cache_key, model, bank_name, value, created_at, last_hit_at) "
+                "VALUES (?, ?, ?, ?, ?, NULL)",
+                (key, model, bank_name or None, value.model_dump_json(), time.time()),
+            )
+
+    def stats(self, bank_name: str = None) -> Dict:
+        with self._lock:
+            if bank_name is not None:
+                return dict(self._stats.get(bank_name, {"hit": 0, "miss": 0}))
+            return {bank: dict(counts) for bank, counts in self._stats.items()}
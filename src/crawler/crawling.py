@@ -4,9 +4,13 @@ import logging
 import schedule
 import json
 import os
-from logging.handlers import RotatingFileHandler
 
+from src.app.ai.ai_gemini import ai_gemini
+from src.app.ai.ai_gpt import ai_gpt
 from src.app.service.ai_service import ai_service
+from src.app.service.recommendation_cache import sqlite_cache_backend
+from src.app.service.recommendation_grid import recommendation_grid
+from src.crawler.ai.BatchPreprocessor import BatchPreprocessor
 from src.crawler.ai.LlmUtil import LlmUtil
 from src.crawler.bank_crawler.busan.busan_bank_crawler import BusanBankUnifiedCrawler
 from src.crawler.bank_crawler.gwangju.gwangju_bank_crawler import KJBankCompleteCrawler
@@ -26,8 +30,21 @@ from src.crawler.bank_crawler.woori.woori import WooriBankCrawler
 from src.crawler.util.BankLink import BankLink
 from src.crawler.bank_crawler.kyongnam.KyongNamBankCrawler import KyongNamBankCrawler
 from src.shared.db.bank.BankRepository import BankRepository
+from src.shared.db.catalog.CatalogVersionRepository import CatalogVersionRepository
+from src.shared.db.product.ProductPeriodRepository import ProductPeriodRepository
 from src.shared.db.product.productRepository import ProductRepository
 from src.shared.db.util.MysqlUtil import MysqlUtil
+from src.shared.llm.RateLimiter import BATCH
+from src.shared.util import logUtil
+from src.shared.util.metricsUtil import REGISTRY
+
+CRAWL_DURATION = REGISTRY.histogram("crawl_stage_duration_seconds", "Per-bank crawl / preprocess / save duration",
+                                    ("bank", "stage"),
+                                    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200))
+CRAWL_PRODUCTS = REGISTRY.counter("crawl_products", "Products crawled per bank", ("bank",))
+CRAWL_FAILURES = REGISTRY.counter("crawl_failures", "Bank runs that ended with an error", ("bank",))
+CRAWL_LAST_SUCCESS = REGISTRY.gauge("crawl_last_success_timestamp_seconds", "Unix time of the last successful bank run",
+                                   ("bank",))
 
 
 class Crawling:
@@ -36,42 +53,32 @@ class Crawling:
         self.logger = logging.getLogger(__name__)
         self.mysqlUtil = MysqlUtil()
         self.llmUtil = LlmUtil()
+        # PREPROCESS_MODE=batch 면 은행 단위 batch 작업, 아니면 상품마다 바로 호출
+        self.batchPreprocessor = BatchPreprocessor.from_env(self.llmUtil)
         self.bankRepository = BankRepository()
+        self.catalogVersionRepository = CatalogVersionRepository()
+        if self.llmUtil.cache is not None:
+            REGISTRY.register_collector("preprocess_cache", self._preprocess_cache_metrics)
+
+    def _preprocess_cache_metrics(self):
+        stats = self.llmUtil.cache.stats()
+        yield ("preprocess_cache_lookups_total", "counter", "Crawler preprocessing cache lookups per bank",
+               [({"bank": bank, "result": result}, counts[result])
+                for bank, counts in stats.items() for result in ("hit", "miss")])
+
+    def write_metrics(self):
+        # node_exporter textfile collector 가 읽는 파일 (METRICS_TEXTFILE_PATH 가 없으면 생략)
+        path = os.getenv("METRICS_TEXTFILE_PATH")
+        if not path:
+            return
+        try:
+            REGISTRY.write_textfile(path)
+        except Exception as e:
+            self.logger.warning(f"지표 파일 쓰기 실패: {e}")
 
     def setup_logging(self):
-        log_dir = "logs"
-        os.makedirs(log_dir, exist_ok=True)
-
-        log_file = os.path.join(log_dir, f"bank_crawler_{datetime.now().strftime('%Y%m%d')}.log")
-
-        logger = logging.getLogger()
-        logger.setLevel(logging.INFO)
-
-        for handler in logger.handlers[:]:
-            logger.removeHandler(handler)
-
-        formatter = logging.Formatter(
-            fmt="%(asctime)s %(levelname)s [%(name)s] %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-
-        file_handler = RotatingFileHandler(
-            filename=log_file,
-            maxBytes=50 * 1024 * 1024,  # 50MB
-            backupCount=10,  # 최대 10개 백업 파일
-            encoding='utf-8'
-        )
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(formatter)
-
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(formatter)
-
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-
-        return logger
+        log_file = os.path.join("logs", f"bank_crawler_{datetime.now().strftime('%Y%m%d')}.log")
+        return logUtil.setup_logging(log_file)
 
     def crawling(self, bank_name: str = ""):
         before_preprocessed_products = []
@@ -130,11 +137,17 @@ class Crawling:
         # 데이터 리턴
         return before_preprocessed_products
 
-    def preprocessed(self, before_preprocessed_products):
-        preprocessed_products = []
-        for product in before_preprocessed_products:
-            json = self.llmUtil.create_preferential_json(content=product)
-            preprocessed_products.append(json)
+    def preprocessed(self, before_preprocessed_products, bank_name: str = ""):
+        if self.batchPreprocessor is not None:
+            preprocessed_products = self.batchPreprocessor.preprocess(before_preprocessed_products, bank_name=bank_name)
+        else:
+            preprocessed_products = []
+            for product in before_preprocessed_products:
+                json = self.llmUtil.create_preferential_json(content=product, bank_name=bank_name)
+                preprocessed_products.append(json)
+        if self.llmUtil.cache is not None:
+            stats = self.llmUtil.cache.stats(bank_name)
+            self.logger.info(f"[{bank_name}] 전처리 캐시 hit {stats['hit']} / miss {stats['miss']}")
         return preprocessed_products
 
     def save_to_db(self, after_preprocessed_products, bank_name: str = ""):
@@ -143,10 +156,11 @@ class Crawling:
         try:
             connection.begin()
 
-            ## 삽입
+            ## 삽입 (상품별 SAVEPOINT, 전체 commit 은 여기서 한 번)
+            inserted = []
             for product in after_preprocessed_products:
                 self.productRepository.save_one_product(product_data=product, bank_name=bank_name,
-                                                        connection=connection)
+                                                        connection=connection, inserted=inserted)
 
             ## 삭제
             products_name_set = set()
@@ -154,14 +168,39 @@ class Crawling:
             for product in after_preprocessed_products:
                 products_name_set.add(product.product_name)
 
-            self.productRepository.check_is_deleted(bank_name=bank_name, new_products_name=products_name_set,connection=connection)
+            deleted = self.productRepository.check_is_deleted(bank_name=bank_name, new_products_name=products_name_set,connection=connection)
+
+            if not inserted and not deleted:
+                connection.commit()
+                self.logger.info(f"[{bank_name}] 카탈로그 변경 없음, 버전 유지")
+                return False
+
+            ## 카탈로그 버전 증가 + 변경 기록 → 상품 쓰기와 같은 트랜잭션으로 commit
+            version = self.catalogVersionRepository.bump(connection)
+            self.catalogVersionRepository.record_changes(connection, version=version, bank_name=bank_name,
+                                                         inserted=inserted, deleted=deleted)
             connection.commit()
         except Exception as e:
             self.logger.error(f"mysql 데이터 삽입 에러: {e}")
             connection.rollback()
+            return False
         finally:
             connection.close()
 
+        self.invalidate_recommendation_cache()
+        return True
+
+    def invalidate_recommendation_cache(self):
+        # api 와 같은 파일 캐시를 공유하는 경우 즉시 비움 (버전 키로도 무효화되지만 디스크 정리 겸)
+        path = os.getenv("RECOMMENDATION_CACHE_PATH")
+        if not path:
+            return
+        try:
+            sqlite_cache_backend(path).clear()
+            self.logger.info("공유 추천 캐시 비움")
+        except Exception as e:
+            self.logger.warning(f"공유 추천 캐시 비우기 실패: {e}")
+
     def month_task_distributed(self):
         today = datetime.now()
         day = today.day
@@ -194,23 +233,51 @@ class Crawling:
         self.logger.info(f"===== [{today.strftime('%Y-%m-%d')}] 실행 은행 {len(today_banks)}개 =====")
         self.logger.info(f"대상 은행 목록: {today_banks}")
 
+        saved_any = False
         for bank_name in today_banks:
             try:
                 self.logger.info(f"===== [{bank_name}] 크롤링 시작 =====")
-                before_preprocessed_products = self.crawling(bank_name=bank_name)
-
-                if not before_preprocessed_products:
-                    self.logger.info(f"[{bank_name}] 결과 없음, 건너뜀")
-                    continue
-
-                after_preprocessed_products = self.preprocessed(before_preprocessed_products)
-                self.save_to_db(after_preprocessed_products, bank_name=bank_name)
+                with CRAWL_DURATION.time(bank=bank_name, stage="total"):
+                    with CRAWL_DURATION.time(bank=bank_name, stage="crawl"):
+                        before_preprocessed_products = self.crawling(bank_name=bank_name)
+                    CRAWL_PRODUCTS.inc(len(before_preprocessed_products), bank=bank_name)
+
+                    if not before_preprocessed_products:
+                        self.logger.info(f"[{bank_name}] 결과 없음, 건너뜀")
+                        continue
+
+                    with CRAWL_DURATION.time(bank=bank_name, stage="preprocess"):
+                        after_preprocessed_products = self.preprocessed(before_preprocessed_products,
+                                                                        bank_name=bank_name)
+                    with CRAWL_DURATION.time(bank=bank_name, stage="save"):
+                        saved_any = self.save_to_db(after_preprocessed_products, bank_name=bank_name) or saved_any
+                CRAWL_LAST_SUCCESS.set(time.time(), bank=bank_name)
                 self.logger.info(f"===== [{bank_name}] 완료 =====")
             except Exception as e:
+                CRAWL_FAILURES.inc(bank=bank_name)
                 self.logger.error(f"[{bank_name}] 처리 중 오류: {e}")
+            finally:
+                # 은행 하나 끝날 때마다 갱신 (긴 실행 중에도 진행 상황 확인 가능)
+                self.write_metrics()
 
         self.logger.info("===== 오늘자 분할 크롤링 완료 =====")
 
+        if saved_any:
+            self.refresh_recommendation_grid()
+            self.write_metrics()
+
+    def refresh_recommendation_grid(self):
+        # 카탈로그가 바뀐 뒤 금액 버킷 × 기간 × 모델 추천을 미리 계산해 API 가 LLM 호출 없이 응답하도록 함
+        grid = recommendation_grid.from_env()
+        if grid is None:
+            self.logger.info("[SKIP] 추천 그리드 비활성화")
+            return
+        try:
+            # 그리드 계산은 배치 작업이라 공유 rate limit 에서 사용자 요청 몫을 침범하지 않도록 batch 우선순위
+            grid.refresh(ai_service(gemini=ai_gemini(priority=BATCH), gpt=ai_gpt(priority=BATCH)))
+        except Exception as e:
+            self.logger.error(f"추천 그리드 계산 오류: {e}")
+
     def start(self):
         self.logger.info("===== 상품 데이터 크롤링, 전처리, 삽입 시작 =====")
 
@@ -220,6 +287,13 @@ class Crawling:
             bank_repository.save_bank()
             self.logger.info("===== 은행 데이터 저장 완료 =====")
 
+            connection = self.mysqlUtil.get_connection()
+            try:
+                self.catalogVersionRepository.ensure_table(connection)
+                ProductPeriodRepository().ensure_columns(connection)
+            finally:
+                connection.close()
+
 
             self.logger.info("===== 스케줄러 시작 - 매 달 첫 째주  02:00 (1~7일만 실행) =====")
             schedule.every().day.at("02:00").do(self.month_task_distributed)
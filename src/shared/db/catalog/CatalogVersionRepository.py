@@ -0,0 +1,100 @@
+import logging
+import uuid
+from typing import Iterable, List
+
+
+class CatalogVersionRepository:
+    """
+    상품 카탈로그 버전 스탬프
+    - 크롤러가 상품을 저장할 때마다 version 을 1 증가
+    - API 쪽 캐시는 이 값을 키에 포함시켜 카탈로그가 바뀌면 자동으로 무효화
+    - catalog_change_log: 버전별/은행별로 추가(INSERTED)/삭제(DELETED)된 product_uuid
+      (상품 쓰기와 같은 트랜잭션에서 기록, get_changes_since 로 인덱스 한 번에 조회)
+      크롤러는 이름이 같은 기존 상품을 갱신하지 않고 건너뛰므로 수정 기록은 없음
+    """
+
+    CHANGE_TYPES = ("INSERTED", "DELETED")
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def ensure_table(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS catalog_version ("
+                "  id TINYINT NOT NULL PRIMARY KEY,"
+                "  version BIGINT NOT NULL,"
+                "  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
+                ")"
+            )
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS catalog_change_log ("
+                "  change_id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,"
+                "  version BIGINT NOT NULL,"
+                "  bank_name VARCHAR(100) NOT NULL,"
+                "  product_uuid BINARY(16) NOT NULL,"
+                "  change_type VARCHAR(10) NOT NULL,"
+                "  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+                "  INDEX idx_catalog_change_log_version (version),"
+                "  INDEX idx_catalog_change_log_bank_version (bank_name, version)"
+                ")"
+            )
+        connection.commit()
+
+    def get_version(self, connection) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT version FROM catalog_version WHERE id = 1")
+            row = cursor.fetchone()
+        if not row:
+            return 0
+        return int(row[0] if not isinstance(row, dict) else row["version"])
+
+    def bump(self, connection) -> int:
+        # 호출한 쪽의 트랜잭션 안에서 실행, commit 은 호출한 쪽 책임
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO catalog_version (id, version) VALUES (1, 1) "
+                "ON DUPLICATE KEY UPDATE version = version + 1"
+            )
+        version = self.get_version(connection)
+        self.logger.info(f"카탈로그 버전 증가: {version}")
+        return version
+
+    def record_changes(self, connection, version: int, bank_name: str, inserted: Iterable[bytes] = (),
+                       deleted: Iterable[bytes] = ()) -> int:
+        # bump 와 같은 트랜잭션에서 호출, commit 은 호출한 쪽 책임
+        rows = [(version, bank_name, product_uuid, change_type)
+                for change_type, uuids in zip(self.CHANGE_TYPES, (inserted, deleted))
+                for product_uuid in uuids]
+        if not rows:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO catalog_change_log (version, bank_name, product_uuid, change_type) "
+                "VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+        self.logger.info(f"카탈로그 변경 기록: version={version}, bank={bank_name}, {len(rows)}건")
+        return len(rows)
+
+    def get_changes_since(self, connection, version: int) -> List[dict]:
+        # version 보다 뒤에 기록된 변경 (version 오름차순)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT version, bank_name, product_uuid, change_type FROM catalog_change_log "
+                "WHERE version > %s ORDER BY version, change_id",
+                (version,),
+            )
+            rows = cursor.fetchall()
+
+        changes = []
+        for row in rows:
+            if not isinstance(row, dict):
+                row = dict(zip(("version", "bank_name", "product_uuid", "change_type"), row))
+            changes.append({
+                "version": int(row["version"]),
+                "bank_name": row["bank_name"],
+                "product_uuid": str(uuid.UUID(bytes=bytes(row["product_uuid"]))),
+                "change_type": row["change_type"],
+            })
+        return changes
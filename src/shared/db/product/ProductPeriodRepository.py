@@ -0,0 +1,88 @@
+import logging
+
+from src.shared.util.periodUtil import parse_period_range
+
+
+class ProductPeriodRepository:
+    """
+    product_period 의 숫자형 기간 컬럼 (min_months / max_months)
+    - period 문자열("[3, 6]", "[-, 12]")을 파싱한 값, NULL 은 제한 없음 (파싱 불가도 NULL)
+    - period_parsed: 파싱을 이미 거친 행은 1 → 파싱 불가 행을 기동할 때마다 다시 읽지 않음
+    - 신규 행은 ProductRepository.save_one_product 에서 함께 저장
+    - ensure_columns: 컬럼/인덱스가 없으면 추가하고, period_parsed = 0 인 행만 백필
+      (크롤러 기동 시에만 실행, API 프로세스는 컬럼을 읽기만 함)
+    """
+
+    COLUMNS = {
+        "min_months": "ALTER TABLE product_period ADD COLUMN min_months SMALLINT NULL",
+        "max_months": "ALTER TABLE product_period ADD COLUMN max_months SMALLINT NULL",
+        "period_parsed": "ALTER TABLE product_period ADD COLUMN period_parsed TINYINT NOT NULL DEFAULT 0",
+    }
+    INDEXES = {
+        "idx_product_period_months": "CREATE INDEX idx_product_period_months ON product_period (min_months, max_months)",
+        "idx_product_period_product_months":
+            "CREATE INDEX idx_product_period_product_months ON product_period (product_uuid, min_months, max_months)",
+    }
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def ensure_columns(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'product_period'"
+            )
+            existing_columns = {self._first(row) for row in cursor.fetchall()}
+            added = [name for name in self.COLUMNS if name not in existing_columns]
+            for name in added:
+                cursor.execute(self.COLUMNS[name])
+                self.logger.info(f"product_period.{name} 컬럼 추가")
+
+            cursor.execute(
+                "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'product_period'"
+            )
+            existing_indexes = {self._first(row) for row in cursor.fetchall()}
+            for name, ddl in self.INDEXES.items():
+                if name not in existing_indexes:
+                    cursor.execute(ddl)
+                    self.logger.info(f"product_period 인덱스 추가: {name}")
+        connection.commit()
+
+        # 컬럼 추가 직후, 이전 백필이 중간에 끊긴 경우, period_parsed 이전 코드가 넣은 행 모두 처리
+        self.backfill(connection)
+
+    def backfill(self, connection, batch_size: int = 500) -> int:
+        # 아직 파싱하지 않은 행만 계산, 파싱 불가/제한 없음도 NULL 로 두고 period_parsed = 1 로 표시
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT period_uuid, period FROM product_period WHERE period_parsed = 0")
+            rows = cursor.fetchall()
+        if not rows:
+            return 0
+
+        updates = []
+        unparsed = 0
+        for row in rows:
+            period_uuid, period = (row["period_uuid"], row["period"]) if isinstance(row, dict) else row
+            parsed = parse_period_range(period)
+            if parsed is None:
+                unparsed += 1
+                self.logger.warning(f"기간 형식 파싱 실패 (NULL 유지): {period}")
+                parsed = (None, None)
+            updates.append((parsed[0], parsed[1], period_uuid))
+
+        with connection.cursor() as cursor:
+            for start in range(0, len(updates), batch_size):
+                cursor.executemany(
+                    "UPDATE product_period SET min_months = %s, max_months = %s, period_parsed = 1 "
+                    "WHERE period_uuid = %s",
+                    updates[start:start + batch_size],
+                )
+                # 배치마다 commit 해서 중간에 끊겨도 처리한 행은 다시 읽지 않음
+                connection.commit()
+        self.logger.info(f"product_period 기간 컬럼 백필: {len(updates)}행 (파싱 불가 {unparsed}행)")
+        return len(updates)
+
+    def _first(self, row):
+        return next(iter(row.values())) if isinstance(row, dict) else row[0]
@@ -3,14 +3,122 @@ import logging
 import uuid
 
 from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto, product_period_dto
+from src.app.dto.request.request_front_dto import request_combo_dto
 from src.shared.db.bank.BankRepository import BankRepository
 from src.shared.db.util.MysqlUtil import MysqlUtil
+from src.shared.util.periodUtil import horizon_months, parse_period_range
+from src.shared.util.logUtil import log_payload
+from src.shared.util.metricsUtil import REGISTRY
 from typing import List, Dict
 from pymysql.cursors import DictCursor
 import re
 import ast
 import datetime
 
+import aiomysql
+
+# 후보 상품 조회
+# - fitting: 요청 기간(horizon) 안에 가입 가능한 기간 행만 (min_months <= horizon, NULL 은 제한 없음, LONG 은 horizon NULL)
+# - candidates: 최소 가입 금액 <= amount 이고 맞는 기간이 하나 이상 있는 상품, 유형별 금리 순위(type_rank)
+# - topN: type_rank 순으로 잘라 예금/적금이 번갈아 들어가게 (한쪽이 모자라면 다른 쪽으로 채움)
+BUILD_AI_PAYLOAD_SQL = """
+          WITH fitting AS (SELECT pp.product_uuid,
+                                  pp.period,
+                                  pp.bank_rate
+                           FROM product_period pp
+                           WHERE %(horizon)s IS NULL
+                              OR pp.min_months IS NULL
+                              OR pp.min_months <= %(horizon)s),
+               candidates AS (SELECT bp.product_uuid,
+                                     bp.name,
+                                     bp.bank_uuid,
+                                     bp.basic_rate,
+                                     bp.max_rate,
+                                     bp.type,
+                                     bp.maximum_amount,
+                                     bp.maximum_amount_per_month,
+                                     bp.maximum_amount_per_day,
+                                     bp.minimum_amount,
+                                     bp.minimum_amount_per_month,
+                                     bp.minimum_amount_per_day,
+                                     bp.tax_benefit,
+                                     bp.preferential_info,
+                                     bp.sub_amount,
+                                     bp.sub_target,
+                                     bp.sub_term,
+                                     bp.sub_way,
+                                     ROW_NUMBER() OVER (PARTITION BY bp.type
+                                         ORDER BY bp.max_rate DESC, bp.product_uuid) AS type_rank
+                              FROM bank_product bp
+                              WHERE bp.deleted_at IS NULL
+                                AND COALESCE(bp.minimum_amount, -1) <= %(amount)s
+                                AND EXISTS (SELECT 1 FROM fitting f WHERE f.product_uuid = bp.product_uuid)),
+               topN AS (SELECT *
+                        FROM candidates
+                        ORDER BY type_rank, max_rate DESC
+                        LIMIT %(top_n)s)
+          SELECT BIN_TO_UUID(t.product_uuid) AS product_uuid,
+                 b.bank_name                 AS bank_name,
+                 t.name,
+                 t.basic_rate,
+                 t.max_rate,
+                 t.type,
+                 t.maximum_amount,
+                 t.maximum_amount_per_month,
+                 t.maximum_amount_per_day,
+                 t.minimum_amount,
+                 t.minimum_amount_per_month,
+                 t.minimum_amount_per_day,
+                 t.tax_benefit,
+                 t.preferential_info,
+                 t.sub_amount,
+                 t.sub_target,
+                 t.sub_term,
+                 t.sub_way,
+                 pp.period                   AS product_period,
+                 pp.bank_rate                AS product_basic_rate
+          FROM topN t
+                   JOIN fitting pp
+                        ON pp.product_uuid = t.product_uuid
+                   JOIN bank b
+                        ON b.bank_uuid = t.bank_uuid
+          ORDER BY t.max_rate DESC, t.product_uuid, pp.period
+          """
+
+# 인메모리 카탈로그 스냅샷용 전체 조회 (삭제되지 않은 상품 + 기간 + 은행)
+LOAD_CATALOG_SQL = """
+          SELECT BIN_TO_UUID(bp.product_uuid) AS product_uuid,
+                 b.bank_name                  AS bank_name,
+                 bp.name,
+                 bp.basic_rate,
+                 bp.max_rate,
+                 bp.type,
+                 bp.maximum_amount,
+                 bp.maximum_amount_per_month,
+                 bp.maximum_amount_per_day,
+                 bp.minimum_amount,
+                 bp.minimum_amount_per_month,
+                 bp.minimum_amount_per_day,
+                 bp.tax_benefit,
+                 bp.preferential_info,
+                 bp.sub_amount,
+                 bp.sub_target,
+                 bp.sub_term,
+                 bp.sub_way,
+                 pp.period                    AS product_period,
+                 pp.bank_rate                 AS product_basic_rate
+          FROM bank_product bp
+                   JOIN product_period pp
+                        ON pp.product_uuid = bp.product_uuid
+                   JOIN bank b
+                        ON b.bank_uuid = bp.bank_uuid
+          WHERE bp.deleted_at IS NULL
+          ORDER BY bp.max_rate DESC, bp.product_uuid, pp.period
+          """
+
+
+DB_QUERY_LATENCY = REGISTRY.histogram("db_query_duration_seconds", "MySQL query time including fetch", ("query",))
+
 class ProductRepository:
 
     def __init__(self):
@@ -18,62 +126,38 @@ class ProductRepository:
         self.mysqlUtil = MysqlUtil()
         self.BankRepository = BankRepository()
 
-    def build_ai_payload(self, connection, top_n: int = 20) -> ai_payload_dto:
-        SQL = """
-              WITH topN AS (SELECT bp.product_uuid, \
-                                   bp.name, \
-                                   bp.bank_uuid, \
-                                   bp.basic_rate, \
-                                   bp.max_rate, \
-                                   bp.type, \
-                                   bp.maximum_amount, \
-                                   bp.maximum_amount_per_month, \
-                                   bp.maximum_amount_per_day, \
-                                   bp.minimum_amount, \
-                                   bp.minimum_amount_per_month, \
-                                   bp.minimum_amount_per_day, \
-                                   bp.tax_benefit, \
-                                   bp.preferential_info, \
-                                   bp.sub_amount, \
-                                   bp.sub_target, \
-                                   bp.sub_term, \
-                                   bp.sub_way \
-                            FROM bank_product bp \
-                            WHERE bp.deleted_at IS NULL \
-                            ORDER BY bp.max_rate DESC
-                  LIMIT %s
-                  )
-              SELECT BIN_TO_UUID(t.product_uuid) AS product_uuid,
-                     b.bank_name                 AS bank_name,
-                     t.name, \
-                     t.basic_rate, \
-                     t.max_rate, \
-                     t.type, \
-                     t.maximum_amount, \
-                     t.maximum_amount_per_month, \
-                     t.maximum_amount_per_day, \
-                     t.minimum_amount, \
-                     t.minimum_amount_per_month, \
-                     t.minimum_amount_per_day, \
-                     t.tax_benefit, \
-                     t.preferential_info, \
-                     t.sub_amount, \
-                     t.sub_target, \
-                     t.sub_term, \
-                     t.sub_way, \
-                     pp.period                   AS product_period, \
-                     pp.bank_rate                AS product_basic_rate
-              FROM topN t
-                       JOIN product_period pp
-                            ON pp.product_uuid = t.product_uuid
-                       JOIN bank b
-                            ON b.bank_uuid = t.bank_uuid
-              ORDER BY t.max_rate DESC, t.product_uuid, pp.period \
-              """
-        with connection.cursor(DictCursor) as cursor:
-            cursor.execute(SQL, (top_n,))
+    def _payload_params(self, request: request_combo_dto, top_n: int) -> dict:
+        return {"horizon": horizon_months(request.period), "amount": int(request.amount), "top_n": top_n}
+
+    def build_ai_payload(self, connection, request: request_combo_dto, top_n: int = 20) -> ai_payload_dto:
+        # 요청 기간/금액에 맞지 않는 상품은 SQL 에서 제외 (LLM 입력 토큰 절감)
+        with DB_QUERY_LATENCY.time(query="build_ai_payload"), connection.cursor(DictCursor) as cursor:
+            cursor.execute(BUILD_AI_PAYLOAD_SQL, self._payload_params(request, top_n))
+            rows = cursor.fetchall()
+
+        payload = self._rows_to_payload(rows)
+        self.logger.info(f"AI payload candidates: {len(payload.products)} products, {len(rows)} period rows "
+                         f"(amount={request.amount}, period={request.period})")
+        return payload
+
+    def load_catalog(self, connection) -> ai_payload_dto:
+        # 삭제되지 않은 전체 상품 (카탈로그 스냅샷 적재용)
+        with DB_QUERY_LATENCY.time(query="load_catalog"), connection.cursor(DictCursor) as cursor:
+            cursor.execute(LOAD_CATALOG_SQL)
             rows = cursor.fetchall()
 
+        return self._rows_to_payload(rows)
+
+    async def build_ai_payload_async(self, connection, request: request_combo_dto, top_n: int = 20) -> ai_payload_dto:
+        # asyncio 경로: aiomysql 커넥션 사용, 쿼리/매핑은 동기 버전과 동일
+        with DB_QUERY_LATENCY.time(query="build_ai_payload"):
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(BUILD_AI_PAYLOAD_SQL, self._payload_params(request, top_n))
+                rows = await cursor.fetchall()
+
+        return self._rows_to_payload(rows)
+
+    def _rows_to_payload(self, rows) -> ai_payload_dto:
         products: Dict[str, product_dto] = {}
 
         for r in rows:
@@ -149,41 +233,56 @@ class ProductRepository:
         mysql_connection.close()
         self.logger.info("상품 관련 데이터 삭제 끝")
 
-    def check_is_deleted(self, bank_name: str, new_products_name: set, connection):
+    def check_is_deleted(self, bank_name: str, new_products_name: set, connection) -> list:
+        """
+        이번 크롤링 결과에 없는 은행 상품을 soft delete (호출한 쪽 트랜잭션 안에서 SAVEPOINT 사용)
+        새로 삭제 처리한 product_uuid(bytes) 목록을 반환, 실패하면 삭제만 되돌리고 빈 목록
+        """
         self.logger.info("=====삭제 작업 시작=====")
-        cursor = connection.cursor()
+        deleted_uuids = []
+        # 은행 조회는 SAVEPOINT 전에: 여기서 끝나면 해제하지 않은 SAVEPOINT 가 호출한 쪽 트랜잭션에 남음
         try:
             bank_uuid = self.BankRepository.get_uuid_by_bank_name(bank_name=bank_name)
-            if bank_uuid is None:
-                self.logger.error(f"Bank UUID 가 없음: {bank_name}")
-                return
-
-            bank_uuid_bytes = bank_uuid.bytes
-
-            cursor.execute("SELECT name FROM bank_product WHERE bank_uuid = %s", (bank_uuid_bytes,))
-            existing_products_name = {row[0] for row in cursor.fetchall()}
-            for name in existing_products_name:
-                print(name)
-
-            deleted_target_set = existing_products_name.difference(new_products_name)
-            self.logger.info(f"삭제 대상 상품 수: {len(deleted_target_set)}")
+        except Exception:
+            self.logger.exception(f"Bank UUID 조회 실패: {bank_name}")
+            bank_uuid = None
+        if bank_uuid is None:
+            self.logger.error(f"Bank UUID 가 없음: {bank_name}")
+            self.logger.info("=====삭제 작업 끝=====")
+            return deleted_uuids
 
-            if deleted_target_set:
-                placeholders = ', '.join(['%s'] * len(deleted_target_set))
-                query = f"UPDATE bank_product SET deleted_at = %s WHERE name IN ({placeholders})"
-                cursor.execute(query, (datetime.datetime.now(), *deleted_target_set))
-                connection.commit()
-                self.logger.info("삭제 상태 업데이트 완료")
+        bank_uuid_bytes = bank_uuid.bytes
+        cursor = connection.cursor()
+        cursor.execute("SAVEPOINT check_is_deleted")
+        try:
+            # 이미 삭제된 상품은 다시 기록하지 않도록 deleted_at IS NULL 만 대상
+            cursor.execute("SELECT product_uuid, name FROM bank_product WHERE bank_uuid = %s AND deleted_at IS NULL",
+                           (bank_uuid_bytes,))
+            deleted_target = [(row[0], row[1]) for row in cursor.fetchall() if row[1] not in new_products_name]
+            self.logger.info(f"삭제 대상 상품 수: {len(deleted_target)}")
+
+            if deleted_target:
+                placeholders = ', '.join(['%s'] * len(deleted_target))
+                query = f"UPDATE bank_product SET deleted_at = %s WHERE product_uuid IN ({placeholders})"
+                cursor.execute(query, (datetime.datetime.now(), *[product_uuid for product_uuid, _ in deleted_target]))
+                deleted_uuids = [product_uuid for product_uuid, _ in deleted_target]
+                self.logger.info(f"삭제 상태 업데이트 완료: {[name for _, name in deleted_target]}")
             else:
                 self.logger.info("삭제 대상 없음, 업데이트 생략")
+            cursor.execute("RELEASE SAVEPOINT check_is_deleted")
 
         except Exception as e:
-            connection.rollback()
+            # ROLLBACK TO 는 SAVEPOINT 를 남겨 두므로 해제까지
+            cursor.execute("ROLLBACK TO SAVEPOINT check_is_deleted")
+            cursor.execute("RELEASE SAVEPOINT check_is_deleted")
+            deleted_uuids = []
             self.logger.exception("삭제 처리 중 오류 발생, 롤백 수행")
         finally:
             cursor.close()
             self.logger.info("=====삭제 작업 끝=====")
 
+        return deleted_uuids
+
     def check_duplicate_product(self, product_name, connection):
 
         self.logger.info("중복 상품 검사 시작")
@@ -199,7 +298,11 @@ class ProductRepository:
             cursor.close()
             return False
 
-    def save_one_product(self, product_data, bank_name, connection):
+    def save_one_product(self, product_data, bank_name, connection, inserted: list = None):
+        """
+        호출한 쪽 트랜잭션 안에서 상품 하나를 SAVEPOINT 로 삽입 (commit 은 호출한 쪽 책임)
+        실패하면 이 상품의 쓰기만 되돌림, 새로 삽입한 product_uuid(bytes) 는 inserted 에 추가
+        """
         self.logger.info("상품 데이터 삽입 시작")
 
         validation_result = self._validate_product_data_safe(product_data)
@@ -219,14 +322,10 @@ class ProductRepository:
         product_url_links: str = BankRepository().get_url_by_bank_name(bank_name=bank_name)
         product_info: str = "\\".join(product_data.product_info) if isinstance(product_data.product_info,
                                                                                list) else str(product_data.product_info)
-        self.logger.info("=== INFO 필드 데이터 로깅 ===")
-        self.logger.info(f"원본 product_info 타입: {type(product_data.product_info)}")
-        self.logger.info(f"원본 product_info 값: {product_data.product_info}")
-        self.logger.info(f"처리된 product_info (DB 저장용): {product_info}")
-        self.logger.info(f"처리된 product_info 길이: {len(product_info) if product_info else 0}자")
-        if product_info and len(product_info) > 100:
-            self.logger.info(f"product_info 미리보기 (처음 100자): {product_info[:100]}...")
-        self.logger.info("=== INFO 필드 로깅 끝 ===")
+        # product_info 원문은 상품마다 수 KB 라 샘플링해서만 남김
+        self.logger.debug("product_info type=%s, length=%d", type(product_data.product_info),
+                          len(product_info) if product_info else 0)
+        log_payload(self.logger, "처리된 product_info (DB 저장용)", product_info)
 
         product_maximum_amount: int = product_data.product_maximum_amount
         product_minimum_amount: int = product_data.product_minimum_amount
@@ -255,9 +354,9 @@ class ProductRepository:
             self.logger.info("이미 존재하는 상품입니다.")
             return True  # 중복이므로 성공으로 간주
 
+        cursor = connection.cursor()
         try:
-            connection.begin()
-            cursor = connection.cursor()
+            cursor.execute("SAVEPOINT save_one_product")
             product_uuid = uuid.uuid4().bytes
             bank_uuid = self.BankRepository.get_uuid_by_bank_name(bank_name=bank_name)
             if bank_uuid is None:
@@ -322,8 +421,8 @@ class ProductRepository:
 
             if product_period_period and product_period_base_rate:
                 period_insert_sql = (
-                    "INSERT INTO product_period (period_uuid, product_uuid, period, bank_rate) "
-                    "VALUES (%s, %s, %s, %s)"
+                    "INSERT INTO product_period (period_uuid, product_uuid, period, bank_rate, min_months, max_months,"
+                    " period_parsed) VALUES (%s, %s, %s, %s, %s, %s, 1)"
                 )
 
                 for i in range(len(product_period_period)):
@@ -331,14 +430,19 @@ class ProductRepository:
                     period = product_period_period[i]
                     base_rate = product_period_base_rate[i]
 
-                    params = (period_uuid, product_uuid, period, base_rate)
+                    # 범위 조회용 숫자 컬럼, 파싱 실패/제한 없음은 NULL
+                    min_months, max_months = parse_period_range(period) or (None, None)
+
+                    params = (period_uuid, product_uuid, period, base_rate, min_months, max_months)
                     cursor.execute(period_insert_sql, params)
 
                 self.logger.info(f"product_period {len(product_period_period)}개 삽입 완료")
             else:
                 self.logger.info("기간 데이터가 없어 product_period 삽입 건너뜀")
 
-            connection.commit()
+            cursor.execute("RELEASE SAVEPOINT save_one_product")
+            if inserted is not None:
+                inserted.append(product_uuid)
             self.logger.info("상품 데이터 삽입 성공")
             return True
 
@@ -355,7 +459,7 @@ class ProductRepository:
                 preferential_conditions_detail_interest_rate, preferential_conditions_detail_keyword,
                 product_period_period,
             )
-            connection.rollback()
+            cursor.execute("ROLLBACK TO SAVEPOINT save_one_product")
             return False  # 실패
         finally:
             cursor.close()
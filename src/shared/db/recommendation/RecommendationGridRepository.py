@@ -0,0 +1,57 @@
+import logging
+from typing import Optional, Tuple
+
+
+class RecommendationGridRepository:
+    """
+    크롤링 후 미리 계산한 추천 결과 (금액 버킷 × 기간 × 모델 × 카탈로그 버전)
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def ensure_table(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS recommendation_grid ("
+                "  amount_bucket BIGINT NOT NULL,"
+                "  period VARCHAR(10) NOT NULL,"
+                "  model VARCHAR(50) NOT NULL,"
+                "  catalog_version BIGINT NOT NULL,"
+                "  response_json MEDIUMTEXT NOT NULL,"
+                "  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+                "  PRIMARY KEY (catalog_version, period, model, amount_bucket)"
+                ")"
+            )
+        connection.commit()
+
+    def save(self, connection, amount_bucket: int, period: str, model: str, catalog_version: int, response_json: str):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO recommendation_grid (amount_bucket, period, model, catalog_version, response_json) "
+                "VALUES (%s, %s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE response_json = VALUES(response_json), created_at = CURRENT_TIMESTAMP",
+                (amount_bucket, period, model, catalog_version, response_json),
+            )
+        connection.commit()
+
+    def find_nearest(self, connection, amount: int, period: str, model: str,
+                     catalog_version: int) -> Optional[Tuple[int, str]]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT amount_bucket, response_json FROM recommendation_grid "
+                "WHERE catalog_version = %s AND period = %s AND model = %s "
+                "ORDER BY ABS(amount_bucket - %s), amount_bucket LIMIT 1",
+                (catalog_version, period, model, amount),
+            )
+            row = cursor.fetchone()
+        if not row:
+            return None
+        return int(row[0]), row[1]
+
+    def delete_older_than(self, connection, catalog_version: int) -> int:
+        with connection.cursor() as cursor:
+            deleted = cursor.execute("DELETE FROM recommendation_grid WHERE catalog_version < %s", (catalog_version,))
+        connection.commit()
+        self.logger.info(f"이전 카탈로그 버전 추천 그리드 삭제: {deleted}건")
+        return deleted
@@ -0,0 +1,127 @@
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from src.shared.db.util.MysqlUtil import MysqlUtil
+
+
+class MysqlPool:
+    """
+    프로세스 단위로 공유하는 pymysql 커넥션 풀
+    - 요청 스레드마다 connect/close 하지 않고 미리 열어둔 커넥션을 재사용
+    - 꺼낼 때 ping(reconnect=True) 로 끊어진 커넥션 복구
+    - 돌려받을 때 rollback 으로 열린 트랜잭션(읽기 스냅샷) 종료
+    """
+
+    def __init__(self, mysqlUtil: MysqlUtil = None, size: int = None, acquire_timeout_sec: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.mysqlUtil = mysqlUtil or MysqlUtil()
+        self.size = size or int(os.getenv("DATABASE_POOL_SIZE", "5"))
+        self.acquire_timeout_sec = acquire_timeout_sec or float(os.getenv("DATABASE_POOL_TIMEOUT", "10"))
+
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def warm(self, count: int = None):
+        target = min(self.size, count or self.size)
+        opened = 0
+        while True:
+            with self._lock:
+                if self._closed or self._created >= target:
+                    break
+                self._created += 1
+            try:
+                self._idle.put_nowait(self.mysqlUtil.get_connection())
+                opened += 1
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        self.logger.info(f"MySQL 커넥션 풀 워밍 완료: {opened}개 생성 (size={self.size})")
+
+    def _acquire(self):
+        if self._closed:
+            raise RuntimeError("MySQL 커넥션 풀이 이미 종료됨")
+
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = None
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create_new = True
+                else:
+                    create_new = False
+            if create_new:
+                try:
+                    return self.mysqlUtil.get_connection()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            try:
+                connection = self._idle.get(timeout=self.acquire_timeout_sec)
+            except queue.Empty:
+                raise TimeoutError(f"MySQL 커넥션 대기 시간 초과 ({self.acquire_timeout_sec}s)")
+
+        try:
+            connection.ping(reconnect=True)
+        except Exception:
+            self._discard(connection)
+            return self._acquire()
+        return connection
+
+    def _release(self, connection):
+        if self._closed:
+            self._discard(connection)
+            return
+        # autocommit 이 꺼져 있어 읽기만 해도 트랜잭션이 열림, REPEATABLE READ 스냅샷이 다음 요청까지 남지 않도록 종료
+        # (쓰기는 각 repository 가 직접 commit)
+        try:
+            connection.rollback()
+        except Exception:
+            self._discard(connection)
+            return
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            self._discard(connection)
+
+    def _discard(self, connection):
+        with self._lock:
+            self._created -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        connection = self._acquire()
+        try:
+            yield connection
+        except Exception:
+            try:
+                connection.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self._release(connection)
+
+    def close(self):
+        self._closed = True
+        closed = 0
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+            closed += 1
+        self.logger.info(f"MySQL 커넥션 풀 종료: {closed}개 닫음")
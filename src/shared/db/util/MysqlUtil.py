@@ -1,5 +1,6 @@
 import os
 
+import aiomysql
 import pymysql
 from dotenv import load_dotenv
 
@@ -18,3 +19,9 @@ class MysqlUtil:
         connect = pymysql.connect(host=self.host, port=int(self.port), user=self.user, password=self.password, db=self.db, charset=self.char_set, )
         return connect
 
+    async def create_async_pool(self, minsize: int = 1, maxsize: int = None):
+        # asyncio 서빙 경로용 aiomysql 풀
+        maxsize = maxsize or int(os.getenv("DATABASE_POOL_SIZE", "5"))
+        return await aiomysql.create_pool(host=self.host, port=int(self.port), user=self.user, password=self.password,
+                                          db=self.db, charset=self.char_set, minsize=minsize, maxsize=maxsize,
+                                          autocommit=True)
@@ -0,0 +1,571 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, TypeVar
+
+from src.shared.llm.RateLimiter import INTERACTIVE, SqliteRateLimiter
+from src.shared.util.metricsUtil import REGISTRY
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# 동시성 한도를 줄이는 과부하 신호
+OVERLOAD_STATUS = {429, 503}
+RETRYABLE_ERROR_NAMES = ("APIConnectionError", "APITimeoutError", "ConnectError", "ConnectTimeout",
+                         "ReadTimeout", "RemoteProtocolError")
+
+# 같은 provider 안에서의 기본 대체 순서, LLM_FALLBACK_CHAINS 로 덮어씀
+DEFAULT_FALLBACKS = {
+    "gpt-5": ["gpt-5-mini"],
+    "gemini-2.5-pro": ["gemini-2.5-flash"],
+}
+
+LLM_LATENCY = REGISTRY.histogram("llm_request_duration_seconds",
+                                 "LLM provider call latency per attempt (stream: until last chunk)",
+                                 ("model", "outcome"))
+LLM_RETRIES = REGISTRY.counter("llm_retries", "LLM attempts retried after a retryable error", ("model",))
+LLM_FALLBACKS = REGISTRY.counter("llm_fallbacks", "LLM calls that gave up on a model and moved to the next",
+                                 ("model",))
+
+
+class LlmGatewayError(RuntimeError):
+    pass
+
+
+class _StreamBrokenError(Exception):
+    # 조각을 내보낸 뒤의 실패 표시 (대체 모델로 넘기지 않고 원래 오류를 전파)
+    pass
+
+
+class LlmUnavailableError(LlmGatewayError):
+    # 대체 체인의 모든 모델이 실패했거나 차단(circuit open)된 경우
+    pass
+
+
+class LlmCircuitOpenError(LlmGatewayError):
+    pass
+
+
+class LlmDeadlineExceededError(LlmGatewayError, TimeoutError):
+    pass
+
+
+class LlmCancelledError(LlmGatewayError):
+    pass
+
+
+class RateRequest(NamedTuple):
+    # 공유 rate limiter 에서 차감할 내용: API 키 fingerprint, 우선순위, 예상 입력 토큰 수
+    key: str = "default"
+    priority: str = INTERACTIVE
+    cost_tokens: int = 0
+
+
+def status_of(e: Exception) -> Optional[int]:
+    # openai: status_code, google-genai: code
+    for attr in ("status_code", "code"):
+        value = getattr(e, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(e: Exception) -> bool:
+    if isinstance(e, (TimeoutError, ConnectionError)):
+        return True
+    status = status_of(e)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(e).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def is_overload(e: Exception) -> bool:
+    return status_of(e) in OVERLOAD_STATUS or isinstance(e, TimeoutError) or type(e).__name__ == "APITimeoutError"
+
+
+class CircuitBreaker:
+    """
+    모델별 회로 차단기
+    - closed: 재시도 대상 오류가 failure_threshold 번 연속이면 open
+    - open: reset_timeout 동안 호출하지 않고 즉시 실패 (대체 모델로 넘어감)
+    - half_open: reset_timeout 이 지나면 한 번만 시험 호출, 성공하면 closed / 실패하면 다시 open
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open":
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open":
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        # 결과를 판단할 수 없는 경우(취소/마감) 시험 호출 권한만 반납
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = self.clock()
+            self._probe_in_flight = False
+
+
+class AimdLimiter:
+    """
+    모델별 적응형 동시성 한도 (AIMD)
+    - 성공할 때마다 limit += increase / limit (limit 번 성공하면 약 +1)
+    - 과부하(429/503/타임아웃)면 limit *= decrease, 한 번의 폭주로 여러 번 줄지 않도록 cooldown 적용
+    - 한도가 차면 acquire 에서 대기
+    """
+
+    def __init__(self, initial: float = 8, min_limit: float = 1, max_limit: float = 64,
+                 increase: float = 1.0, decrease: float = 0.5, cooldown_sec: float = 1.0, clock=time.monotonic):
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown_sec = cooldown_sec
+        self.clock = clock
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self, timeout: float = None) -> bool:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, outcome: str):
+        # outcome: success / overload / ignore (그 외 오류는 한도에 반영하지 않음)
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "success":
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            elif outcome == "overload":
+                now = self.clock()
+                if now - self._last_decrease >= self.cooldown_sec:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_decrease = now
+            self._cond.notify_all()
+
+
+class RetryBudget:
+    """
+    재시도 예산: 최근 window_sec 동안 재시도 수 <= ratio × 요청 수 + min_retries
+    - provider 장애 시 재시도가 부하를 몇 배로 키우는 것을 막음
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window_sec: float = 10.0, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_sec = window_sec
+        self.clock = clock
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window_sec:
+                events.popleft()
+
+    def record_request(self):
+        with self._lock:
+            now = self.clock()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            now = self.clock()
+            self._trim(now)
+            if len(self._retries) >= self.ratio * len(self._requests) + self.min_retries:
+                return False
+            self._retries.append(now)
+            return True
+
+
+class LlmGateway:
+    """
+    LLM 호출 공통 게이트웨이 (ai_gpt / ai_gemini / LlmUtil)
+    - call(models, fn): models 순서대로 대체, 모델마다 회로 차단기 + AIMD 동시성 한도 + 재시도
+    - fn(model, timeout) 은 실제 SDK 호출 하나, timeout 은 deadline 까지 남은 초 (없으면 None)
+    - 재시도: is_retryable 오류만, full jitter 지수 백오프, 프로세스 전체 재시도 예산 안에서
+    - deadline(time.monotonic 기준 절대 시각)을 넘기는 대기/호출은 하지 않고 LlmDeadlineExceededError
+    - rate_limiter 가 있으면 호출마다 프로세스 간 공유 token bucket 에서 먼저 차감 (RateRequest)
+    - 프로세스당 하나를 공유 (LlmGateway.shared()), 테스트에서는 새로 만들어 주입
+    """
+
+    _shared: "LlmGateway" = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 30.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 initial_limit: float = 8, max_limit: float = 64, acquire_timeout: float = 60.0,
+                 retry_ratio: float = 0.2, min_retries: int = 10,
+                 fallbacks: Dict[str, List[str]] = None, rate_limiter: SqliteRateLimiter = None,
+                 clock=time.monotonic):
+        self.logger = logging.getLogger(__name__)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.initial_limit = initial_limit
+        self.max_limit = max_limit
+        self.acquire_timeout = acquire_timeout
+        self.fallbacks = DEFAULT_FALLBACKS if fallbacks is None else fallbacks
+        self.rate_limiter = rate_limiter
+        self.clock = clock
+        self.budget = RetryBudget(ratio=retry_ratio, min_retries=min_retries, clock=clock)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._limiters: Dict[str, AimdLimiter] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LlmGateway":
+        return cls(
+            max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "5")),
+            base_delay=float(os.getenv("LLM_BACKOFF_BASE_SEC", "1")),
+            max_delay=float(os.getenv("LLM_BACKOFF_MAX_SEC", "30")),
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SEC", "30")),
+            initial_limit=float(os.getenv("LLM_CONCURRENCY_INITIAL", "8")),
+            max_limit=float(os.getenv("LLM_CONCURRENCY_MAX", "64")),
+            retry_ratio=float(os.getenv("LLM_RETRY_BUDGET_RATIO", "0.2")),
+            fallbacks=cls._fallbacks_from_env(os.getenv("LLM_FALLBACK_CHAINS")),
+            rate_limiter=SqliteRateLimiter.from_env(),
+        )
+
+    @staticmethod
+    def _fallbacks_from_env(value: Optional[str]) -> Optional[Dict[str, List[str]]]:
+        # LLM_FALLBACK_CHAINS="gpt-5=gpt-5-mini;gemini-2.5-pro=gemini-2.5-flash", 빈 문자열이면 대체 없음
+        if value is None:
+            return None
+        chains = {}
+        for item in value.split(";"):
+            if "=" in item:
+                model, fallbacks = item.split("=", 1)
+                chains[model.strip()] = [m.strip() for m in fallbacks.split(",") if m.strip()]
+        return chains
+
+    @classmethod
+    def shared(cls) -> "LlmGateway":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_env()
+                REGISTRY.register_collector("llm_gateway", cls._shared.collect_metrics)
+            return cls._shared
+
+    def chain(self, model: str) -> List[str]:
+        return [model] + [m for m in self.fallbacks.get(model, []) if m != model]
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            if model not in self._breakers:
+                self._breakers[model] = CircuitBreaker(self.failure_threshold, self.reset_timeout, clock=self.clock)
+            return self._breakers[model]
+
+    def limiter(self, model: str) -> AimdLimiter:
+        with self._lock:
+            if model not in self._limiters:
+                self._limiters[model] = AimdLimiter(initial=self.initial_limit, max_limit=self.max_limit,
+                                                    clock=self.clock)
+            return self._limiters[model]
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            models = set(self._breakers) | set(self._limiters)
+        return {
+            model: {
+                "state": self.breaker(model).state,
+                "limit": round(self.limiter(model).limit, 2),
+                "in_flight": self.limiter(model).in_flight,
+            }
+            for model in sorted(models)
+        }
+
+    def collect_metrics(self):
+        # /metrics 스크레이프 시점의 회로 차단기 / 동시성 한도 상태
+        snapshot = self.snapshot()
+        yield ("llm_circuit_open", "gauge", "1 if the model circuit breaker is open or half open",
+               [({"model": model}, 0 if state["state"] == "closed" else 1) for model, state in snapshot.items()])
+        yield ("llm_concurrency_limit", "gauge", "Current AIMD concurrency limit per model",
+               [({"model": model}, state["limit"]) for model, state in snapshot.items()])
+        yield ("llm_in_flight", "gauge", "LLM calls currently in flight per model",
+               [({"model": model}, state["in_flight"]) for model, state in snapshot.items()])
+
+    # ---- 공통 판단 ----
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - self.clock()
+        if remaining <= 0:
+            raise LlmDeadlineExceededError("LLM deadline exceeded")
+        return remaining
+
+    def _check_cancel(self, cancel_event: threading.Event = None):
+        if cancel_event is not None and cancel_event.is_set():
+            raise LlmCancelledError("generation cancelled")
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: [0, min(max_delay, base × 2^(attempt-1))]
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _rate_acquire(self, model: str, rate: Optional[RateRequest], deadline: Optional[float]):
+        if self.rate_limiter is None:
+            return
+        rate = rate or RateRequest()
+        self.rate_limiter.acquire(rate.key, model, rate.cost_tokens, rate.priority, deadline)
+
+    def _record_failure(self, model: str, e: Exception, rate: Optional[RateRequest] = None) -> bool:
+        retryable = is_retryable(e)
+        self.limiter(model).release("overload" if is_overload(e) else "ignore")
+        if self.rate_limiter is not None and status_of(e) == 429:
+            try:
+                self.rate_limiter.drain((rate or RateRequest()).key, model)
+            except Exception as drain_error:
+                self.logger.warning(f"Rate limiter drain failed: {drain_error}")
+        # 4xx 같은 요청 오류는 provider 는 살아 있다는 뜻
+        if retryable:
+            self.breaker(model).record_failure()
+        else:
+            self.breaker(model).record_success()
+        return retryable
+
+    def _record_success(self, model: str):
+        self.limiter(model).release("success")
+        self.breaker(model).record_success()
+
+    def _retry_wait(self, model: str, e: Exception, attempt: int, deadline: Optional[float]) -> float:
+        # 재시도할 대기 시간, 재시도하지 않으면 e 를 그대로 던짐
+        if attempt >= self.max_attempts or self.breaker(model).state == "open":
+            raise e
+        if not self.budget.try_spend():
+            self.logger.warning(f"{model} retry budget exhausted, not retrying: {e}")
+            raise e
+        wait = self._backoff(attempt)
+        if deadline is not None and self.clock() + wait >= deadline:
+            raise LlmDeadlineExceededError(f"{model} deadline exceeded while retrying: {e}") from e
+        self.logger.warning(f"{model} attempt {attempt}/{self.max_attempts} failed "
+                            f"(status={status_of(e)}), retry after {wait:.1f}s: {e}")
+        LLM_RETRIES.inc(model=model)
+        return wait
+
+    def _sleep(self, wait: float, cancel_event: threading.Event = None):
+        if cancel_event is None:
+            time.sleep(wait)
+        elif cancel_event.wait(wait):
+            raise LlmCancelledError("generation cancelled")
+
+    def _acquire(self, model: str, deadline: Optional[float], cancel_event: threading.Event = None):
+        limiter = self.limiter(model)
+        limit_at = self.clock() + self.acquire_timeout
+        if deadline is not None:
+            limit_at = min(limit_at, deadline)
+        while not limiter.acquire(timeout=min(1.0, max(0.0, limit_at - self.clock()))):
+            self._check_cancel(cancel_event)
+            if self.clock() >= limit_at:
+                self._remaining(deadline)
+                raise LlmGatewayError(f"{model} concurrency limit {int(limiter.limit)} reached")
+        if not self.breaker(model).allow():
+            limiter.release("ignore")
+            raise LlmCircuitOpenError(f"{model} circuit open")
+
+    async def _acquire_async(self, model: str, deadline: Optional[float]):
+        limiter = self.limiter(model)
+        limit_at = self.clock() + self.acquire_timeout
+        if deadline is not None:
+            limit_at = min(limit_at, deadline)
+        while not limiter.try_acquire():
+            if self.clock() >= limit_at:
+                self._remaining(deadline)
+                raise LlmGatewayError(f"{model} concurrency limit {int(limiter.limit)} reached")
+            await asyncio.sleep(0.05)
+        if not self.breaker(model).allow():
+            limiter.release("ignore")
+            raise LlmCircuitOpenError(f"{model} circuit open")
+
+    def _remaining_or_release(self, model: str, deadline: Optional[float]) -> Optional[float]:
+        # 슬롯을 잡은 뒤 마감이 지났으면 호출하지 않고 슬롯/시험 호출 권한만 돌려줌
+        try:
+            return self._remaining(deadline)
+        except LlmDeadlineExceededError:
+            self.limiter(model).release("ignore")
+            self.breaker(model).release()
+            raise
+
+    def _start(self, model: str, deadline: Optional[float], cancel_event: threading.Event = None,
+               rate: RateRequest = None) -> Optional[float]:
+        # 공유 rate limit → 동시성 슬롯 → 회로 차단기 순으로 통과한 뒤 SDK 에 넘길 남은 시간
+        self._rate_acquire(model, rate, deadline)
+        self._acquire(model, deadline, cancel_event)
+        return self._remaining_or_release(model, deadline)
+
+    def _fallback(self, models: Sequence[str], model: str, e: Exception):
+        # 취소/마감은 다른 모델로 넘겨도 의미가 없으므로 그대로
+        if isinstance(e, (LlmCancelledError, LlmDeadlineExceededError)):
+            raise e
+        if model != models[-1]:
+            LLM_FALLBACKS.inc(model=model)
+            self.logger.warning(f"{model} failed, falling back to next model: {e}")
+
+    # ---- 호출 ----
+
+    def call(self, models: Sequence[str], fn: Callable[[str, Optional[float]], T], deadline: float = None,
+             cancel_event: threading.Event = None, rate: RateRequest = None) -> T:
+        self.budget.record_request()
+        last_error: Exception = None
+        for model in models:
+            try:
+                return self._call_model(model, fn, deadline, cancel_event, rate)
+            except Exception as e:
+                self._fallback(models, model, e)
+                last_error = e
+        raise LlmUnavailableError(f"All models failed {list(models)}: {last_error}") from last_error
+
+    def _call_model(self, model: str, fn, deadline: Optional[float], cancel_event: threading.Event = None,
+                    rate: RateRequest = None):
+        for attempt in range(1, self.max_attempts + 1):
+            self._check_cancel(cancel_event)
+            timeout = self._start(model, deadline, cancel_event, rate)
+            started_at = time.perf_counter()
+            try:
+                result = fn(model, timeout)
+            except Exception as e:
+                LLM_LATENCY.observe(time.perf_counter() - started_at, model=model, outcome="error")
+                self._record_failure(model, e, rate)
+                if not is_retryable(e):
+                    raise
+                self._sleep(self._retry_wait(model, e, attempt, deadline), cancel_event)
+                continue
+            LLM_LATENCY.observe(time.perf_counter() - started_at, model=model, outcome="success")
+            self._record_success(model)
+            return result
+
+    async def call_async(self, models: Sequence[str], fn: Callable[[str, Optional[float]], Awaitable[T]],
+                         deadline: float = None, rate: RateRequest = None) -> T:
+        # asyncio 경로: 취소는 Task.cancel 로 전파되므로 cancel_event 없음
+        self.budget.record_request()
+        last_error: Exception = None
+        for model in models:
+            try:
+                return await self._call_model_async(model, fn, deadline, rate)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._fallback(models, model, e)
+                last_error = e
+        raise LlmUnavailableError(f"All models failed {list(models)}: {last_error}") from last_error
+
+    async def _call_model_async(self, model: str, fn, deadline: Optional[float], rate: RateRequest = None):
+        for attempt in range(1, self.max_attempts + 1):
+            if self.rate_limiter is not None:
+                # SQLite 파일 잠금/대기는 이벤트 루프 밖에서
+                await asyncio.to_thread(self._rate_acquire, model, rate, deadline)
+            await self._acquire_async(model, deadline)
+            timeout = self._remaining_or_release(model, deadline)
+            started_at = time.perf_counter()
+            try:
+                result = await fn(model, timeout)
+            except asyncio.CancelledError:
+                self.limiter(model).release("ignore")
+                self.breaker(model).release()
+                raise
+            except Exception as e:
+                LLM_LATENCY.observe(time.perf_counter() - started_at, model=model, outcome="error")
+                self._record_failure(model, e, rate)
+                if not is_retryable(e):
+                    raise
+                await asyncio.sleep(self._retry_wait(model, e, attempt, deadline))
+                continue
+            LLM_LATENCY.observe(time.perf_counter() - started_at, model=model, outcome="success")
+            self._record_success(model)
+            return result
+
+    def stream(self, models: Sequence[str], fn: Callable[[str, Optional[float]], Iterator[T]],
+               deadline: float = None, cancel_event: threading.Event = None, rate: RateRequest = None) -> Iterator[T]:
+        """
+        스트리밍 호출: 첫 조각을 받기 전의 오류만 재시도/대체
+        이미 조각을 내보낸 뒤의 오류는 중간부터 다시 받을 수 없으므로 그대로 전파
+        """
+        self.budget.record_request()
+        last_error: Exception = None
+        for model in models:
+            try:
+                yield from self._stream_model(model, fn, deadline, cancel_event, rate)
+                return
+            except _StreamBrokenError as e:
+                raise e.__cause__
+            except Exception as e:
+                self._fallback(models, model, e)
+                last_error = e
+        raise LlmUnavailableError(f"All models failed {list(models)}: {last_error}") from last_error
+
+    def _stream_model(self, model: str, fn, deadline: Optional[float], cancel_event: threading.Event = None,
+                      rate: RateRequest = None):
+        for attempt in range(1, self.max_attempts + 1):
+            self._check_cancel(cancel_event)
+            timeout = self._start(model, deadline, cancel_event, rate)
+            started_at = time.perf_counter()
+            started = False
+            try:
+                for chunk in fn(model, timeout):
+                    started = True
+                    yield chunk
+            except GeneratorExit:
+                # 소비하는 쪽이 중간에 멈춘 경우, provider 상태와 무관
+                self.limiter(model).release("ignore")
+                self.breaker(model).release()
+                raise
+            except Exception as e:
+                LLM_LATENCY.observe(time.perf_counter() - started_at, model=model, outcome="error")
+                self._record_failure(model, e, rate)
+                if started:
+                    raise _StreamBrokenError() from e
+                if not is_retryable(e):
+                    raise
+                self._sleep(self._retry_wait(model, e, attempt, deadline), cancel_event)
+                continue
+            LLM_LATENCY.observe(time.perf_counter() - started_at, model=model, outcome="success")
+            self._record_success(model)
+            return
@@ -0,0 +1,456 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+
+class ReplayMissError(LookupError):
+    # 녹화되지 않은 요청 (status 가 없어 게이트웨이는 재시도하지 않고 대체 모델로 넘어감)
+    pass
+
+
+class ReplayInjectedError(RuntimeError):
+    # 오류 주입: provider SDK 오류처럼 status_code 를 가져 게이트웨이의 재시도/회로 차단 경로를 그대로 탐
+    def __init__(self, status_code: int):
+        super().__init__(f"injected provider error {status_code}")
+        self.status_code = status_code
+
+
+class ReplayTimeoutError(TimeoutError):
+    pass
+
+
+def request_hash(provider: str, **request) -> str:
+    # 모델은 키에서 제외 (대체 모델로 넘어가도 같은 프롬프트면 재생), 모델은 컬럼으로만 저장
+    body = json.dumps({"provider": provider, **request}, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _schema_name(schema) -> Optional[str]:
+    return getattr(schema, "__name__", None) if schema is not None else None
+
+
+class ReplayStore:
+    """프롬프트 해시 → (모델, 응답, 지연 시간) 을 저장하는 SQLite 파일"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_replay ("
+                "  request_hash TEXT NOT NULL,"
+                "  model TEXT NOT NULL,"
+                "  response TEXT NOT NULL,"
+                "  latency_ms REAL NOT NULL,"
+                "  recorded_at REAL NOT NULL,"
+                "  PRIMARY KEY (request_hash, model)"
+                ")"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def put(self, key: str, model: str, response: Dict, latency_ms: float):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_replay (request_hash, model, response, latency_ms, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(response, ensure_ascii=False), latency_ms, time.time()),
+            )
+
+    def get(self, key: str, model: str) -> Optional[Tuple[Dict, float]]:
+        # 같은 모델로 녹화된 응답 우선, 없으면 같은 프롬프트의 다른 모델 응답
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, latency_ms FROM llm_replay WHERE request_hash = ? "
+                "ORDER BY model = ? DESC, recorded_at DESC LIMIT 1",
+                (key, model),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+
+class FaultInjector:
+    """
+    재생 시 지연 시간 / 오류 주입
+    - latency_ms 가 None 이면 녹화된 지연 시간을 그대로, 아니면 고정값 (+ 0~jitter_ms)
+    - error_rate 비율로 error_statuses 중 하나를 던짐 (seed 고정이면 실행마다 같은 순서)
+    - 지연이 호출 timeout 보다 길면 timeout 만큼 기다린 뒤 ReplayTimeoutError
+    """
+
+    def __init__(self, latency_ms: float = None, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 error_statuses: Tuple[int, ...] = (503,), seed: int = 0, sleep=time.sleep):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def plan(self, recorded_ms: float, timeout: float = None) -> Tuple[float, Optional[Exception]]:
+        # (기다릴 초, 던질 오류)
+        with self._lock:
+            latency_ms = recorded_ms if self.latency_ms is None else self.latency_ms
+            latency_ms += self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            error = None
+            if self.error_rate and self._random.random() < self.error_rate:
+                error = ReplayInjectedError(self._random.choice(self.error_statuses))
+        delay = latency_ms / 1000.0
+        if timeout is not None and delay > timeout:
+            return timeout, ReplayTimeoutError(f"replayed latency {latency_ms:.0f}ms exceeds timeout {timeout:.1f}s")
+        return delay, error
+
+    def apply(self, recorded_ms: float, timeout: float = None):
+        delay, error = self.plan(recorded_ms, timeout)
+        if delay > 0:
+            self.sleep(delay)
+        if error is not None:
+            raise error
+
+    async def apply_async(self, recorded_ms: float, timeout: float = None):
+        delay, error = self.plan(recorded_ms, timeout)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+
+
+class LlmReplayBackend:
+    """
+    LLM_BACKEND=record|replay 일 때 ai_gemini / ai_gpt / LlmUtil 이 쓰는 SDK 모양의 client 를 만들어 줌
+    - record: 실제 client 를 감싸 응답과 지연 시간을 LLM_REPLAY_DB 에 저장
+    - replay: API 키 없이 저장된 응답을 재생 (FaultInjector 로 지연/오류 주입)
+    - 게이트웨이 / 파싱 / 캐시 / 검증 등 주변 코드는 실제와 똑같이 동작
+    - record 중에는 Gemini explicit context cache 를 쓰지 않음 (system_instruction 이 키에 들어가야 재생 가능)
+    """
+
+    def __init__(self, mode: str, store: ReplayStore, faults: FaultInjector = None, chunk_chars: int = 64):
+        self.logger = logging.getLogger(__name__)
+        self.mode = mode
+        self.store = store
+        self.faults = faults or FaultInjector()
+        self.chunk_chars = chunk_chars
+
+    @classmethod
+    def from_env(cls) -> Optional["LlmReplayBackend"]:
+        mode = os.getenv("LLM_BACKEND", LIVE).lower()
+        if mode == LIVE:
+            return None
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"LLM_BACKEND must be one of live/record/replay: {mode}")
+        latency = os.getenv("LLM_REPLAY_LATENCY_MS")
+        faults = FaultInjector(
+            latency_ms=float(latency) if latency else None,
+            jitter_ms=float(os.getenv("LLM_REPLAY_JITTER_MS", "0")),
+            error_rate=float(os.getenv("LLM_REPLAY_ERROR_RATE", "0")),
+            error_statuses=tuple(int(s) for s in os.getenv("LLM_REPLAY_ERROR_STATUS", "503").split(",") if s),
+            seed=int(os.getenv("LLM_REPLAY_SEED", "0")),
+        )
+        return cls(mode, ReplayStore(os.getenv("LLM_REPLAY_DB", "replay/llm_replay.db")), faults)
+
+    @property
+    def records(self) -> bool:
+        return self.mode == RECORD
+
+    def gemini_client(self, real=None):
+        return _gemini_client(self, real)
+
+    def openai_client(self, real=None):
+        return _openai_client(self, real)
+
+    def openai_async_client(self, real_factory: Callable = None):
+        return _openai_async_client(self, real_factory)
+
+    def chunks(self, text: str) -> List[str]:
+        return [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+
+    def lookup(self, key: str, model: str) -> Tuple[Dict, float]:
+        found = self.store.get(key, model)
+        if found is None:
+            raise ReplayMissError(f"no recorded response for {model} ({key[:12]})")
+        return found
+
+    def save(self, key: str, model: str, response: Dict, started: float):
+        latency_ms = (time.monotonic() - started) * 1000
+        try:
+            self.store.put(key, model, response, latency_ms)
+        except Exception as e:
+            # 녹화 실패로 실제 호출 결과를 버리지 않음
+            self.logger.warning("LLM replay record failed: %s", e)
+
+
+class _context_cache_disabled:
+    def create(self, **kwargs):
+        raise RuntimeError("context cache is disabled while recording/replaying LLM responses")
+
+
+# ----- Gemini (google-genai): models.generate_content / generate_content_stream / aio.models.generate_content -----
+
+def _gemini_request(contents, config) -> Tuple[str, Optional[float], object]:
+    key = request_hash("gemini", system=getattr(config, "system_instruction", None), contents=contents,
+                       schema=_schema_name(getattr(config, "response_schema", None)))
+    http_options = getattr(config, "http_options", None)
+    timeout_ms = getattr(http_options, "timeout", None)
+    return key, (timeout_ms / 1000.0 if timeout_ms else None), getattr(config, "response_schema", None)
+
+
+def _gemini_dump(text: str, usage) -> Dict:
+    return {
+        "text": text,
+        "usage": None if usage is None else {
+            "prompt_token_count": getattr(usage, "prompt_token_count", None),
+            "cached_content_token_count": getattr(usage, "cached_content_token_count", None),
+            "candidates_token_count": getattr(usage, "candidates_token_count", None),
+        },
+    }
+
+
+def _gemini_load(data: Dict, schema, text: str = None):
+    text = data["text"] if text is None else text
+    usage = SimpleNamespace(**data["usage"]) if data.get("usage") else None
+    parsed = schema.model_validate_json(data["text"]) if schema is not None and text else None
+    return SimpleNamespace(text=text, parsed=parsed, usage_metadata=usage, candidates=None)
+
+
+class _gemini_models:
+    def __init__(self, backend: LlmReplayBackend, real):
+        self.backend = backend
+        self.real = real
+
+    def generate_content(self, model, contents, config):
+        key, timeout, schema = _gemini_request(contents, config)
+        if self.backend.records:
+            started = time.monotonic()
+            response = self.real.generate_content(model=model, contents=contents, config=config)
+            self.backend.save(key, model, _gemini_dump(response.text, getattr(response, "usage_metadata", None)),
+                              started)
+            return response
+        data, latency_ms = self.backend.lookup(key, model)
+        self.backend.faults.apply(latency_ms, timeout)
+        return _gemini_load(data, schema)
+
+    def generate_content_stream(self, model, contents, config) -> Iterator:
+        key, timeout, schema = _gemini_request(contents, config)
+        if self.backend.records:
+            started = time.monotonic()
+            texts, usage = [], None
+            for chunk in self.real.generate_content_stream(model=model, contents=contents, config=config):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                texts.append(chunk.text or "")
+                yield chunk
+            self.backend.save(key, model, _gemini_dump("".join(texts), usage), started)
+            return
+        data, latency_ms = self.backend.lookup(key, model)
+        # 첫 조각 전에 지연/오류 적용, 이후 조각은 바로
+        self.backend.faults.apply(latency_ms, timeout)
+        pieces = self.backend.chunks(data["text"])
+        for i, piece in enumerate(pieces):
+            chunk = _gemini_load(data, None, text=piece)
+            if i < len(pieces) - 1:
+                chunk.usage_metadata = None
+            yield chunk
+
+
+class _gemini_async_models:
+    def __init__(self, backend: LlmReplayBackend, real):
+        self.backend = backend
+        self.real = real
+
+    async def generate_content(self, model, contents, config):
+        key, timeout, schema = _gemini_request(contents, config)
+        if self.backend.records:
+            started = time.monotonic()
+            response = await self.real.generate_content(model=model, contents=contents, config=config)
+            self.backend.save(key, model, _gemini_dump(response.text, getattr(response, "usage_metadata", None)),
+                              started)
+            return response
+        data, latency_ms = self.backend.lookup(key, model)
+        await self.backend.faults.apply_async(latency_ms, timeout)
+        return _gemini_load(data, schema)
+
+
+class _gemini_client:
+    def __init__(self, backend: LlmReplayBackend, real=None):
+        self.real = real
+        self.models = _gemini_models(backend, getattr(real, "models", None))
+        self.aio = SimpleNamespace(models=_gemini_async_models(backend, getattr(getattr(real, "aio", None), "models", None)),
+                                   aclose=self._aclose)
+        self.caches = _context_cache_disabled()
+
+    def close(self):
+        close = getattr(self.real, "close", None)
+        if callable(close):
+            close()
+
+    async def _aclose(self):
+        aclose = getattr(getattr(self.real, "aio", None), "aclose", None)
+        if callable(aclose):
+            await aclose()
+
+
+# ----- OpenAI: responses.parse / responses.stream (sync), responses.parse (async) -----
+
+def _openai_request(input, text_format) -> str:
+    return request_hash("openai", input=input, schema=_schema_name(text_format))
+
+
+def _openai_dump(output_text: str, usage) -> Dict:
+    details = getattr(usage, "input_tokens_details", None)
+    return {
+        "output_text": output_text,
+        "usage": None if usage is None else {
+            "input_tokens": getattr(usage, "input_tokens", None),
+            "output_tokens": getattr(usage, "output_tokens", None),
+            "total_tokens": getattr(usage, "total_tokens", None),
+            "cached_tokens": getattr(details, "cached_tokens", None),
+        },
+    }
+
+
+def _openai_load(data: Dict, text_format):
+    usage = dict(data.get("usage") or {})
+    usage = SimpleNamespace(input_tokens=usage.get("input_tokens"), output_tokens=usage.get("output_tokens"),
+                            total_tokens=usage.get("total_tokens"),
+                            input_tokens_details=SimpleNamespace(cached_tokens=usage.get("cached_tokens")))
+    parsed = text_format.model_validate_json(data["output_text"]) if text_format is not None else None
+    return SimpleNamespace(output_text=data["output_text"], output_parsed=parsed, usage=usage, output=[])
+
+
+class _openai_replay_stream:
+    # responses.stream(...) 의 context manager / 이벤트 반복 / get_final_response 흉내
+    def __init__(self, backend: LlmReplayBackend, data: Dict, latency_ms: float, timeout: float, text_format):
+        self.backend = backend
+        self.data = data
+        self.latency_ms = latency_ms
+        self.timeout = timeout
+        self.text_format = text_format
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        self.backend.faults.apply(self.latency_ms, self.timeout)
+        for piece in self.backend.chunks(self.data["output_text"]):
+            yield SimpleNamespace(type="response.output_text.delta", delta=piece)
+
+    def get_final_response(self):
+        return _openai_load(self.data, self.text_format)
+
+
+class _openai_record_stream:
+    def __init__(self, backend: LlmReplayBackend, manager, key: str, model: str):
+        self.backend = backend
+        self.manager = manager
+        self.key = key
+        self.model = model
+        self.stream = None
+        self.started = time.monotonic()
+
+    def __enter__(self):
+        self.stream = self.manager.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self.manager.__exit__(*exc)
+
+    def __iter__(self):
+        yield from self.stream
+
+    def get_final_response(self):
+        final = self.stream.get_final_response()
+        self.backend.save(self.key, self.model, _openai_dump(final.output_text, final.usage), self.started)
+        return final
+
+
+class _openai_responses:
+    def __init__(self, backend: LlmReplayBackend, real):
+        self.backend = backend
+        self.real = real
+
+    def parse(self, model, input, text_format=None, timeout=None, **kwargs):
+        key = _openai_request(input, text_format)
+        if self.backend.records:
+            started = time.monotonic()
+            response = self.real.parse(model=model, input=input, text_format=text_format, timeout=timeout, **kwargs)
+            self.backend.save(key, model, _openai_dump(response.output_text, response.usage), started)
+            return response
+        data, latency_ms = self.backend.lookup(key, model)
+        self.backend.faults.apply(latency_ms, timeout)
+        return _openai_load(data, text_format)
+
+    def stream(self, model, input, text_format=None, timeout=None, **kwargs):
+        key = _openai_request(input, text_format)
+        if self.backend.records:
+            manager = self.real.stream(model=model, input=input, text_format=text_format, timeout=timeout, **kwargs)
+            return _openai_record_stream(self.backend, manager, key, model)
+        data, latency_ms = self.backend.lookup(key, model)
+        return _openai_replay_stream(self.backend, data, latency_ms, timeout, text_format)
+
+
+class _openai_async_responses:
+    def __init__(self, backend: LlmReplayBackend, real_factory: Callable = None):
+        self.backend = backend
+        self.real_factory = real_factory
+        self.real = None
+
+    async def parse(self, model, input, text_format=None, timeout=None, **kwargs):
+        key = _openai_request(input, text_format)
+        if self.backend.records:
+            if self.real is None:
+                # AsyncOpenAI 는 이벤트 루프 안에서 생성
+                self.real = self.real_factory()
+            started = time.monotonic()
+            response = await self.real.responses.parse(model=model, input=input, text_format=text_format,
+                                                       timeout=timeout, **kwargs)
+            self.backend.save(key, model, _openai_dump(response.output_text, response.usage), started)
+            return response
+        data, latency_ms = self.backend.lookup(key, model)
+        await self.backend.faults.apply_async(latency_ms, timeout)
+        return _openai_load(data, text_format)
+
+
+class _openai_client:
+    def __init__(self, backend: LlmReplayBackend, real=None):
+        self.real = real
+        self.responses = _openai_responses(backend, getattr(real, "responses", None))
+
+    def close(self):
+        if self.real is not None:
+            self.real.close()
+
+
+class _openai_async_client:
+    def __init__(self, backend: LlmReplayBackend, real_factory: Callable = None):
+        self.responses = _openai_async_responses(backend, real_factory)
+
+    async def close(self):
+        real = self.responses.real
+        if real is not None:
+            await real.close()
@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# 모델별 분당 요청 수 / 분당 토큰 수 기본값, LLM_RATE_LIMITS 로 덮어씀
+DEFAULT_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gemini-2.5-flash": (1000, 1_000_000),
+    "gemini-2.5-pro": (150, 2_000_000),
+    "gpt-5": (500, 500_000),
+    "gpt-5-mini": (500, 500_000),
+}
+DEFAULT_LIMIT = (60, 200_000)
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    # API 키 원문은 파일에 남기지 않고 짧은 해시만 bucket 이름에 사용
+    if not api_key:
+        return "default"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def estimate_tokens(*texts: str) -> int:
+    # 호출 전 TPM 차감용 대략치 (문자 3개당 1토큰, 한글이 섞인 JSON 기준 보수적으로)
+    return sum(len(text) for text in texts if text) // 3 + 1
+
+
+class RateLimitTimeoutError(RuntimeError):
+    pass
+
+
+class SqliteRateLimiter:
+    """
+    api / crawler 프로세스가 같은 SQLite 파일로 공유하는 token bucket
+    - bucket = (API 키 fingerprint, 모델) 마다 분당 요청 수(RPM) / 분당 토큰 수(TPM) 두 개
+    - 호출 전 acquire(): BEGIN IMMEDIATE 로 파일 잠금을 잡고 리필 → 차감, 부족하면 필요한 만큼 기다렸다 재시도
+    - 우선순위: batch(크롤러 전처리)는 bucket 에 reserve_ratio 만큼 남아 있어야만 사용 가능
+      → 크롤링이 몰려도 interactive(사용자 추천) 몫은 항상 남음
+    - provider 가 429 를 주면 drain() 으로 bucket 을 비워 다른 프로세스도 같이 물러남
+    """
+
+    def __init__(self, path: str, limits: Dict[str, Tuple[int, int]] = None, reserve_ratio: float = 0.3,
+                 max_wait_sec: float = 60.0, clock=time.time, sleep=time.sleep):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.reserve_ratio = reserve_ratio
+        self.max_wait_sec = max_wait_sec
+        self.clock = clock
+        self.sleep = sleep
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_rate_bucket ("
+                "  bucket_key TEXT PRIMARY KEY,"
+                "  tokens REAL NOT NULL,"
+                "  updated_at REAL NOT NULL"
+                ")"
+            )
+
+    @classmethod
+    def from_env(cls) -> Optional["SqliteRateLimiter"]:
+        path = os.getenv("LLM_RATE_LIMIT_DB")
+        if not path:
+            return None
+        return cls(
+            path=path,
+            limits={**DEFAULT_LIMITS, **cls._limits_from_env(os.getenv("LLM_RATE_LIMITS", ""))},
+            reserve_ratio=float(os.getenv("LLM_RATE_LIMIT_BATCH_RESERVE", "0.3")),
+            max_wait_sec=float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_SEC", "60")),
+        )
+
+    @staticmethod
+    def _limits_from_env(value: str) -> Dict[str, Tuple[int, int]]:
+        # LLM_RATE_LIMITS="gemini-2.5-flash=1000/1000000,gemini-2.5-pro=150/2000000" (RPM/TPM)
+        limits = {}
+        for item in value.split(","):
+            if "=" in item and "/" in item:
+                model, budget = item.split("=", 1)
+                rpm, tpm = budget.split("/", 1)
+                limits[model.strip()] = (int(rpm), int(tpm))
+        return limits
+
+    @contextmanager
+    def _connect(self):
+        # isolation_level=None: 트랜잭션을 BEGIN IMMEDIATE 로 직접 관리
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _capacities(self, model: str) -> Tuple[int, int]:
+        return self.limits.get(model, DEFAULT_LIMIT)
+
+    def _take(self, conn, bucket_key: str, capacity: float, amount: float, floor: float,
+              now: float) -> Tuple[bool, float]:
+        # 리필 후 amount 를 빼도 floor 이상이면 (True, 남는 양), 아니면 (False, 모일 때까지 필요한 초)
+        row = conn.execute("SELECT tokens, updated_at FROM llm_rate_bucket WHERE bucket_key = ?",
+                           (bucket_key,)).fetchone()
+        tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * capacity / 60.0)
+        if tokens - amount >= floor:
+            return True, tokens - amount
+        return False, (amount + floor - tokens) / (capacity / 60.0)
+
+    def acquire(self, key: str, model: str, cost_tokens: int = 0, priority: str = INTERACTIVE,
+                deadline: float = None) -> float:
+        """
+        요청 1개 + cost_tokens 를 차감할 때까지 대기, 기다린 초를 반환
+        deadline(time.monotonic 기준) 또는 max_wait_sec 안에 못 얻으면 RateLimitTimeoutError
+        """
+        rpm, tpm = self._capacities(model)
+        reserve = self.reserve_ratio if priority == BATCH else 0.0
+        # 한 번에 bucket 보다 큰 요청은 가득 찬 bucket 하나로 취급 (영원히 못 얻는 것 방지)
+        cost_tokens = min(cost_tokens, tpm * (1 - reserve))
+        request_key, token_key = f"{key}:{model}:rpm", f"{key}:{model}:tpm"
+
+        started = time.monotonic()
+        give_up_at = started + self.max_wait_sec
+        if deadline is not None:
+            give_up_at = min(give_up_at, deadline)
+
+        while True:
+            now = self.clock()
+            with self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    requests_ok, requests_left = self._take(conn, request_key, rpm, 1, rpm * reserve, now)
+                    tokens_ok, tokens_left = self._take(conn, token_key, tpm, cost_tokens, tpm * reserve, now)
+                    if requests_ok and tokens_ok:
+                        conn.executemany(
+                            "INSERT INTO llm_rate_bucket (bucket_key, tokens, updated_at) VALUES (?, ?, ?) "
+                            "ON CONFLICT(bucket_key) DO UPDATE SET tokens = excluded.tokens, "
+                            "updated_at = excluded.updated_at",
+                            [(request_key, requests_left, now), (token_key, tokens_left, now)],
+                        )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+
+            if requests_ok and tokens_ok:
+                waited = time.monotonic() - started
+                if waited > 0.05:
+                    self.logger.info(f"Rate limiter [{priority}] {model}: waited {waited:.2f}s")
+                return waited
+
+            wait = max(0.0 if requests_ok else requests_left, 0.0 if tokens_ok else tokens_left, 0.01)
+            if time.monotonic() + wait > give_up_at:
+                raise RateLimitTimeoutError(f"{model} rate limit budget exhausted for {priority} "
+                                            f"(needs {wait:.1f}s more)")
+            self.sleep(min(wait, 1.0))
+
+    def drain(self, key: str, model: str):
+        # provider 429: 두 bucket 을 비워 모든 프로세스가 리필될 때까지 물러나게 함
+        now = self.clock()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO llm_rate_bucket (bucket_key, tokens, updated_at) VALUES (?, 0, ?) "
+                "ON CONFLICT(bucket_key) DO UPDATE SET tokens = 0, updated_at = excluded.updated_at",
+                [(f"{key}:{model}:rpm", now), (f"{key}:{model}:tpm", now)],
+            )
+            conn.execute("COMMIT")
+        self.logger.warning(f"Rate limiter drained for {model} after provider 429")
@@ -0,0 +1,176 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List
+
+from src.shared.util.metricsUtil import REGISTRY
+
+# LogRecord 기본 속성 (나머지는 extra= 로 넘긴 구조화 필드)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s:%(lineno)d] %(message)s"
+
+_listener: QueueListener = None
+_handler: "bounded_queue_handler" = None
+_lock = threading.Lock()
+
+
+class json_formatter(logging.Formatter):
+    """한 줄 JSON 로그: ts, level, logger, line, thread, msg + extra 필드 (+ exc)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class bounded_queue_handler(QueueHandler):
+    """
+    요청 스레드에서는 레코드를 큐에 넣기만 하는 핸들러
+    - 메시지 포맷(%-style args 적용)과 파일 쓰기/회전은 QueueListener 스레드에서 수행
+    - 큐가 가득 차면 기다리지 않고 버리고 dropped 로 집계 (로그 때문에 요청이 막히지 않음)
+    - 같은 프로세스 안의 큐라 레코드를 pickle 가능하게 만들 필요가 없으므로 prepare 에서 포맷하지 않음
+      (가변 객체를 args 로 넘긴 뒤 바로 수정하면 수정된 값이 찍힐 수 있음)
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+        self.enqueue_seconds = 0.0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        start = time.perf_counter()
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+        self.enqueue_seconds += time.perf_counter() - start
+
+
+class draining_queue_listener(QueueListener):
+    # 기본 stop() 은 종료 신호를 put_nowait 로 넣어 큐가 가득 차 있으면 queue.Full, 여기서는 비워질 때까지 기다림
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def setup_logging(log_file: str, level: str = None, json_logs: bool = None,
+                  max_bytes: int = None, backup_count: int = None) -> logging.Logger:
+    """
+    루트 로거를 QueueHandler 하나로 설정하고 콘솔/회전 파일 핸들러는 백그라운드 QueueListener 에 연결
+    - LOG_LEVEL (기본 INFO), LOG_FORMAT=json|text (기본 text), LOG_MAX_BYTES (기본 50MB), LOG_BACKUP_COUNT (기본 10),
+      LOG_QUEUE_SIZE (기본 10000)
+    - 여러 번 호출하면 이전 리스너를 멈추고 다시 설정
+    """
+    global _listener, _handler
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    if json_logs is None:
+        json_logs = os.getenv("LOG_FORMAT", "text").lower() == "json"
+    max_bytes = max_bytes or int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+    backup_count = backup_count if backup_count is not None else int(os.getenv("LOG_BACKUP_COUNT", "10"))
+
+    formatter = json_formatter() if json_logs else logging.Formatter(TEXT_FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
+
+    directory = os.path.dirname(log_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handlers: List[logging.Handler] = [
+        logging.StreamHandler(sys.stdout),
+        RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+
+        root_logger = logging.getLogger()
+        root_logger.setLevel(level)
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+
+        _handler = bounded_queue_handler(queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+        root_logger.addHandler(_handler)
+        _listener = draining_queue_listener(_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    REGISTRY.register_collector("logging", collect_metrics)
+
+    return root_logger
+
+
+def shutdown_logging():
+    # 큐에 남은 레코드를 모두 쓰고 리스너 스레드 종료
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def log_stats() -> Dict[str, float]:
+    # 로깅 비용 측정용: 큐에 넣은/버린 레코드 수, 요청 스레드에서 쓴 누적 시간, 현재 큐 길이
+    handler = _handler
+    if handler is None:
+        return {"enqueued": 0, "dropped": 0, "enqueue_seconds": 0.0, "queue_size": 0}
+    return {
+        "enqueued": handler.enqueued,
+        "dropped": handler.dropped,
+        "enqueue_seconds": round(handler.enqueue_seconds, 6),
+        "queue_size": handler.queue.qsize(),
+    }
+
+
+def collect_metrics():
+    stats = log_stats()
+    yield ("log_records_enqueued_total", "counter", "Log records handed to the background writer",
+           [({}, stats["enqueued"])])
+    yield ("log_records_dropped_total", "counter", "Log records dropped because the log queue was full",
+           [({}, stats["dropped"])])
+    yield ("log_enqueue_seconds_total", "counter", "Time request threads spent enqueueing log records",
+           [({}, stats["enqueue_seconds"])])
+    yield ("log_queue_size", "gauge", "Log records waiting for the background writer", [({}, stats["queue_size"])])
+
+
+def log_payload(logger: logging.Logger, label: str, payload, rate: float = None, max_chars: int = None):
+    """
+    큰 payload(LLM 원본 응답, 상품 원문 등)는 LOG_PAYLOAD_SAMPLE_RATE (기본 0.01) 비율로만 INFO 에 남기고
+    LOG_PAYLOAD_MAX_CHARS (기본 2000) 에서 자름, DEBUG 레벨이면 항상 남김
+    """
+    debug = logger.isEnabledFor(logging.DEBUG)
+    rate = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01")) if rate is None else rate
+    if not debug and (not logger.isEnabledFor(logging.INFO) or random.random() >= rate):
+        return
+    max_chars = max_chars or int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+    text = payload if isinstance(payload, str) else str(payload)
+    length = len(text)
+    if length > max_chars:
+        text = f"{text[:max_chars]}... ({length} chars)"
+    logger.log(logging.DEBUG if debug else logging.INFO, "%s: %s", label, text,
+               extra={"payload_chars": length, "sampled": not debug}, stacklevel=2)
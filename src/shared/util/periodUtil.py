@@ -0,0 +1,33 @@
+import re
+from typing import Optional, Tuple
+
+# 요청 기간(request_combo_dto.period)별 최대 운용 개월 (SHORT ≤6, MID ≤12, LONG 은 상한 없이 상품 한도까지 = None)
+PERIOD_HORIZON_MONTHS = {"SHORT": 6, "MID": 12, "LONG": None}
+
+_PERIOD_PATTERN = re.compile(r"^\s*\[\s*(-?\d*|-)\s*,\s*(-?\d*|-)\s*\]\s*$")
+
+
+def parse_period_range(period: str) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """
+    product_period.period 문자열을 (최소 개월, 최대 개월) 로 변환
+    - "[3, 6]" → (3, 6), "[-, 12]" / "[-1, 12]" → (None, 12), "[6, -]" → (6, None)
+    - None 은 제한 없음, 형식이 다르면 None 반환
+    """
+    if not period:
+        return None
+    match = _PERIOD_PATTERN.match(str(period))
+    if match is None:
+        return None
+
+    bounds = []
+    for value in match.groups():
+        if value in ("", "-") or int(value) < 0:
+            bounds.append(None)
+        else:
+            bounds.append(int(value))
+    return bounds[0], bounds[1]
+
+
+def horizon_months(period) -> Optional[int]:
+    # Period enum 또는 문자열, None 이면 기간 필터/검사 없음
+    return PERIOD_HORIZON_MONTHS[period.value if hasattr(period, "value") else str(period)]
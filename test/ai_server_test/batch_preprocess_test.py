@@ -0,0 +1,148 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+from google.genai import types
+
+from src.crawler.ai.BatchPreprocessor import BatchPreprocessor
+from src.crawler.ai.LlmUtil import LlmUtil
+from src.crawler.ai.PreprocessCache import PreprocessCache
+from src.crawler.ai.jsonSchema import Preferential
+from src.shared.llm.LlmGateway import LlmGateway
+
+# 은행 단위 batch 작업: 제출 → polling → 제출 순서로 결과 매핑 → 실패 항목만 개별 재시도 / 로컬 대체 경로 확인
+
+
+def preferential(name: str) -> Preferential:
+    return Preferential(
+        product_name=name, product_basic_rate=2.0, product_max_rate=3.0, product_type="deposit",
+        product_info=[], product_maximum_amount=-1, product_minimum_amount=-1,
+        product_maximum_amount_per_day=-1, product_minimum_amount_per_day=-1,
+        product_maximum_amount_per_month=-1, product_minimum_amount_per_month=-1,
+        product_sub_target="", product_sub_amount="", product_sub_way="", product_sub_term="",
+        product_tax_benefit="", product_preferential_info="",
+        preferential_conditions_detail_header=[], preferential_conditions_detail_detail=[],
+        preferential_conditions_detail_interest_rate=[], preferential_conditions_detail_keyword=[],
+        product_period_period=[], product_period_base_rate=[],
+    )
+
+
+class fake_models:
+    # 개별 호출 경로 (상품 원문이 곧 상품명)
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, model, contents, config):
+        self.calls.append(contents)
+        parsed = preferential(contents)
+        return SimpleNamespace(text=parsed.model_dump_json(), parsed=parsed, usage_metadata=None)
+
+
+class fake_batches:
+    """running 을 polls 번 보여준 뒤 완료, broken 에 든 상품은 오류, 응답은 SDK 타입으로 제출 순서대로 반환"""
+
+    def __init__(self, polls: int = 2, broken=(), final_state: str = "JOB_STATE_SUCCEEDED", dropped: int = 0):
+        self.polls = polls
+        self.broken = set(broken)
+        self.final_state = final_state
+        self.dropped = dropped
+        self.submitted = []
+        self.gets = 0
+
+    def create(self, model, src, config):
+        self.submitted = src
+        return SimpleNamespace(name="batches/1", state="JOB_STATE_PENDING", dest=None)
+
+    def get(self, name):
+        self.gets += 1
+        if self.gets < self.polls:
+            return SimpleNamespace(name=name, state="JOB_STATE_RUNNING", dest=None)
+        responses = []
+        for request in self.submitted[:len(self.submitted) - self.dropped]:
+            if request.contents in self.broken:
+                responses.append(types.InlinedResponse(error=types.JobError(message="internal")))
+            else:
+                # batch 응답은 parsed 없이 text 만
+                text = preferential(request.contents).model_dump_json()
+                part = types.Part(text=text)
+                responses.append(types.InlinedResponse(response=types.GenerateContentResponse(
+                    candidates=[types.Candidate(content=types.Content(parts=[part], role="model"))])))
+        return SimpleNamespace(name=name, state=self.final_state,
+                               dest=SimpleNamespace(inlined_responses=responses))
+
+    def cancel(self, name):
+        pass
+
+
+def setup(path: str, batches=None):
+    models = fake_models()
+    client = SimpleNamespace(models=models, batches=batches) if batches else SimpleNamespace(models=models)
+    util = LlmUtil(client=client, gateway=LlmGateway(fallbacks={}), cache=PreprocessCache(path))
+    preprocessor = BatchPreprocessor(util, poll_interval_sec=1, timeout_sec=100, min_batch_size=2,
+                                     sleep=lambda seconds: None)
+    return util, models, preprocessor
+
+
+def batch_maps_and_retries_test(path: str):
+    batches = fake_batches(broken={"상품2"})
+    util, models, preprocessor = setup(path, batches)
+    products = [f"상품{i}" for i in range(5)]
+    util.create_preferential_json(products[0], bank_name="KB")  # 미리 캐시된 상품
+    models.calls.clear()
+
+    results = preprocessor.preprocess(products, bank_name="KB")
+    assert [r.product_name for r in results] == products
+    # 캐시된 0 번은 제출하지 않고, 실패한 2 번만 개별 호출
+    assert [r.contents for r in batches.submitted] == products[1:]
+    assert models.calls == ["상품2"], models.calls
+    assert batches.gets == 2
+
+    # 다음 실행에서는 전부 캐시
+    batches.submitted = []
+    assert [r.product_name for r in preprocessor.preprocess(products, bank_name="KB")] == products
+    assert batches.submitted == []
+
+
+def failed_job_falls_back_test(path: str):
+    batches = fake_batches(final_state="JOB_STATE_FAILED", polls=1)
+    util, models, preprocessor = setup(path, batches)
+    products = ["가", "나", "다"]
+    assert [r.product_name for r in preprocessor.preprocess(products, bank_name="NH")] == products
+    assert sorted(models.calls) == sorted(products)
+
+
+def missing_responses_fall_back_test(path: str):
+    # 응답 개수가 제출 개수와 다르면 위치 매핑을 믿지 않고 전체 개별 처리
+    batches = fake_batches(polls=1, dropped=1)
+    util, models, preprocessor = setup(path, batches)
+    products = ["라", "마", "바"]
+    assert [r.product_name for r in preprocessor.preprocess(products, bank_name="SH")] == products
+    assert sorted(models.calls) == sorted(products)
+
+
+def inlined_request_fields_test(path: str):
+    # requirements.txt 의 google-genai==1.28.0 InlinedRequest 는 model/contents/config 만 허용 (extra='forbid')
+    util, models, preprocessor = setup(path)
+    request = preprocessor._request({"상품명": "예금", "금리": 3.1})
+    assert isinstance(request, types.InlinedRequest)
+    assert request.model_fields_set <= {"model", "contents", "config"}, request.model_fields_set
+    assert isinstance(request.contents, str) and "예금" in request.contents
+    assert request.config.response_mime_type == "application/json"
+
+
+def local_stand_in_test(path: str):
+    # batches 가 없는 client (replay 등) 는 개별 호출을 병렬로
+    util, models, preprocessor = setup(path)
+    products = [f"로컬{i}" for i in range(6)]
+    assert [r.product_name for r in preprocessor.preprocess(products, bank_name="IBK")] == products
+    assert sorted(models.calls) == sorted(products)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        for i, test in enumerate([batch_maps_and_retries_test, failed_job_falls_back_test,
+                                    missing_responses_fall_back_test, inlined_request_fields_test,
+                                    local_stand_in_test]):
+            test(os.path.join(directory, f"preprocess_{i}.db"))
+            print(f"{test.__name__} passed")
+    print("batch preprocess tests passed")
@@ -0,0 +1,115 @@
+import re
+import sqlite3
+import uuid
+
+from src.app.dto.request.request_front_dto import Period, request_combo_dto
+from src.app.service.catalog_snapshot import catalog_snapshot, catalog_store
+from src.shared.db.product.productRepository import BUILD_AI_PAYLOAD_SQL, LOAD_CATALOG_SQL, ProductRepository
+from src.shared.util.periodUtil import parse_period_range
+
+# 인메모리 스냅샷의 select() 가 BUILD_AI_PAYLOAD_SQL 과 같은 상품/기간 행을 고르는지 확인
+# (MySQL 대신 같은 SQL 을 SQLite fixture 카탈로그에서 실행, BIN_TO_UUID 만 함수로 등록)
+
+# (이름, 유형, max_rate, minimum_amount, 기간 행, 삭제 여부)
+FIXTURE = [
+    ("예금A", "deposit", 4.1, 1_000_000, ["[-,3]", "[6,12]"], False),
+    ("예금B", "deposit", 3.9, 50_000_000, ["[1,36]"], False),
+    ("예금C", "deposit", 3.7, -1, ["[12,24]"], False),
+    ("예금D", "deposit", 3.5, 100_000, ["[24,36]"], False),
+    ("예금E", "deposit", 3.3, -1, ["6개월 이상"], False),
+    ("예금F", "deposit", 3.1, -1, ["[48,60]"], False),
+    ("적금A", "savings", 5.2, -1, ["[6,12]", "[12,24]"], False),
+    ("적금B", "savings", 4.8, 10_000, ["[-,6]"], False),
+    ("적금C", "savings", 4.4, 20_000_000, ["[1,12]"], False),
+    ("적금D", "savings", 4.0, -1, ["[24,36]"], False),
+    ("삭제예금", "deposit", 9.9, -1, ["[1,12]"], True),
+]
+
+
+def _sqlite(sql: str) -> str:
+    return re.sub(r"%\((\w+)\)s", r":\1", sql)
+
+
+def fixture_db() -> sqlite3.Connection:
+    connection = sqlite3.connect(":memory:")
+    connection.row_factory = sqlite3.Row
+    connection.create_function("BIN_TO_UUID", 1, lambda value: str(uuid.UUID(bytes=bytes(value))))
+    connection.executescript(
+        "CREATE TABLE bank (bank_uuid BLOB PRIMARY KEY, bank_name TEXT);"
+        "CREATE TABLE bank_product (product_uuid BLOB PRIMARY KEY, bank_uuid BLOB, name TEXT, basic_rate REAL,"
+        "  max_rate REAL, type TEXT, maximum_amount INTEGER, maximum_amount_per_month INTEGER,"
+        "  maximum_amount_per_day INTEGER, minimum_amount INTEGER, minimum_amount_per_month INTEGER,"
+        "  minimum_amount_per_day INTEGER, tax_benefit TEXT, preferential_info TEXT, sub_amount TEXT,"
+        "  sub_target TEXT, sub_term TEXT, sub_way TEXT, deleted_at TEXT);"
+        "CREATE TABLE product_period (period_uuid BLOB, product_uuid BLOB, period TEXT, bank_rate REAL,"
+        "  min_months INTEGER, max_months INTEGER);"
+    )
+    bank_uuid = uuid.uuid5(uuid.NAMESPACE_URL, "bank").bytes
+    connection.execute("INSERT INTO bank VALUES (?, ?)", (bank_uuid, "테스트은행"))
+    for name, type, max_rate, minimum_amount, periods, deleted in FIXTURE:
+        product_uuid = uuid.uuid5(uuid.NAMESPACE_URL, name).bytes
+        connection.execute(
+            "INSERT INTO bank_product VALUES (?, ?, ?, 1.0, ?, ?, -1, NULL, NULL, ?, NULL, NULL, '', '', '', '', '', '', ?)",
+            (product_uuid, bank_uuid, name, max_rate, type, minimum_amount, "2025-01-01" if deleted else None))
+        for period in periods:
+            min_months, max_months = parse_period_range(period) or (None, None)
+            connection.execute("INSERT INTO product_period VALUES (?, ?, ?, 1.0, ?, ?)",
+                               (uuid.uuid4().bytes, product_uuid, period, min_months, max_months))
+    return connection
+
+
+def select_matches_sql_test():
+    connection = fixture_db()
+    repository = ProductRepository()
+    catalog = repository._rows_to_payload(connection.execute(_sqlite(LOAD_CATALOG_SQL)).fetchall())
+    snapshot = catalog_snapshot(version=1, catalog=catalog)
+
+    checked = 0
+    for period in Period:
+        for amount in (5_000, 1_000_000, 30_000_000, 100_000_000):
+            for top_n in (1, 3, 5, 20):
+                request = request_combo_dto(amount=amount, period=period)
+                rows = connection.execute(_sqlite(BUILD_AI_PAYLOAD_SQL),
+                                          repository._payload_params(request, top_n)).fetchall()
+                expected = repository._rows_to_payload(rows)
+                actual = snapshot.select(request, top_n)
+                assert actual == expected, (period, amount, top_n,
+                                            [p.name for p in actual.products], [p.name for p in expected.products])
+                checked += 1
+    assert "삭제예금" not in [p.name for p in catalog.products]
+    # 최소 기간 48개월 상품은 상한 없는 LONG 에서만 후보
+    for period in Period:
+        names = [p.name for p in snapshot.select(request_combo_dto(amount=1_000_000, period=period), 20).products]
+        assert ("예금F" in names) == (period == Period.LONG), (period, names)
+    print(f"compared {checked} requests")
+
+
+class versioned_loader:
+    def __init__(self):
+        self.version = 1
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        connection = fixture_db()
+        return ProductRepository()._rows_to_payload(connection.execute(_sqlite(LOAD_CATALOG_SQL)).fetchall())
+
+
+def store_reload_test():
+    source = versioned_loader()
+    store = catalog_store(loader=source.load, version_loader=lambda: source.version, version_check_sec=0)
+    first = store.current()
+    assert store.current() is first and source.loads == 1
+
+    # 크롤링 후 버전이 오르면 다음 조회에서 새 스냅샷으로 교체
+    source.version = 2
+    second = store.current()
+    assert second is not first and second.version == 2 and source.loads == 2
+
+
+if __name__ == "__main__":
+    select_matches_sql_test()
+    print("select_matches_sql_test passed")
+    store_reload_test()
+    print("store_reload_test passed")
+    print("catalog snapshot tests passed")
@@ -0,0 +1,95 @@
+import uuid
+from types import SimpleNamespace
+
+from src.shared.db.catalog.CatalogVersionRepository import CatalogVersionRepository
+from src.shared.db.product.productRepository import ProductRepository
+
+# 크롤러의 은행 단위 트랜잭션 안에서 check_is_deleted 가 SAVEPOINT 를 항상 짝 맞춰 해제하는지,
+# 변경 기록에는 실제로 생기는 INSERTED / DELETED 만 남는지 확인
+
+BANK_UUID = uuid.uuid5(uuid.NAMESPACE_URL, "KB")
+ROWS = [(b"kept", "유지 예금"), (b"gone", "판매 종료 적금")]
+
+
+class recording_cursor:
+    def __init__(self, connection, fail_on: str = None):
+        self.connection = connection
+        self.fail_on = fail_on
+
+    def execute(self, sql, args=None):
+        self.connection.statements.append(sql.split(" (")[0])
+        if self.fail_on and sql.startswith(self.fail_on):
+            raise RuntimeError("db error")
+
+    def executemany(self, sql, rows):
+        self.connection.rows.extend(rows)
+
+    def fetchall(self):
+        return ROWS
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class recording_connection:
+    def __init__(self, fail_on: str = None):
+        self.statements = []
+        self.rows = []
+        self.fail_on = fail_on
+
+    def cursor(self):
+        return recording_cursor(self, self.fail_on)
+
+    def savepoints_balanced(self) -> bool:
+        opened = sum(s.startswith("SAVEPOINT") for s in self.statements)
+        released = sum(s.startswith("RELEASE SAVEPOINT") for s in self.statements)
+        return opened == released
+
+
+def repository(bank_uuid) -> ProductRepository:
+    repo = ProductRepository()
+    repo.BankRepository = SimpleNamespace(get_uuid_by_bank_name=lambda bank_name: bank_uuid)
+    return repo
+
+
+def deletes_missing_products_test():
+    connection = recording_connection()
+    deleted = repository(BANK_UUID).check_is_deleted("KB", {"유지 예금"}, connection)
+    assert deleted == [b"gone"]
+    assert connection.savepoints_balanced(), connection.statements
+
+
+def unknown_bank_leaves_no_savepoint_test():
+    connection = recording_connection()
+    assert repository(None).check_is_deleted("UNKNOWN", {"유지 예금"}, connection) == []
+    assert connection.statements == []
+
+
+def failed_update_releases_savepoint_test():
+    connection = recording_connection(fail_on="UPDATE bank_product")
+    assert repository(BANK_UUID).check_is_deleted("KB", {"유지 예금"}, connection) == []
+    assert "ROLLBACK TO SAVEPOINT check_is_deleted" in connection.statements
+    assert connection.savepoints_balanced(), connection.statements
+
+
+def change_types_test():
+    connection = recording_connection()
+    count = CatalogVersionRepository().record_changes(connection, version=3, bank_name="KB",
+                                                      inserted=[b"new"], deleted=[b"gone"])
+    assert count == 2
+    assert connection.rows == [(3, "KB", b"new", "INSERTED"), (3, "KB", b"gone", "DELETED")]
+    assert CatalogVersionRepository.CHANGE_TYPES == ("INSERTED", "DELETED")
+
+
+if __name__ == "__main__":
+    for test in [deletes_missing_products_test, unknown_bank_leaves_no_savepoint_test,
+                 failed_update_releases_savepoint_test, change_types_test]:
+        test()
+        print(f"{test.__name__} passed")
+    print("check_is_deleted tests passed")
@@ -1,3 +1,4 @@
+from src.app.dto.request.request_front_dto import request_combo_dto
 from src.shared.db.product.productRepository import ProductRepository
 from src.shared.db.util.MysqlUtil import MysqlUtil
 
@@ -6,7 +7,8 @@ if __name__ == "__main__":
     util = MysqlUtil()
     connection = util.get_connection()
     repository = ProductRepository()
-    payload = repository.build_ai_payload(connection=connection)
+    request = request_combo_dto(amount=30_000_000, period="MID")
+    payload = repository.build_ai_payload(connection=connection, request=request)
     ####
     print(f"tax_rate: {payload.tax_rate}\n")
 
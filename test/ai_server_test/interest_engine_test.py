@@ -0,0 +1,140 @@
+import datetime
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto
+from src.app.dto.response.response_allocation_dto import (
+    allocation_combination_dto, allocation_dto, response_allocation_dto,
+)
+from src.app.service.interest_engine import (
+    SEPARATE_TAX_RATE, TAX_FREE_RATE, days_in_months, interest_engine, resolve_tax_rate,
+)
+
+# PROMPT_ENG 계산 규칙(ACT/365, 세율 매핑, 예금/적금 현금흐름)과 interest_engine 결과가 원 단위까지 같은지 확인
+# PROMPT_ENG 예시의 결과 숫자(21,537원 등)는 같은 줄의 식과 어긋나 있어서, 식 그대로 계산한 값으로 비교
+
+# month 0 = 1월(31일), month 1 = 2월(28일) 로 PROMPT_ENG 예시와 같은 달력
+START = datetime.date(2025, 1, 1)
+
+
+def product(uuid: str, type: str, max_rate: float, tax_benefit: str = "comprehensive taxation") -> product_dto:
+    return product_dto(
+        product_uuid=uuid, name=uuid, bank_name="테스트은행", base_rate=1.0, max_rate=max_rate, type=type,
+        maximum_amount=-1, minimum_amount=-1, maximum_amount_per_month=-1, minimum_amount_per_month=-1,
+        maximum_amount_per_day=-1, minimum_amount_per_day=-1, tax_benefit=tax_benefit, preferential_info="",
+        sub_amount="", sub_term="", product_period=[],
+    )
+
+
+PRODUCTS = {
+    "deposit": product("deposit", "deposit", 3.0),
+    "savings": product("savings", "savings", 4.0),
+    "free": product("free", "deposit", 3.0, tax_benefit="비과세"),
+}
+
+
+def allocation(uuid: str, amount: int, start: int = 1, end: int = 12) -> allocation_dto:
+    return allocation_dto(uuid=uuid, type=PRODUCTS[uuid].type, start_month=start, end_month=end,
+                          allocated_amount=amount)
+
+
+def tax_mapping_test():
+    assert resolve_tax_rate("tax-free", 15.4) == TAX_FREE_RATE == 0.0
+    assert resolve_tax_rate("비과세종합저축 가능", 15.4) == TAX_FREE_RATE
+    assert resolve_tax_rate("separate taxation", 49.5) == SEPARATE_TAX_RATE == 15.4
+    assert resolve_tax_rate("분리과세", 49.5) == SEPARATE_TAX_RATE
+    # 그 외(종합과세, 빈 값)는 payload 의 tax_rate
+    assert resolve_tax_rate("comprehensive taxation", 49.5) == 49.5
+    assert resolve_tax_rate(None, 24.2) == 24.2
+
+
+def act_365_days_test():
+    assert days_in_months(3, START).tolist() == [31, 28, 31]
+    # 윤년 2월, 연도 넘김
+    assert days_in_months(3, datetime.date(2024, 1, 15)).tolist() == [31, 29, 31]
+    assert days_in_months(2, datetime.date(2025, 12, 1)).tolist() == [31, 31]
+
+
+def deposit_example_test():
+    # DEPOSIT EXAMPLE: 10,000,000원, 3.0%, 15.4% → round(10,000,000 * 0.03 * days/365 * 0.846)
+    combination = interest_engine(start_date=START).build_combination([allocation("deposit", 10_000_000)],
+                                                                      PRODUCTS, 15.4)
+    plan = combination.product[0].monthly_plan
+    assert [p.total_interest for p in plan[:3]] == [21_556, 19_470, 21_556]
+    assert [p.payment for p in plan] == [10_000_000] + [0] * 11
+    # 예금은 납입한 month 0 에만 active
+    assert [t.active_product_count for t in combination.timeline] == [1] + [0] * 11
+    assert combination.expected_interest_after_tax == sum(p.total_interest for p in plan) == 253_802
+    assert combination.expected_rate == 2.54  # 3.0% × (1 - 15.4%)
+
+
+def savings_example_test():
+    # SAVINGS EXAMPLE: 매월 1,000,000원, 4.0%, 15.4% → 잔액(k개월치 납입) 기준
+    combination = interest_engine(start_date=START).build_combination([allocation("savings", 12_000_000)],
+                                                                      PRODUCTS, 15.4)
+    plan = combination.product[0].monthly_plan
+    assert [p.total_interest for p in plan[:3]] == [2_874, 5_192, 8_622]
+    assert all(p.payment == 1_000_000 for p in plan)
+    assert [t.active_product_count for t in combination.timeline] == [1] * 12
+    assert combination.expected_interest_after_tax == 220_840
+
+
+def tax_free_test():
+    # 비과세는 세율 0: 10,000,000 * 0.03 * 31/365 = 25,479.45
+    combination = interest_engine(start_date=START).build_combination([allocation("free", 10_000_000)],
+                                                                      PRODUCTS, 15.4)
+    assert combination.product[0].monthly_plan[0].total_interest == 25_479
+
+
+def timeline_example_test():
+    # TIMELINE EXAMPLE: 예금 20M + 적금 1M/월, 적금 나누어떨어지지 않는 나머지(5원)는 앞쪽 5개월에 1원씩
+    combination = interest_engine(start_date=START).build_combination(
+        [allocation("deposit", 20_000_000), allocation("savings", 12_000_005)], PRODUCTS, 15.4)
+    timeline = combination.timeline
+    assert [t.total_monthly_payment for t in timeline[:6]] == [21_000_001] + [1_000_001] * 4 + [1_000_000]
+    assert [t.active_product_count for t in timeline] == [2] + [1] * 11
+    assert timeline[-1].cumulative_payment == 32_000_005
+    assert timeline[-1].cumulative_interest == combination.expected_interest_after_tax
+    assert all(b.cumulative_interest > a.cumulative_interest for a, b in zip(timeline, timeline[1:]))
+
+
+def savings_monthly_cap_test():
+    # 월 한도 100 × 3개월 = 300 안의 299 원 배분은 어느 달도 100 을 넘지 않음 (100, 100, 99)
+    combination = interest_engine(start_date=START).build_combination(
+        [allocation("savings", 299, end=3)], PRODUCTS, 15.4)
+    assert [p.payment for p in combination.product[0].monthly_plan] == [100, 100, 99]
+
+
+def late_start_test():
+    # 3개월차에 시작하는 예금은 month 2 부터 잔액, timeline 은 가장 늦게 끝나는 상품까지
+    combination = interest_engine(start_date=START).build_combination(
+        [allocation("deposit", 10_000_000, start=3, end=6)], PRODUCTS, 15.4)
+    assert len(combination.timeline) == 6
+    assert [p.month for p in combination.product[0].monthly_plan] == [2, 3, 4, 5]
+    assert combination.timeline[1].cumulative_payment == 0 and combination.timeline[2].cumulative_payment == 10_000_000
+
+
+def invalid_allocation_test():
+    engine = interest_engine(start_date=START)
+    for bad in ([allocation_dto(uuid="unknown", type="deposit", start_month=1, end_month=3, allocated_amount=1)],
+                [allocation("deposit", 1_000_000, start=4, end=3)],
+                []):
+        try:
+            engine.build_combination(bad, PRODUCTS, 15.4)
+            raise AssertionError(f"expected ValueError for {bad}")
+        except ValueError:
+            pass
+
+    # build_response 는 잘못된 조합만 제외
+    payload = ai_payload_dto(tax_rate=15.4, products=list(PRODUCTS.values()))
+    response = engine.build_response(response_allocation_dto(total_payment=10_000_000, combination=[
+        allocation_combination_dto(combination_id="ok", allocations=[allocation("deposit", 10_000_000)]),
+        allocation_combination_dto(combination_id="bad", allocations=[allocation("deposit", 10_000_000, start=0)]),
+    ]), payload)
+    assert [c.combination_id for c in response.combination] == ["ok"] and response.period_months == 12
+
+
+if __name__ == "__main__":
+    for test in [tax_mapping_test, act_365_days_test, deposit_example_test, savings_example_test, tax_free_test,
+                 timeline_example_test, savings_monthly_cap_test, late_start_test, invalid_allocation_test]:
+        test()
+        print(f"{test.__name__} passed")
+    print("interest engine tests passed")
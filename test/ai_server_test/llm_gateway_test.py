@@ -0,0 +1,220 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from src.app.ai.ai_gemini import ai_gemini
+from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.shared.llm.LlmGateway import (
+    LlmDeadlineExceededError, LlmGateway, LlmUnavailableError,
+)
+
+# 로컬 가짜 provider 로 429/503 을 주입해 재시도 / 회로 차단 / AIMD / 재시도 예산 / 마감 / 대체 체인 확인
+
+
+class fake_api_error(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"fake provider error {status_code}")
+        self.status_code = status_code
+
+
+class fake_provider:
+    """모델별로 정해 둔 순서대로 오류를 던지고, 다 쓰면 성공"""
+
+    def __init__(self, script: dict = None, latency: float = 0.0):
+        self.script = {model: list(errors) for model, errors in (script or {}).items()}
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, model: str, timeout: float = None):
+        with self._lock:
+            self.calls.append(model)
+            errors = self.script.get(model, [])
+            status = errors.pop(0) if errors else None
+        if self.latency:
+            time.sleep(self.latency)
+        if status is not None:
+            raise fake_api_error(status)
+        return f"ok:{model}"
+
+
+class fake_clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def gateway(**kwargs) -> LlmGateway:
+    options = dict(base_delay=0.001, max_delay=0.002, fallbacks={})
+    options.update(kwargs)
+    return LlmGateway(**options)
+
+
+def retry_then_success_test():
+    provider = fake_provider({"m": [503, 429]})
+    assert gateway().call(["m"], provider) == "ok:m"
+    assert provider.calls == ["m", "m", "m"], provider.calls
+
+
+def non_retryable_falls_back_test():
+    provider = fake_provider({"primary": [400]})
+    assert gateway().call(["primary", "backup"], provider) == "ok:backup"
+    assert provider.calls == ["primary", "backup"], provider.calls
+
+
+def circuit_breaker_test():
+    clock = fake_clock()
+    gw = gateway(max_attempts=1, failure_threshold=3, reset_timeout=30, clock=clock)
+    provider = fake_provider({"primary": [503] * 10})
+
+    for _ in range(3):
+        assert gw.call(["primary", "backup"], provider) == "ok:backup"
+    assert gw.breaker("primary").state == "open"
+
+    # open 동안은 primary 를 호출하지 않고 바로 대체
+    provider.calls.clear()
+    gw.call(["primary", "backup"], provider)
+    assert provider.calls == ["backup"], provider.calls
+
+    # reset_timeout 뒤 half_open 시험 호출 한 번, 성공하면 closed
+    clock.now += 31
+    provider.script["primary"] = []
+    assert gw.call(["primary", "backup"], provider) == "ok:primary"
+    assert gw.breaker("primary").state == "closed"
+
+
+def aimd_test():
+    clock = fake_clock()
+    gw = gateway(max_attempts=1, initial_limit=8, clock=clock)
+    limiter = gw.limiter("m")
+
+    try:
+        gw.call(["m"], fake_provider({"m": [429]}))
+    except LlmUnavailableError:
+        pass
+    assert limiter.limit == 4, limiter.limit
+
+    # cooldown 안의 연속 과부하는 한 번만 반영
+    try:
+        gw.call(["m"], fake_provider({"m": [429]}))
+    except LlmUnavailableError:
+        pass
+    assert limiter.limit == 4, limiter.limit
+
+    for _ in range(8):
+        gw.call(["m"], fake_provider())
+    assert 5 < limiter.limit < 6, limiter.limit
+    assert limiter.in_flight == 0
+
+
+def concurrency_limit_test():
+    gw = gateway(initial_limit=2, max_limit=2)
+    provider = fake_provider(latency=0.05)
+    peak = []
+
+    def run():
+        gw.call(["m"], provider)
+        peak.append(gw.limiter("m").in_flight)
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 동시에 2개까지만 → 6개 × 50ms 가 최소 3 구간
+    assert time.time() - start >= 0.14, time.time() - start
+    assert max(peak) <= 2
+
+
+def retry_budget_test():
+    gw = gateway(max_attempts=10, retry_ratio=0.0, min_retries=2)
+    provider = fake_provider({"m": [503] * 10})
+    try:
+        gw.call(["m"], provider)
+        raise AssertionError("expected failure")
+    except LlmUnavailableError:
+        pass
+    # 첫 시도 + 예산 안의 재시도 2번
+    assert len(provider.calls) == 3, provider.calls
+
+
+def deadline_test():
+    gw = gateway(base_delay=0.2, max_delay=0.2, max_attempts=5)
+    provider = fake_provider({"m": [503] * 10})
+    start = time.monotonic()
+    try:
+        gw.call(["m", "backup"], provider, deadline=time.monotonic() + 0.1)
+        raise AssertionError("expected deadline")
+    except LlmDeadlineExceededError:
+        pass
+    # 마감을 넘기는 백오프는 하지 않고, 마감 초과는 대체 모델로 넘기지 않음
+    assert time.monotonic() - start < 0.15
+    assert "backup" not in provider.calls
+
+
+def stream_test():
+    gw = gateway()
+    attempts = []
+
+    def chunks(model: str, timeout: float = None):
+        attempts.append(model)
+        if len(attempts) == 1:
+            raise fake_api_error(503)
+        yield "a"
+        yield "b"
+        if model == "broken":
+            raise fake_api_error(503)
+
+    assert list(gw.stream(["m"], chunks)) == ["a", "b"]
+    assert attempts == ["m", "m"]
+
+    received = []
+    try:
+        for chunk in gw.stream(["broken", "backup"], chunks):
+            received.append(chunk)
+        raise AssertionError("expected mid-stream failure")
+    except fake_api_error:
+        pass
+    assert received == ["a", "b"] and "backup" not in attempts
+
+
+def async_test():
+    gw = gateway()
+    script = {"m": [429]}
+
+    async def generate(model: str, timeout: float = None):
+        await asyncio.sleep(0)
+        if script[model]:
+            raise fake_api_error(script[model].pop(0))
+        return f"ok:{model}"
+
+    assert asyncio.run(gw.call_async(["m"], generate)) == "ok:m"
+
+
+def gemini_client_fallback_test():
+    parsed = response_ai_dto(total_payment=1, period_months=1, combination=[])
+    provider = fake_provider({"gemini-2.5-pro": [503, 503]})
+
+    class fake_models:
+        def generate_content(self, model, contents, config):
+            provider(model)
+            return SimpleNamespace(text="{}", parsed=parsed, usage_metadata=None)
+
+    gw = gateway(max_attempts=2, fallbacks={"gemini-2.5-pro": ["gemini-2.5-flash"]})
+    client = ai_gemini(client=SimpleNamespace(models=fake_models()), gateway=gw)
+    assert client.create_response(content={}, model="gemini-2.5-pro") is parsed
+    assert provider.calls == ["gemini-2.5-pro", "gemini-2.5-pro", "gemini-2.5-flash"], provider.calls
+
+
+if __name__ == "__main__":
+    tests = [retry_then_success_test, non_retryable_falls_back_test, circuit_breaker_test, aimd_test,
+             concurrency_limit_test, retry_budget_test, deadline_test, stream_test, async_test,
+             gemini_client_fallback_test]
+    for test in tests:
+        test()
+        print(f"{test.__name__} passed")
+    print("LLM gateway tests passed")
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from src.app.ai.ai_gemini import ai_gemini
+from src.app.ai.ai_gpt import ai_gpt
+from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.shared.llm.LlmGateway import LlmGateway, LlmUnavailableError
+from src.shared.llm.LlmReplay import FaultInjector, LlmReplayBackend, RECORD, REPLAY, ReplayStore
+
+# 녹화 → 재생: API 키 없이 같은 응답 / 녹화된 지연 / 오류 주입이 게이트웨이 재시도로 이어지는지 확인
+
+PARSED = response_ai_dto(total_payment=1000, period_months=12, combination=[])
+CONTENT = {"amount": 1000, "period": "SHORT"}
+
+
+class fake_gemini_models:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, model, contents, config):
+        self.calls += 1
+        time.sleep(0.05)
+        return SimpleNamespace(text=PARSED.model_dump_json(), parsed=PARSED,
+                               usage_metadata=SimpleNamespace(prompt_token_count=100, cached_content_token_count=0))
+
+
+class fake_openai_responses:
+    def parse(self, **kwargs):
+        usage = SimpleNamespace(input_tokens=100, output_tokens=10, total_tokens=110,
+                                input_tokens_details=SimpleNamespace(cached_tokens=0))
+        return SimpleNamespace(output_text=PARSED.model_dump_json(), output_parsed=PARSED, usage=usage, output=[])
+
+
+@contextmanager
+def env(**values):
+    previous = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def gateway() -> LlmGateway:
+    return LlmGateway(base_delay=0.001, max_delay=0.002, fallbacks={})
+
+
+def record(path: str):
+    backend = LlmReplayBackend(RECORD, ReplayStore(path))
+    models = fake_gemini_models()
+    gemini = ai_gemini(client=backend.gemini_client(SimpleNamespace(models=models)), gateway=gateway())
+    assert gemini.create_response(content=CONTENT, model="gemini-2.5-flash") == PARSED
+    gpt = ai_gpt(client=backend.openai_client(SimpleNamespace(responses=fake_openai_responses())), gateway=gateway())
+    assert gpt.create_response(content=CONTENT, model="gpt-5") == PARSED
+    assert models.calls == 1
+
+
+def replay_test(path: str):
+    # 녹화된 50ms 지연 그대로 재생, 키 없이 client 생성
+    with env(LLM_BACKEND="replay", LLM_REPLAY_DB=path, GENAI_API_KEY="", GPT_API_KEY=""):
+        gemini = ai_gemini(gateway=gateway())
+        start = time.monotonic()
+        assert gemini.create_response(content=CONTENT, model="gemini-2.5-flash") == PARSED
+        assert time.monotonic() - start >= 0.04
+
+        streamed = "".join(gemini.create_response_stream(content=CONTENT, model="gemini-2.5-flash"))
+        assert response_ai_dto.model_validate_json(streamed) == PARSED
+
+        gpt = ai_gpt(gateway=gateway())
+        assert gpt.create_response(content=CONTENT, model="gpt-5") == PARSED
+        streamed = "".join(gpt.create_response_stream(content=CONTENT, model="gpt-5"))
+        assert response_ai_dto.model_validate_json(streamed) == PARSED
+        assert asyncio.run(gpt.create_response_async(content=CONTENT, model="gpt-5")) == PARSED
+
+        # 녹화되지 않은 요청은 실패 (대체 모델까지 모두 miss)
+        try:
+            gpt.create_response(content={"amount": 1}, model="gpt-5")
+            raise AssertionError("expected replay miss")
+        except LlmUnavailableError:
+            pass
+
+
+def fault_injection_test(path: str):
+    # 고정 지연 0, 오류율 50% → 일부 시도가 503 으로 실패하지만 게이트웨이 재시도로 모두 성공
+    faults = FaultInjector(latency_ms=0, error_rate=0.5, error_statuses=(503,), seed=7)
+    backend = LlmReplayBackend(REPLAY, ReplayStore(path), faults)
+    attempts = []
+    models = backend.gemini_client().models
+    original = models.generate_content
+
+    def counted(**kwargs):
+        attempts.append(kwargs["model"])
+        return original(**kwargs)
+
+    models.generate_content = counted
+    gemini = ai_gemini(client=SimpleNamespace(models=models), gateway=LlmGateway(base_delay=0.001, max_delay=0.002,
+                                                                                  max_attempts=10, retry_ratio=1.0,
+                                                                                  fallbacks={}))
+    for _ in range(10):
+        assert gemini.create_response(content=CONTENT, model="gemini-2.5-flash") == PARSED
+    assert len(attempts) > 10, len(attempts)
+    print(f"10 requests took {len(attempts)} attempts with 50% injected errors")
+
+    # 녹화 지연이 timeout 보다 길면 TimeoutError
+    slow = FaultInjector(latency_ms=500)
+    try:
+        slow.apply(0, timeout=0.01)
+        raise AssertionError("expected timeout")
+    except TimeoutError:
+        pass
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "llm_replay.db")
+        record(path)
+        for test in [replay_test, fault_injection_test]:
+            test(path)
+            print(f"{test.__name__} passed")
+    print("LLM replay tests passed")
@@ -0,0 +1,75 @@
+import json
+import logging
+import os
+import tempfile
+import time
+
+from src.shared.util import logUtil
+
+# 비동기 로깅 파이프라인: 요청 스레드 비용 / 큐 포화 시 drop / JSON 레코드 / payload 샘플링 확인
+
+
+class slow_handler(logging.Handler):
+    # 디스크가 느린 상황 흉내
+    def emit(self, record):
+        time.sleep(0.01)
+
+
+def non_blocking_test(directory: str):
+    os.environ["LOG_QUEUE_SIZE"] = "100"
+    logUtil.setup_logging(os.path.join(directory, "slow.log"))
+    logUtil._listener.handlers = (slow_handler(),)
+    logger = logging.getLogger("log_pipeline_test")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        logger.info("request %d", i)
+    elapsed = time.perf_counter() - start
+
+    stats = logUtil.log_stats()
+    # 느린 핸들러(10ms)를 기다렸다면 최소 1초, 큐가 차면 버리고 바로 반환
+    assert elapsed < 0.5, elapsed
+    assert stats["dropped"] > 0 and stats["enqueued"] + stats["dropped"] == 1000, stats
+    print(f"1000 records in {elapsed * 1000:.1f}ms, stats={stats}")
+    del os.environ["LOG_QUEUE_SIZE"]
+
+
+def json_record_test(directory: str):
+    log_file = os.path.join(directory, "json.log")
+    logUtil.setup_logging(log_file, json_logs=True)
+    logger = logging.getLogger("log_pipeline_test")
+
+    logger.info("cache hit: %s", "key", extra={"request_key": "key", "elapsed_ms": 3})
+    logUtil.shutdown_logging()
+
+    with open(log_file, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[0]["msg"] == "cache hit: key", records[0]
+    assert records[0]["request_key"] == "key" and records[0]["elapsed_ms"] == 3
+    assert records[0]["level"] == "INFO" and records[0]["logger"] == "log_pipeline_test"
+
+
+def payload_sampling_test(directory: str):
+    log_file = os.path.join(directory, "payload.log")
+    logUtil.setup_logging(log_file, level="INFO")
+    logger = logging.getLogger("log_pipeline_test")
+
+    for _ in range(100):
+        logUtil.log_payload(logger, "raw", "x" * 10_000, rate=0.0)
+    logUtil.log_payload(logger, "raw", "x" * 10_000, rate=1.0, max_chars=50)
+    logUtil.shutdown_logging()
+
+    with open(log_file, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    # rate=0 은 전부 생략, rate=1 은 max_chars 에서 잘라 한 줄
+    assert len(lines) == 1, len(lines)
+    assert "(10000 chars)" in lines[0] and len(lines[0]) < 200
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        for test in [non_blocking_test, json_record_test, payload_sampling_test]:
+            test(directory)
+            print(f"{test.__name__} passed")
+    logUtil.shutdown_logging()
+    print("log pipeline tests passed")
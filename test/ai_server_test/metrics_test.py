@@ -0,0 +1,93 @@
+import os
+import tempfile
+
+from src.app.app import create_app
+from src.shared.llm.LlmGateway import LLM_LATENCY, LLM_RETRIES, LlmGateway
+from src.shared.util.metricsUtil import CONTENT_TYPE, REGISTRY, MetricsRegistry
+
+# 지표 text format / 히스토그램 누적 버킷 / /metrics 엔드포인트 / 게이트웨이 계측 / textfile 쓰기 확인
+
+
+class fake_container:
+    def start(self):
+        return self
+
+    def close(self):
+        pass
+
+
+def exposition_format_test():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1))
+    requests.inc(route='/a"b')
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+    registry.register_collector("broken", lambda: 1 / 0)
+
+    text = registry.render()
+    assert '# TYPE requests counter' in text
+    assert 'requests_total{route="/a\\"b"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+    # 같은 이름은 같은 객체, 라벨이 다르면 거부
+    assert registry.counter("requests", "Requests", ("route",)) is requests
+    try:
+        registry.counter("requests", "Requests", ("model",))
+        raise AssertionError("expected label mismatch")
+    except ValueError:
+        pass
+
+
+def flask_endpoint_test():
+    client = create_app(container=fake_container()).test_client()
+    client.get("/metrics")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == CONTENT_TYPE
+    body = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{method="GET",route="/metrics",status="200"} 1' in body, body
+
+
+def gateway_instrumentation_test():
+    gateway = LlmGateway(base_delay=0.001, max_delay=0.002, fallbacks={})
+    attempts = []
+
+    class fake_503(Exception):
+        status_code = 503
+
+    def call(model, timeout=None):
+        attempts.append(model)
+        if len(attempts) == 1:
+            raise fake_503()
+        return "ok"
+
+    retries = LLM_RETRIES.value(model="metrics-test")
+    assert gateway.call(["metrics-test"], call) == "ok"
+    assert LLM_RETRIES.value(model="metrics-test") == retries + 1
+    assert LLM_LATENCY.count(model="metrics-test", outcome="error") == 1
+    assert LLM_LATENCY.count(model="metrics-test", outcome="success") == 1
+
+
+def textfile_test(directory: str):
+    path = os.path.join(directory, "metrics", "crawler.prom")
+    REGISTRY.write_textfile(path)
+    with open(path, encoding="utf-8") as f:
+        assert "llm_request_duration_seconds_bucket" in f.read()
+    assert os.listdir(os.path.dirname(path)) == ["crawler.prom"]
+
+
+if __name__ == "__main__":
+    exposition_format_test()
+    print("exposition_format_test passed")
+    flask_endpoint_test()
+    print("flask_endpoint_test passed")
+    gateway_instrumentation_test()
+    print("gateway_instrumentation_test passed")
+    with tempfile.TemporaryDirectory() as directory:
+        textfile_test(directory)
+    print("textfile_test passed")
+    print("metrics tests passed")
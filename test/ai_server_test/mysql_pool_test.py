@@ -0,0 +1,118 @@
+import os
+
+from src.shared.db.catalog.CatalogVersionRepository import CatalogVersionRepository
+from src.shared.db.util.MysqlPool import MysqlPool
+from src.shared.db.util.MysqlUtil import MysqlUtil
+
+# 풀에 돌려준 커넥션이 읽기 스냅샷을 들고 있지 않아, 다음 대여에서 다른 커넥션이 commit 한 값을 보는지 확인
+# (DATABASE_HOST 가 있으면 실제 MySQL 로도 확인)
+
+
+class snapshot_db:
+    # InnoDB REPEATABLE READ 흉내: 트랜잭션의 첫 읽기 시점 값을 commit/rollback 전까지 계속 보여줌
+    def __init__(self):
+        self.committed = {"version": 1}
+
+
+class snapshot_cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=None):
+        if sql.startswith("SELECT version"):
+            if self.connection.snapshot is None:
+                self.connection.snapshot = dict(self.connection.db.committed)
+            self.row = (self.connection.snapshot["version"],)
+        elif sql.startswith("INSERT INTO catalog_version"):
+            self.connection.pending["version"] = self.connection.db.committed["version"] + 1
+
+    def fetchone(self):
+        return self.row
+
+
+class snapshot_connection:
+    def __init__(self, db: snapshot_db):
+        self.db = db
+        self.snapshot = None
+        self.pending = {}
+
+    def cursor(self):
+        return snapshot_cursor(self)
+
+    def ping(self, reconnect=False):
+        pass
+
+    def commit(self):
+        self.db.committed.update(self.pending)
+        self.pending = {}
+        self.snapshot = None
+
+    def rollback(self):
+        self.pending = {}
+        self.snapshot = None
+
+    def close(self):
+        pass
+
+
+class snapshot_mysql_util:
+    def __init__(self, db: snapshot_db):
+        self.db = db
+
+    def get_connection(self):
+        return snapshot_connection(self.db)
+
+
+def second_checkout_sees_commit_test():
+    db = snapshot_db()
+    pool = MysqlPool(mysqlUtil=snapshot_mysql_util(db), size=1)
+    repository = CatalogVersionRepository()
+
+    with pool.connection() as connection:
+        assert repository.get_version(connection) == 1
+
+    # 크롤러 쪽 다른 커넥션이 버전 증가 후 commit
+    writer = snapshot_connection(db)
+    repository.bump(writer)
+    writer.commit()
+
+    # size=1 이라 같은 커넥션을 다시 빌림
+    with pool.connection() as connection:
+        assert repository.get_version(connection) == 2, "pooled connection kept a stale read snapshot"
+    pool.close()
+
+
+def mysql_second_checkout_sees_commit_test():
+    mysql_util = MysqlUtil()
+    pool = MysqlPool(mysqlUtil=mysql_util, size=1)
+    repository = CatalogVersionRepository()
+    with pool.connection() as connection:
+        repository.ensure_table(connection)
+        before = repository.get_version(connection)
+
+    writer = mysql_util.get_connection()
+    try:
+        after = repository.bump(writer)
+        writer.commit()
+    finally:
+        writer.close()
+
+    with pool.connection() as connection:
+        assert repository.get_version(connection) == after != before
+    pool.close()
+
+
+if __name__ == "__main__":
+    second_checkout_sees_commit_test()
+    print("second_checkout_sees_commit_test passed")
+    if os.getenv("DATABASE_HOST"):
+        mysql_second_checkout_sees_commit_test()
+        print("mysql_second_checkout_sees_commit_test passed")
+    print("mysql pool tests passed")
@@ -0,0 +1,147 @@
+import datetime
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto, product_period_dto
+from src.app.dto.request.request_front_dto import Period, request_combo_dto
+from src.app.service.ai_service import ai_service
+from src.app.service.interest_engine import interest_engine
+from src.app.service.portfolio_optimizer import OPEN_ENDED_TERM_MONTHS, portfolio_optimizer
+from src.app.service.recommendation_validator import recommendation_validator
+
+# LLM 없는 조합 최적화: 가입 기간 선택, 최소/최대 한도, 부분집합 열거 결과 순서, 배분 불가 요청 확인
+
+
+def product(uuid: str, type: str, max_rate: float, periods=(), maximum_amount: int = -1, minimum_amount: int = -1,
+            maximum_amount_per_month: int = -1) -> product_dto:
+    return product_dto(
+        product_uuid=uuid, name=uuid, bank_name="테스트은행", base_rate=1.0, max_rate=max_rate, type=type,
+        maximum_amount=maximum_amount, minimum_amount=minimum_amount,
+        maximum_amount_per_month=maximum_amount_per_month, minimum_amount_per_month=-1,
+        maximum_amount_per_day=-1, minimum_amount_per_day=-1, tax_benefit="comprehensive taxation",
+        preferential_info="", sub_amount="", sub_term="",
+        product_period=[product_period_dto(period=p, basic_rate=1.0) for p in periods],
+    )
+
+
+PAYLOAD = ai_payload_dto(tax_rate=15.4, products=[
+    product("high", "deposit", 4.0, ["[-,6]"], maximum_amount=15_000_000),
+    product("mid", "deposit", 3.5, ["[1,12]"]),
+    product("sav", "savings", 5.0, ["[6,12]"], maximum_amount_per_month=500_000),
+    product("long", "deposit", 6.0, ["[24,36]"]),
+    product("low", "deposit", 2.0),
+])
+
+
+def optimizer() -> portfolio_optimizer:
+    return portfolio_optimizer(engine=interest_engine(start_date=datetime.date(2025, 1, 1)))
+
+
+def allocations(combination):
+    return [(p.uuid, p.start_month, p.end_month, p.allocated_amount) for p in combination.product]
+
+
+def short_caps_and_terms_test():
+    request = request_combo_dto(amount=30_000_000, period=Period.SHORT)
+    result = optimizer().optimize(request, PAYLOAD)
+
+    # high 는 maximum_amount 1,500만원까지만, 나머지는 다음으로 좋은 mid
+    assert allocations(result.combination[0]) == [("high", 1, 6, 15_000_000), ("mid", 1, 6, 15_000_000)]
+    # 적금 한도 = 월 50만원 × 6개월 (1천만원 이상 최소 배분 360만원보다 작으면 한도 우선)
+    assert ("sav", 1, 6, 3_000_000) in allocations(result.combination[1])
+    interests = [c.expected_interest_after_tax for c in result.combination]
+    assert interests == sorted(interests, reverse=True) and len(interests) == 3
+    # SHORT horizon(6) 안에서 가입 불가한 long([24,36]) 은 후보에서 제외
+    assert all(p.uuid != "long" and p.end_month <= 6 for c in result.combination for p in c.product)
+    assert recommendation_validator().repair(result, request, PAYLOAD) is result
+
+
+def mid_floors_test():
+    request = request_combo_dto(amount=30_000_000, period=Period.MID)
+    result = optimizer().optimize(request, PAYLOAD)
+
+    assert allocations(result.combination[0]) == [("mid", 1, 12, 30_000_000)]
+    for combination in result.combination:
+        for p in combination.product:
+            # 1천만원 이상 요청: 예금 ≥ 1천만원, 적금 ≥ 360만원, 적금은 월 한도 × 기간 이하
+            if p.type == "deposit":
+                assert p.allocated_amount >= 10_000_000, allocations(combination)
+            else:
+                assert 3_600_000 <= p.allocated_amount <= 500_000 * 12, allocations(combination)
+            # 기간 행 범위 안에서 가장 긴 기간 (high 는 [-,6] 이라 6개월)
+            assert p.end_month == (6 if p.uuid == "high" else 12)
+    assert recommendation_validator().repair(result, request, PAYLOAD) is result
+
+
+def deterministic_test():
+    request = request_combo_dto(amount=30_000_000, period=Period.LONG)
+    first = optimizer().optimize(request, PAYLOAD)
+    second = optimizer().optimize(request, PAYLOAD)
+    assert [c.combination_id for c in first.combination] == [c.combination_id for c in second.combination]
+    assert allocations(first.combination[0]) == [("long", 1, 36, 30_000_000)]
+
+
+def long_terms_test():
+    # LONG 은 상한 없음: 상품 기간 상한까지, 상품에도 상한이 없으면 OPEN_ENDED_TERM_MONTHS
+    opt = optimizer()
+    assert opt._term(product("x", "deposit", 3.0, ["[48,60]"]), None) == 60
+    assert opt._term(product("x", "deposit", 3.0, ["[48,-]"]), None) == 48
+    assert opt._term(product("x", "deposit", 3.0, ["[6,-]"]), None) == OPEN_ENDED_TERM_MONTHS
+    assert opt._term(product("x", "deposit", 3.0), None) == OPEN_ENDED_TERM_MONTHS
+    assert opt._term(product("x", "deposit", 3.0, ["[48,60]"]), 12) is None
+
+
+def infeasible_test():
+    # 모든 상품의 최소 금액보다 작은 요청
+    payload = ai_payload_dto(tax_rate=15.4, products=[
+        product("a", "deposit", 3.0, minimum_amount=1_000_000),
+        product("b", "deposit", 3.5, minimum_amount=5_000_000),
+    ])
+    try:
+        optimizer().optimize(request_combo_dto(amount=500_000, period=Period.MID), payload)
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+    # 한도 합이 요청 금액보다 작아도 불가
+    payload = ai_payload_dto(tax_rate=15.4, products=[product("a", "deposit", 3.0, maximum_amount=1_000_000)])
+    try:
+        optimizer().optimize(request_combo_dto(amount=5_000_000, period=Period.MID), payload)
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+
+def too_few_combinations_test():
+    # 실행 가능한 부분집합이 {a}, {b}, {a, b} 중 {a} 하나뿐 (b 는 최소 금액 초과) → 3개 미만이면 실패
+    payload = ai_payload_dto(tax_rate=15.4, products=[
+        product("a", "deposit", 3.0),
+        product("b", "deposit", 3.5, minimum_amount=50_000_000),
+    ])
+    request = request_combo_dto(amount=5_000_000, period=Period.MID)
+    try:
+        optimizer().optimize(request, payload)
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+    # ai_service 는 OPTIMIZER_FALLBACK_MODEL 로 넘김
+    svc = ai_service.__new__(ai_service)
+    svc.logger = optimizer().logger
+    svc.optimizer = optimizer()
+    svc.optimizer_fallback_model = "gpt-5-mini"
+    assert svc._optimize(request, payload) == (None, "gpt-5-mini")
+
+
+def max_products_test():
+    opt = optimizer()
+    assert opt._max_products(10_000_000) == 3
+    assert opt._max_products(300_000_000) == 3
+    assert opt._max_products(500_000_000) == 5
+    assert opt._max_products(5_000_000_000) == 10
+
+
+if __name__ == "__main__":
+    for test in [short_caps_and_terms_test, mid_floors_test, deterministic_test, long_terms_test, infeasible_test,
+                 too_few_combinations_test, max_products_test]:
+        test()
+        print(f"{test.__name__} passed")
+    print("portfolio optimizer tests passed")
@@ -0,0 +1,69 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+from src.crawler.ai.LlmUtil import LlmUtil
+from src.crawler.ai.PreprocessCache import PreprocessCache, preprocess_cache_key
+from src.crawler.ai.jsonSchema import Preferential
+from src.shared.llm.LlmGateway import LlmGateway
+
+# 크롤링 원문이 같으면 LLM 을 다시 부르지 않고 전처리 결과 재사용, 은행별 hit/miss 집계 확인
+
+PARSED = Preferential(
+    product_name="테스트 적금", product_basic_rate=2.0, product_max_rate=3.5, product_type="deposit",
+    product_info=["안내"], product_maximum_amount=-1, product_minimum_amount=1000,
+    product_maximum_amount_per_day=-1, product_minimum_amount_per_day=-1,
+    product_maximum_amount_per_month=500000, product_minimum_amount_per_month=1000,
+    product_sub_target="개인", product_sub_amount="1천원 이상", product_sub_way="모바일",
+    product_sub_term="12개월", product_tax_benefit="비과세", product_preferential_info="우대",
+    preferential_conditions_detail_header=[], preferential_conditions_detail_detail=[],
+    preferential_conditions_detail_interest_rate=[], preferential_conditions_detail_keyword=[],
+    product_period_period=["12"], product_period_base_rate=[2.0],
+)
+
+
+class fake_models:
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, model, contents, config):
+        self.calls.append(contents)
+        return SimpleNamespace(text=PARSED.model_dump_json(), parsed=PARSED, usage_metadata=None)
+
+
+def llm_util(path: str, models: fake_models) -> LlmUtil:
+    return LlmUtil(client=SimpleNamespace(models=models), gateway=LlmGateway(fallbacks={}),
+                   cache=PreprocessCache(path))
+
+
+def rerun_skips_llm_test(path: str):
+    models = fake_models()
+    util = llm_util(path, models)
+    assert util.create_preferential_json("상품명: 테스트 적금\n금리 2.0%", bank_name="KB") == PARSED
+    # 공백만 다른 원문은 같은 상품
+    assert util.create_preferential_json("상품명:  테스트 적금   금리 2.0%", bank_name="KB") == PARSED
+    assert len(models.calls) == 1, models.calls
+    assert util.cache.stats("KB") == {"hit": 1, "miss": 1}
+
+    # 다음 달 실행(새 프로세스)에서도 파일에서 읽어 LLM 호출 없음
+    models = fake_models()
+    util = llm_util(path, models)
+    util.create_preferential_json("상품명: 테스트 적금\n금리 2.0%", bank_name="KB")
+    util.create_preferential_json("상품명: 다른 적금", bank_name="NH")
+    assert len(models.calls) == 1, models.calls
+    assert util.cache.stats() == {"KB": {"hit": 1, "miss": 0}, "NH": {"hit": 0, "miss": 1}}
+
+
+def key_versioning_test():
+    # 모델이 다르면 다른 키, dict 원문은 키 순서와 무관
+    assert preprocess_cache_key("a", "gemini-2.5-flash") != preprocess_cache_key("a", "gemini-2.5-pro")
+    assert preprocess_cache_key({"a": 1, "b": 2}, "m") == preprocess_cache_key({"b": 2, "a": 1}, "m")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        rerun_skips_llm_test(os.path.join(directory, "preprocess_cache.db"))
+        print("rerun_skips_llm_test passed")
+    key_versioning_test()
+    print("key_versioning_test passed")
+    print("preprocess cache tests passed")
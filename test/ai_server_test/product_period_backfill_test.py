@@ -0,0 +1,60 @@
+from src.shared.db.product.ProductPeriodRepository import ProductPeriodRepository
+
+# 기간 컬럼 백필: 파싱 불가 행도 period_parsed = 1 로 표시되어 다음 기동에서 다시 읽지 않는지 확인
+
+
+class fake_cursor:
+    def __init__(self, table: "fake_table"):
+        self.table = table
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=None):
+        self.table.selects += 1
+        self.result = [(uuid, row["period"]) for uuid, row in self.table.rows.items() if not row["period_parsed"]]
+
+    def fetchall(self):
+        return self.result
+
+    def executemany(self, sql, rows):
+        for min_months, max_months, uuid in rows:
+            self.table.rows[uuid].update(min_months=min_months, max_months=max_months, period_parsed=1)
+
+
+class fake_table:
+    def __init__(self, periods):
+        self.rows = {f"p{i}": {"period": period, "min_months": None, "max_months": None, "period_parsed": 0}
+                     for i, period in enumerate(periods)}
+        self.selects = 0
+
+    def cursor(self):
+        return fake_cursor(self)
+
+    def commit(self):
+        pass
+
+
+def backfill_once_test():
+    table = fake_table(["[3, 6]", "[-, 12]", "[-, -]", "6개월 이상", None])
+    repository = ProductPeriodRepository()
+
+    assert repository.backfill(table, batch_size=2) == 5
+    assert table.rows["p0"]["min_months"] == 3 and table.rows["p0"]["max_months"] == 6
+    assert table.rows["p1"]["min_months"] is None and table.rows["p1"]["max_months"] == 12
+    # 파싱 불가 행은 NULL 그대로지만 처리 완료로 표시
+    assert table.rows["p3"]["min_months"] is None and table.rows["p3"]["period_parsed"] == 1
+
+    # 다음 기동: 다시 파싱할 행 없음
+    assert repository.backfill(table) == 0
+    assert all(row["period_parsed"] for row in table.rows.values())
+
+
+if __name__ == "__main__":
+    backfill_once_test()
+    print("backfill_once_test passed")
+    print("product period backfill tests passed")
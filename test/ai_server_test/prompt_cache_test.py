@@ -0,0 +1,110 @@
+import json
+from types import SimpleNamespace
+
+from google.genai import types
+from pydantic import TypeAdapter
+
+from src.app.ai.ai_gemini import ai_gemini
+from src.app.ai.ai_gpt import ai_gpt
+from src.app.ai.prompt_cache import prompt_cache_key
+from src.app.ai.prompt_eng import PROMPT_ENG
+from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.crawler.ai.LlmUtil import LlmUtil
+from src.crawler.ai.preprocessPrompt import SYS_RULE
+
+# 실제 API 대신 로컬 스텁 클라이언트로 요청 형태(고정 prefix / 가변 payload)와 캐시 토큰 집계 확인
+
+PARSED = response_ai_dto(total_payment=10_000_000, period_months=12, combination=[])
+CONTENTS_ADAPTER = TypeAdapter(types.ContentListUnion)
+CONTENT = {"request_info": {"amount": 10_000_000, "period": "MID"}, "tax_rate": 15.4, "rows": []}
+
+
+class stub_gemini_models:
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, model, contents, config):
+        # 실제 SDK 처럼 contents 형식 검증 (dict 는 pydantic ValidationError)
+        CONTENTS_ADAPTER.validate_python(contents)
+        self.calls.append((model, contents, config))
+        # 두 번째 호출부터 시스템 프롬프트가 캐시된 것처럼 응답
+        cached = 4000 if len(self.calls) > 1 else 0
+        return SimpleNamespace(text=PARSED.model_dump_json(), parsed=PARSED,
+                               usage_metadata=SimpleNamespace(prompt_token_count=4100,
+                                                              cached_content_token_count=cached))
+
+
+class stub_openai_responses:
+    def __init__(self):
+        self.calls = []
+
+    def parse(self, **kwargs):
+        self.calls.append(kwargs)
+        usage = SimpleNamespace(input_tokens=4100, output_tokens=10, total_tokens=4110,
+                                input_tokens_details=SimpleNamespace(cached_tokens=3968))
+        return SimpleNamespace(output_text="{}", output_parsed=PARSED, usage=usage, output=[])
+
+
+def gemini_prefix_test():
+    models = stub_gemini_models()
+    client = ai_gemini(client=SimpleNamespace(models=models))
+
+    client.create_response(content=CONTENT, model="gemini-2.5-flash")
+    client.create_response(content=CONTENT, model="gemini-2.5-flash")
+
+    model, contents, config = models.calls[0]
+    assert config.system_instruction == PROMPT_ENG, "정적 프롬프트는 system_instruction 으로"
+    assert PROMPT_ENG not in contents and contents.startswith("{"), "contents 에는 payload 만"
+    assert models.calls[0][2].system_instruction == models.calls[1][2].system_instruction
+
+    stats = client.cache_usage.snapshot()["gemini-2.5-flash"]
+    assert stats["calls"] == 2 and stats["cached_tokens"] == 4000, stats
+    print("gemini:", stats)
+
+
+def gpt_prefix_test():
+    responses = stub_openai_responses()
+    client = ai_gpt(client=SimpleNamespace(responses=responses))
+
+    client.create_response(content=CONTENT, model="gpt-5-mini")
+
+    call = responses.calls[0]
+    assert call["input"][0] == {"role": "system", "content": PROMPT_ENG}
+    assert call["input"][-1]["role"] == "user" and PROMPT_ENG not in call["input"][-1]["content"]
+    assert call["prompt_cache_key"] == prompt_cache_key(PROMPT_ENG)
+
+    stats = client.cache_usage.snapshot()["gpt-5-mini"]
+    assert stats["cached_tokens"] == 3968, stats
+    print("gpt:", stats)
+
+
+def llm_util_prefix_test():
+    models = stub_gemini_models()
+    util = LlmUtil(client=SimpleNamespace(models=models))
+
+    util.create_preferential_json(content="상품명: 테스트 예금")
+
+    model, contents, config = models.calls[0]
+    assert config.system_instruction == SYS_RULE and contents == "상품명: 테스트 예금"
+    print("LlmUtil:", util.cache_usage.snapshot())
+
+
+def llm_util_dict_content_test():
+    # 하나은행 크롤러는 상품을 dict 로 넘김
+    models = stub_gemini_models()
+    util = LlmUtil(client=SimpleNamespace(models=models))
+    item = {"상품명": "하나 적금", "금리": "연 2.0%"}
+
+    util.create_preferential_json(content=item)
+
+    model, contents, config = models.calls[0]
+    assert contents == json.dumps(item, ensure_ascii=False), contents
+    assert config.system_instruction == SYS_RULE
+
+
+if __name__ == "__main__":
+    gemini_prefix_test()
+    gpt_prefix_test()
+    llm_util_prefix_test()
+    llm_util_dict_content_test()
+    print("prompt prefix cache tests passed")
@@ -0,0 +1,96 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+from src.shared.llm.LlmGateway import LlmGateway, RateRequest
+from src.shared.llm.RateLimiter import BATCH, INTERACTIVE, RateLimitTimeoutError, SqliteRateLimiter
+
+# 프로세스 간 공유 token bucket: 총량 / batch 예약분 / 429 drain 확인
+
+
+def limiter(path: str, rpm: int = 60, tpm: int = 100_000, **kwargs) -> SqliteRateLimiter:
+    return SqliteRateLimiter(path, limits={"m": (rpm, tpm)}, **kwargs)
+
+
+def _worker(path: str, count: int, results):
+    rate_limiter = limiter(path, max_wait_sec=0.01)
+    granted = 0
+    for _ in range(count):
+        try:
+            rate_limiter.acquire("k", "m")
+            granted += 1
+        except RateLimitTimeoutError:
+            pass
+    results.put(granted)
+
+
+def shared_across_processes_test(path: str):
+    # 두 프로세스가 합쳐서 bucket(분당 60회) 이상 가져가지 못함
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_worker, args=(path, 50, results)) for _ in range(2)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    granted = results.get() + results.get()
+    assert 60 <= granted <= 62, granted
+    print(f"granted across 2 processes: {granted}")
+
+
+def batch_reserve_test(path: str):
+    rate_limiter = limiter(path, rpm=10, reserve_ratio=0.3, max_wait_sec=0.01)
+    batch = 0
+    while True:
+        try:
+            rate_limiter.acquire("k", "m", priority=BATCH)
+            batch += 1
+        except RateLimitTimeoutError:
+            break
+    # batch 는 70% 까지만, 나머지 30% 는 interactive 몫
+    assert batch == 7, batch
+    for _ in range(3):
+        rate_limiter.acquire("k", "m", priority=INTERACTIVE)
+
+
+def token_budget_test(path: str):
+    rate_limiter = limiter(path, rpm=1000, tpm=1000, max_wait_sec=0.01)
+    rate_limiter.acquire("k", "m", cost_tokens=900)
+    try:
+        rate_limiter.acquire("k", "m", cost_tokens=200)
+        raise AssertionError("expected TPM limit")
+    except RateLimitTimeoutError:
+        pass
+
+
+def drain_on_429_test(path: str):
+    class fake_429(Exception):
+        status_code = 429
+
+    rate_limiter = limiter(path, rpm=600, max_wait_sec=0.01)
+    gateway = LlmGateway(max_attempts=1, fallbacks={}, rate_limiter=rate_limiter)
+
+    def call(model, timeout=None):
+        raise fake_429("too many requests")
+
+    try:
+        gateway.call(["m"], call, rate=RateRequest(key="k"))
+    except Exception:
+        pass
+    # provider 가 429 를 주면 다른 프로세스도 바로 못 가져감
+    start = time.monotonic()
+    try:
+        rate_limiter.acquire("k", "m")
+        raise AssertionError("expected drained bucket")
+    except RateLimitTimeoutError:
+        pass
+    assert time.monotonic() - start < 0.5
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        for i, test in enumerate([shared_across_processes_test, batch_reserve_test, token_budget_test,
+                                  drain_on_429_test]):
+            test(os.path.join(directory, f"rate_{i}.db"))
+            print(f"{test.__name__} passed")
+    print("rate limiter tests passed")
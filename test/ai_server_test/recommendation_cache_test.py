@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+
+from src.app.dto.request.request_front_dto import Period, request_combo_dto
+from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.app.service.recommendation_cache import recommendation_cache, sqlite_cache_backend
+
+# 추천 캐시: TTL 만료 / LRU 제거 / 카탈로그 버전이 바뀌면 새 키로 miss / sqlite 공유 백엔드 확인
+
+
+def result(amount: int) -> response_ai_dto:
+    return response_ai_dto(total_payment=amount, period_months=12, combination=[])
+
+
+class version_source:
+    def __init__(self, version: int = 1):
+        self.version = version
+        self.calls = 0
+
+    def __call__(self) -> int:
+        self.calls += 1
+        return self.version
+
+
+def ttl_expiry_test():
+    cache = recommendation_cache(version_loader=version_source(), max_size=10, ttl_sec=0.05)
+    cache.set("k", result(1))
+    assert cache.get("k") == result(1)
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def lru_eviction_test():
+    cache = recommendation_cache(version_loader=version_source(), max_size=2, ttl_sec=60)
+    cache.set("a", result(1))
+    cache.set("b", result(2))
+    cache.get("a")  # a 를 최근 사용으로
+    cache.set("c", result(3))
+    assert cache.get("b") is None
+    assert cache.get("a") == result(1) and cache.get("c") == result(3)
+
+
+def version_bump_test():
+    versions = version_source(1)
+    cache = recommendation_cache(version_loader=versions, max_size=10, ttl_sec=60, version_check_sec=0)
+    request = request_combo_dto(amount=10_000_000, period=Period.MID)
+
+    key = cache.make_key(request, "gpt-5-mini")
+    assert key == "v1:10000000:MID:gpt-5-mini"
+    cache.set(key, result(10_000_000))
+    assert cache.get(cache.make_key(request, "gpt-5-mini")) == result(10_000_000)
+
+    # 크롤러가 카탈로그 버전을 올리면 같은 요청도 새 키 → miss, 이전 버전 엔트리는 정리
+    versions.version = 2
+    new_key = cache.make_key(request, "gpt-5-mini")
+    assert new_key == "v2:10000000:MID:gpt-5-mini"
+    assert cache.get(new_key) is None
+    assert cache.get(key) is None
+
+
+def version_check_interval_test():
+    versions = version_source(1)
+    cache = recommendation_cache(version_loader=versions, version_check_sec=60)
+    for _ in range(5):
+        cache.current_version()
+    assert versions.calls == 1
+
+
+def shared_backend_test(directory: str):
+    path = os.path.join(directory, "cache.db")
+    writer = recommendation_cache(version_loader=version_source(), ttl_sec=60, shared_backend=sqlite_cache_backend(path))
+    reader = recommendation_cache(version_loader=version_source(), ttl_sec=60, shared_backend=sqlite_cache_backend(path))
+
+    writer.set("v1:k", result(5))
+    assert reader.get("v1:k") == result(5)
+    # crawler 쪽 invalidate_all 은 공유 파일까지 비움
+    writer.invalidate_all()
+    assert sqlite_cache_backend(path).get("v1:k") is None
+
+
+if __name__ == "__main__":
+    for test in [ttl_expiry_test, lru_eviction_test, version_bump_test, version_check_interval_test]:
+        test()
+        print(f"{test.__name__} passed")
+    with tempfile.TemporaryDirectory() as directory:
+        shared_backend_test(directory)
+    print("shared_backend_test passed")
+    print("recommendation cache tests passed")
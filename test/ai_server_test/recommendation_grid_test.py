@@ -0,0 +1,78 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto
+from src.app.dto.request.request_front_dto import Period, request_combo_dto
+from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.app.dto.response.response_allocation_dto import allocation_dto
+from src.app.service.ai_service import ai_service
+from src.app.service.interest_engine import interest_engine
+from src.app.service.recommendation_grid import scale_response
+
+# 버킷 금액에서 스케일한 그리드 결과가 상품 한도를 넘으면 쓰지 않고 실시간 생성으로 넘어가는지 확인
+
+
+def product(uuid: str, maximum_amount: int = -1, minimum_amount: int = -1) -> product_dto:
+    return product_dto(
+        product_uuid=uuid, name=uuid, bank_name="테스트은행", base_rate=2.0, max_rate=3.0, type="deposit",
+        maximum_amount=maximum_amount, minimum_amount=minimum_amount, maximum_amount_per_month=-1,
+        minimum_amount_per_month=-1, maximum_amount_per_day=-1, minimum_amount_per_day=-1,
+        tax_benefit="", preferential_info="", sub_amount="", sub_term="", product_period=[],
+    )
+
+
+class fake_pool:
+    @contextmanager
+    def connection(self):
+        yield None
+
+
+class fake_grid:
+    def __init__(self, bucket: response_ai_dto):
+        self.bucket = bucket
+
+    def lookup(self, connection, request, model, catalog_version):
+        return scale_response(self.bucket, int(request.amount))
+
+
+def service(payload: ai_payload_dto, bucket: response_ai_dto) -> ai_service:
+    svc = ai_service(mysqlUtil=SimpleNamespace(), gemini=SimpleNamespace(), gpt=SimpleNamespace(),
+                     mysql_pool=fake_pool(), grid=fake_grid(bucket),
+                     catalog=SimpleNamespace(build_payload=lambda request, top_n: payload))
+    svc.catalog_version_repository = SimpleNamespace(get_version=lambda connection: 1)
+    return svc
+
+
+def bucket_response(payload: ai_payload_dto, amount: int) -> response_ai_dto:
+    engine = interest_engine()
+    products = {p.product_uuid: p for p in payload.products}
+    combination = engine.build_combination(
+        [allocation_dto(uuid="capped", type="deposit", start_month=1, end_month=6, allocated_amount=amount)],
+        products, payload.tax_rate, combination_id="c1")
+    return response_ai_dto(total_payment=amount, period_months=6, combination=[combination])
+
+
+def scaled_over_maximum_falls_through_test():
+    # 버킷 1000만원 → 1050만원으로 스케일하면 maximum_amount 1000만원 초과
+    payload = ai_payload_dto(tax_rate=15.4, products=[product("capped", maximum_amount=10_000_000)])
+    svc = service(payload, bucket_response(payload, 10_000_000))
+
+    assert svc._from_grid(request_combo_dto(amount=10_500_000, period=Period.SHORT), "gpt-5-mini") is None
+    # 한도 안으로 줄이는 스케일은 그대로 사용
+    result = svc._from_grid(request_combo_dto(amount=9_500_000, period=Period.SHORT), "gpt-5-mini")
+    assert result is not None and result.total_payment == 9_500_000
+    assert svc.validator.is_valid(result, request_combo_dto(amount=9_500_000, period=Period.SHORT), payload)
+
+
+def scaled_below_minimum_falls_through_test():
+    payload = ai_payload_dto(tax_rate=15.4, products=[product("capped", minimum_amount=10_000_000)])
+    svc = service(payload, bucket_response(payload, 10_000_000))
+    assert svc._from_grid(request_combo_dto(amount=9_500_000, period=Period.SHORT), "gpt-5-mini") is None
+
+
+if __name__ == "__main__":
+    scaled_over_maximum_falls_through_test()
+    print("scaled_over_maximum_falls_through_test passed")
+    scaled_below_minimum_falls_through_test()
+    print("scaled_below_minimum_falls_through_test passed")
+    print("recommendation grid tests passed")
@@ -0,0 +1,139 @@
+import datetime
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto, product_period_dto
+from src.app.dto.request.request_front_dto import Period, request_combo_dto
+from src.app.dto.response.response_ai_dto import response_ai_dto
+from src.app.dto.response.response_allocation_dto import allocation_dto
+from src.app.service.interest_engine import interest_engine
+from src.app.service.recommendation_validator import recommendation_infeasible_error, recommendation_validator
+
+# LLM 추천 검증/보정: 그대로 통과 / 파생 값 재계산 / 배분 불가(한도, 기간, uuid) 별 repair_combination 경로 확인
+
+ENGINE = interest_engine(start_date=datetime.date(2025, 1, 1))
+AMOUNT = 20_000_000
+
+
+def product(uuid: str, type: str, periods=(), maximum_amount: int = -1, minimum_amount: int = -1,
+            maximum_amount_per_month: int = -1) -> product_dto:
+    return product_dto(
+        product_uuid=uuid, name=uuid, bank_name="테스트은행", base_rate=1.0, max_rate=3.0, type=type,
+        maximum_amount=maximum_amount, minimum_amount=minimum_amount,
+        maximum_amount_per_month=maximum_amount_per_month, minimum_amount_per_month=-1,
+        maximum_amount_per_day=-1, minimum_amount_per_day=-1, tax_benefit="", preferential_info="",
+        sub_amount="", sub_term="", product_period=[product_period_dto(period=p, basic_rate=1.0) for p in periods],
+    )
+
+
+PAYLOAD = ai_payload_dto(tax_rate=15.4, products=[
+    product("dep", "deposit", ["[-,3]", "[6,12]"], maximum_amount=15_000_000, minimum_amount=1_000_000),
+    product("sav", "savings", maximum_amount_per_month=1_000_000),
+    product("free", "deposit"),
+])
+PRODUCTS = {p.product_uuid: p for p in PAYLOAD.products}
+REQUEST = request_combo_dto(amount=AMOUNT, period=Period.MID)
+
+
+def combination(*allocations, combination_id: str = "c1"):
+    return ENGINE.build_combination(
+        [allocation_dto(uuid=uuid, type=PRODUCTS[uuid].type, start_month=start, end_month=end, allocated_amount=amount)
+         for uuid, start, end, amount in allocations], PRODUCTS, PAYLOAD.tax_rate, combination_id=combination_id)
+
+
+VALID = (("dep", 1, 12, 12_000_000), ("sav", 1, 8, 8_000_000))
+
+
+def assert_infeasible(fixed, reason: str):
+    try:
+        recommendation_validator(ENGINE).repair_combination(fixed, AMOUNT, PRODUCTS, PAYLOAD.tax_rate, horizon=12)
+        raise AssertionError(f"expected infeasible: {reason}")
+    except recommendation_infeasible_error as e:
+        assert reason in str(e), str(e)
+
+
+def valid_passes_through_test():
+    original = combination(*VALID)
+    validator = recommendation_validator(ENGINE)
+    assert validator.validate(response_ai_dto(total_payment=AMOUNT, period_months=12, combination=[original]),
+                              REQUEST, PAYLOAD) == []
+    assert validator.repair_combination(original, AMOUNT, PRODUCTS, PAYLOAD.tax_rate, horizon=12) is original
+
+
+def derived_values_recomputed_test():
+    expected = combination(*VALID)
+    broken = expected.model_copy(deep=True)
+    # LLM 이 이자/타임라인/활성 수를 틀리게 계산한 경우
+    broken.expected_interest_after_tax += 1_000
+    broken.product[0].monthly_plan[3].total_interest += 1_000
+    broken.timeline[5].active_product_count = 2
+    broken.timeline[5].cumulative_payment += 1
+
+    validator = recommendation_validator(ENGINE)
+    assert validator.validate(response_ai_dto(total_payment=AMOUNT, period_months=12, combination=[broken]),
+                              REQUEST, PAYLOAD)
+    fixed = validator.repair_combination(broken, AMOUNT, PRODUCTS, PAYLOAD.tax_rate, horizon=12)
+    assert fixed is not broken and fixed == expected
+
+
+def infeasible_paths_test():
+    assert_infeasible(combination(("dep", 1, 12, 12_000_000), ("sav", 1, 8, 7_000_000)), "allocated sum")
+    assert_infeasible(combination(("dep", 1, 12, 16_000_000), ("free", 1, 12, 4_000_000)), "exceeds maximum_amount")
+    assert_infeasible(combination(("dep", 1, 12, 500_000), ("free", 1, 12, 19_500_000)), "below minimum_amount")
+    # 적금 월 한도 100만원 × 8개월 < 900만원
+    assert_infeasible(combination(("dep", 1, 12, 11_000_000), ("sav", 1, 8, 9_000_000)),
+                      "exceeds maximum_amount_per_month")
+    # 요청 horizon(MID=12) 밖에서 끝나는 기간
+    assert_infeasible(combination(("free", 1, 18, AMOUNT)), "exceeds horizon")
+    # dep 은 [-,3] 또는 [6,12] 만 가능
+    assert_infeasible(combination(("dep", 1, 4, 15_000_000), ("free", 1, 12, 5_000_000)), "outside product_period")
+
+    duplicate = combination(("free", 1, 12, 10_000_000), ("free", 1, 6, 10_000_000))
+    assert_infeasible(duplicate, "duplicate product uuid")
+
+    unknown = combination(*VALID)
+    unknown.product[1].uuid = "not-in-payload"
+    assert_infeasible(unknown, "unknown product uuid")
+
+    bad_term = combination(*VALID)
+    bad_term.product[0].start_month, bad_term.product[0].end_month = 5, 2
+    assert_infeasible(bad_term, "invalid term/amount")
+
+
+def repair_response_test():
+    validator = recommendation_validator(ENGINE)
+    good = combination(*VALID, combination_id="good")
+    over = combination(("free", 1, 18, AMOUNT), combination_id="over")
+
+    # 배분 불가 조합만 제외
+    repaired = validator.repair(response_ai_dto(total_payment=AMOUNT, period_months=18, combination=[good, over]),
+                                REQUEST, PAYLOAD)
+    assert [c.combination_id for c in repaired.combination] == ["good"] and repaired.period_months == 12
+
+    # 쓸 수 있는 조합이 없거나 비어 있으면 재생성 대상
+    for result in (response_ai_dto(total_payment=AMOUNT, period_months=18, combination=[over]),
+                   response_ai_dto(total_payment=AMOUNT, period_months=0, combination=[]), None):
+        try:
+            validator.repair(result, REQUEST, PAYLOAD)
+            raise AssertionError("expected infeasible")
+        except recommendation_infeasible_error:
+            pass
+
+
+def long_has_no_horizon_test():
+    # LONG 은 상한 없음: 상품 기간 안이면 36개월을 넘어도 통과, MID 에서는 같은 조합이 horizon 초과
+    validator = recommendation_validator(ENGINE)
+    long_term = combination(("free", 1, 48, AMOUNT), combination_id="long")
+    result = response_ai_dto(total_payment=AMOUNT, period_months=48, combination=[long_term])
+    assert validator.repair(result, request_combo_dto(amount=AMOUNT, period=Period.LONG), PAYLOAD) is result
+    try:
+        validator.repair(result, REQUEST, PAYLOAD)
+        raise AssertionError("expected infeasible")
+    except recommendation_infeasible_error as e:
+        assert "exceeds horizon" in str(e)
+
+
+if __name__ == "__main__":
+    for test in [valid_passes_through_test, derived_values_recomputed_test, infeasible_paths_test,
+                 repair_response_test, long_has_no_horizon_test]:
+        test()
+        print(f"{test.__name__} passed")
+    print("recommendation validator tests passed")
@@ -0,0 +1,60 @@
+import gzip
+import time
+import uuid
+
+from flask import Flask, jsonify
+
+from src.app.dto.response.response_ai_dto import (
+    combination_dto, monthly_plan_dto, product_dto, response_ai_dto, timeline_dto,
+)
+from src.app.route.json_response import success_response
+
+
+def build_long_response(products_per_combination: int = 10, combinations: int = 3, months: int = 36) -> response_ai_dto:
+    # LONG 요청 최악 케이스: 조합 3개 × 상품 10개 × 36개월 monthly_plan + timeline
+    combination_list = []
+    for c in range(combinations):
+        products = []
+        for p in range(products_per_combination):
+            products.append(product_dto(
+                uuid=str(uuid.uuid4()), type="savings", bank_name="KB", base_rate=3.0, max_rate=4.5,
+                product_name=f"테스트 적금 {p}", product_max_rate=4.5, product_base_rate=3.0,
+                start_month=1, end_month=months, allocated_amount=3_600_000,
+                monthly_plan=[monthly_plan_dto(month=m, payment=100_000, total_interest=300 * (m + 1))
+                              for m in range(months)],
+            ))
+        combination_list.append(combination_dto(
+            combination_id=str(uuid.uuid4()), expected_rate=4.32, expected_interest_after_tax=1_234_567,
+            product=products,
+            timeline=[timeline_dto(month=m, total_monthly_payment=1_000_000, active_product_count=10,
+                                   cumulative_interest=3000 * (m + 1), cumulative_payment=1_000_000 * (m + 1))
+                      for m in range(months)],
+        ))
+    return response_ai_dto(total_payment=36_000_000, period_months=months, combination=combination_list)
+
+
+def bench(label: str, fn, repeat: int = 200):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = fn()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    size = len(response.get_data())
+    print(f"{label:<40} {elapsed:8.3f} ms/response  {size:>9,} bytes")
+
+
+if __name__ == "__main__":
+    app = Flask(__name__)
+    result = build_long_response()
+
+    with app.test_request_context(headers={"Accept-Encoding": "identity"}):
+        bench("jsonify(model_dump()) (기존)", lambda: jsonify({"status": "success", "data": result.model_dump()}))
+        bench("success_response (model_dump_json)", lambda: success_response(result))
+
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        bench("jsonify + gzip", lambda: app.response_class(
+            gzip.compress(jsonify({"status": "success", "data": result.model_dump()}).get_data(), 5)))
+        bench("success_response (gzip 협상)", lambda: success_response(result))
+
+    with app.test_request_context(headers={"Accept-Encoding": "br, gzip"}):
+        bench("success_response (br 협상, brotli 설치 시)", lambda: success_response(result))
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.app.service.single_flight import async_single_flight, single_flight
+
+# 같은 키로 동시에 들어온 N 개 요청이 한 번만 실행되고, 결과/예외를 모두 같이 받는지 확인
+
+CALLERS = 8
+KEY = "v1:10000000:MID:gpt-5-mini"
+
+
+class upstream_error(RuntimeError):
+    pass
+
+
+def run_concurrently(flight: single_flight, fn):
+    # leader 가 fn 안에서 멈춰 있는 동안 나머지 CALLERS - 1 개가 모두 대기자로 합류한 뒤 release
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return fn()
+
+    def caller(_):
+        try:
+            return flight.do(KEY, slow)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        futures = [pool.submit(caller, i) for i in range(CALLERS)]
+        while not (call := flight._calls.get(KEY)) or call.waiters < CALLERS - 1:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result(timeout=5) for f in futures]
+    return calls, results
+
+
+def shared_result_test():
+    flight = single_flight()
+    calls, results = run_concurrently(flight, lambda: {"combination": []})
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flight.in_flight() == 0
+
+
+def shared_error_test():
+    flight = single_flight()
+    error = upstream_error("LLM 503")
+
+    def fail():
+        raise error
+
+    calls, results = run_concurrently(flight, fail)
+    assert len(calls) == 1
+    assert all(r is error for r in results), results
+    # 끝나면 키가 빠져서 다음 요청은 새로 실행
+    assert flight.do(KEY, lambda: "fresh") == "fresh"
+
+
+def async_shared_error_test():
+    async def main():
+        flight = async_single_flight()
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            raise upstream_error("LLM 503")
+
+        results = await asyncio.gather(*[flight.do("k", fail) for _ in range(CALLERS)], return_exceptions=True)
+        assert len(calls) == 1
+        assert all(isinstance(r, upstream_error) for r in results), results
+        assert flight.in_flight() == 0
+
+        # 기다리던 요청 하나가 취소돼도 공유 실행은 계속
+        async def ok():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k2", ok))
+        second = asyncio.ensure_future(flight.do("k2", ok))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done" and len(calls) == 2
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    for test in [shared_result_test, shared_error_test, async_shared_error_test]:
+        test()
+        print(f"{test.__name__} passed")
+    print("single flight tests passed")
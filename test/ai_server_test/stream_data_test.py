@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+
+from src.app.dto.request.request_ai_dto import ai_payload_dto, product_dto
+from src.app.dto.request.request_front_dto import Period, request_combo_dto
+from src.app.service.ai_service import ai_service
+
+# 스트리밍 추천: 형식이 틀린 조합 하나는 건너뛰고 나머지로 summary/캐시까지 완료하는지,
+# 응답이 중간에 끊기면 실패로 처리하는지 확인
+
+REQUEST = request_combo_dto(amount=6_000_000, period=Period.SHORT)
+
+
+def product(uuid: str) -> product_dto:
+    return product_dto(
+        product_uuid=uuid, name=uuid, bank_name="테스트은행", base_rate=2.0, max_rate=3.0, type="deposit",
+        maximum_amount=-1, minimum_amount=-1, maximum_amount_per_month=-1, minimum_amount_per_month=-1,
+        maximum_amount_per_day=-1, minimum_amount_per_day=-1, tax_benefit="", preferential_info="",
+        sub_amount="", sub_term="", product_period=[],
+    )
+
+
+def allocation(combination_id: str, end_month: int) -> dict:
+    return {"combination_id": combination_id,
+            "allocations": [{"uuid": "d1", "type": "deposit", "start_month": 1, "end_month": end_month,
+                             "allocated_amount": REQUEST.amount}]}
+
+
+class stub_cache:
+    def __init__(self):
+        self.stored = {}
+
+    def current_version(self):
+        return 1
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        self.stored[key] = value
+
+
+class stub_stream_client:
+    def __init__(self, text: str):
+        self.text = text
+
+    def create_response_stream(self, content, model, prompt=None, response_schema=None, deadline=None):
+        # 몇 글자씩 잘라서 스트리밍
+        return (self.text[i:i + 7] for i in range(0, len(self.text), 7))
+
+
+def service(text: str) -> ai_service:
+    payload = ai_payload_dto(tax_rate=15.4, products=[product("d1")])
+    svc = ai_service(mysqlUtil=SimpleNamespace(), gemini=stub_stream_client(text), gpt=SimpleNamespace(),
+                     cache=stub_cache(), catalog=SimpleNamespace(build_payload=lambda request, top_n: payload))
+    svc.allocation_only = True
+    svc.compactor = None
+    return svc
+
+
+def malformed_item_is_skipped_test():
+    # 두 번째 조합은 allocations 가 없어 파서가 건너뜀, 전체 JSON 은 여전히 스키마와 맞지 않음
+    text = json.dumps({"total_payment": REQUEST.amount,
+                       "combination": [allocation("c1", 6), {"combination_id": "broken"}, allocation("c3", 3)]})
+    svc = service(text)
+    events = list(svc.stream_data(REQUEST, "gemini-2.5-flash"))
+
+    assert [kind for kind, _ in events] == ["combination", "combination", "summary"]
+    assert [value.combination_id for kind, value in events if kind == "combination"] == ["c1", "c3"]
+    summary = events[-1][1]
+    assert summary["combination_count"] == 2 and summary["cached"] is False
+    # validator.repair 와 같은 기준: timeline 의 마지막 month + 1
+    combinations = [value for kind, value in events if kind == "combination"]
+    assert summary["period_months"] == max(max(t.month for t in c.timeline) + 1 for c in combinations)
+    assert len(svc.cache.stored) == 1
+
+
+def truncated_stream_fails_test():
+    text = json.dumps({"total_payment": REQUEST.amount, "combination": [allocation("c1", 6), allocation("c2", 3)]})
+    svc = service(text[:-20])
+    events = []
+    try:
+        for event in svc.stream_data(REQUEST, "gemini-2.5-flash"):
+            events.append(event)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("truncated stream must fail")
+    # 닫힌 조합은 이미 나갔지만 summary 와 캐시는 없음
+    assert [kind for kind, _ in events] == ["combination"]
+    assert svc.cache.stored == {}
+
+
+if __name__ == "__main__":
+    malformed_item_is_skipped_test()
+    print("malformed_item_is_skipped_test passed")
+    truncated_stream_fails_test()
+    print("truncated_stream_fails_test passed")
+    print("stream data tests passed")